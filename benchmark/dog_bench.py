@@ -0,0 +1,76 @@
+# Helpers of the Dog benchmark scripts: matches against the random player and the script arguments
+
+import sys
+import time
+import random
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from server.py.dog import Action, Dog, GameState, RandomPlayer
+from server.py.dog_ismcts import GamePlayer, evaluate, play
+from server.py.game import Player
+
+
+class Match(NamedTuple):
+    results: List[float]            # evaluate(game, 0) of each game
+    list_time_select: List[float]   # seconds of each choice of the player
+
+
+class _TimedPlayer(GamePlayer):
+    """ Passes the choices on to player and appends the seconds each took to list_time_select """
+
+    def __init__(self, player: Player, list_time_select: List[float]) -> None:
+        self.player = player
+        self.list_time_select = list_time_select
+
+    def select_game_action(self, game: Dog, state: GameState, actions: List[Action]) -> Optional[Action]:
+        """ The choice of player, given the game if it searches one """
+        time_start = time.perf_counter()
+        action: Optional[Action]
+        if isinstance(self.player, GamePlayer):
+            action = self.player.select_game_action(game, state, actions)
+        else:
+            action = self.player.select_action(state, actions)
+        self.list_time_select.append(time.perf_counter() - time_start)
+        return action
+
+
+def play_against_random(player: Player, cnt_games: int, cnt_steps: int) -> Match:
+    """ Let player (Blue and Red) play the games of the seeds 0 to cnt_games - 1 against the random player
+    (Green and Yellow), each for at most cnt_steps actions """
+    match = Match([], [])
+    player_timed = _TimedPlayer(player, match.list_time_select)
+    for seed in range(cnt_games):
+        random.seed(seed)  # RandomPlayer uses the module's generator
+        game = Dog(seed=seed)
+        for _ in play(game, [player_timed, RandomPlayer()], cnt_steps):
+            pass
+        match.results.append(evaluate(game, 0))
+    return match
+
+
+def print_match(match: Match) -> None:
+    """ Choice times and results of a match (see play_against_random) """
+    list_time = sorted(match.list_time_select) or [0.0]
+    results = match.results
+    print(f'Choices:           {len(match.list_time_select)}')
+    print(f'Choice time:       {sum(list_time) / len(list_time) * 1e6:.0f}us average, '
+          f'{list_time[len(list_time) // 2] * 1e6:.0f}us median, '
+          f'{list_time[len(list_time) * 99 // 100] * 1e6:.0f}us 99th percentile, '
+          f'{list_time[-1] * 1e6:.0f}us max (garbage collection included)')
+    print(f'Won / lost:        {results.count(1.0)} / {results.count(0.0)} (the other games were cut off)')
+    print(f'Win rate:          {sum(result > 0.5 for result in results) / max(len(results), 1):.0%} '
+          f'(won or ahead when cut off)')
+
+
+def parse_args(defaults: Dict[str, Any]) -> List[Any]:
+    """ The arguments of a benchmark script, each of the type of its default (int, float or str), the
+    defaults for the ones left out. Exits with the usage if they do not convert or are too many. """
+    args = sys.argv[1:]
+    try:
+        values = [type(default)(arg) for arg, default in zip(args, defaults.values())]
+    except ValueError:
+        values = []
+    if len(values) != len(args):
+        print(f"Use: python {sys.argv[0]} " + ' '.join(f'[{name}={value}]' for name, value in defaults.items()))
+        sys.exit(2)
+    return values + list(defaults.values())[len(values):]
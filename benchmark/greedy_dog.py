@@ -0,0 +1,34 @@
+# runcmd: python benchmark/greedy_dog.py [cnt_games] [cnt_steps]
+
+import time
+
+from dog_bench import parse_args, play_against_random, print_match
+from server.py.dog_greedy import GreedyPlayer
+
+
+class DogGreedyBenchmark:
+    """ The greedy player (Blue and Red) against the random player (Green and Yellow) """
+
+    def __init__(self, cnt_games: int, cnt_steps: int) -> None:
+        self.cnt_games = cnt_games
+        self.cnt_steps = cnt_steps
+
+    def run(self) -> None:
+        print('--- Dog Greedy Benchmark ---')
+        print(f'Games: {self.cnt_games}')
+        print(f'Steps: {self.cnt_steps}')
+        print()
+
+        time_start = time.perf_counter()
+        match = play_against_random(GreedyPlayer(), self.cnt_games, self.cnt_steps)
+        print(f'Time:              {time.perf_counter() - time_start:.1f}s')
+        print_match(match)
+
+
+def main() -> None:
+    cnt_games, cnt_steps = parse_args({'cnt_games': 50, 'cnt_steps': 2000})
+    DogGreedyBenchmark(cnt_games=cnt_games, cnt_steps=cnt_steps).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+# runcmd: python benchmark/ismcts_dog.py [cnt_games] [time_budget] [cnt_steps] [cnt_process]
+
+import time
+import random
+from typing import Tuple
+
+from dog_bench import parse_args
+from server.py.dog import Dog, RandomPlayer
+from server.py.dog_ismcts import ISMCTSPlayer, evaluate, play
+
+
+class DogISMCTSBenchmark:
+    """ The ISMCTS player (Blue and Red) against the random player (Green and Yellow) """
+
+    def __init__(self, cnt_games: int, time_budget: float, cnt_steps: int, cnt_process: int) -> None:
+        self.cnt_games = cnt_games
+        self.time_budget = time_budget
+        self.cnt_steps = cnt_steps
+        self.cnt_process = cnt_process
+
+    def play(self, seed: int, player_search: ISMCTSPlayer) -> Tuple[float, int, float]:
+        """ Result for the ISMCTS team (1 won, 0 lost, else the lead when the steps are used up, see
+        dog_ismcts.evaluate), its playouts and search time """
+        random.seed(seed)  # RandomPlayer uses the module's generator
+        game = Dog(seed=seed)
+        cnt_playout, time_search = 0, 0.0
+        for turn in play(game, [player_search, RandomPlayer()], self.cnt_steps):
+            if turn.idx_player % 2 == 0:
+                cnt_playout += player_search.cnt_playout
+                time_search += player_search.time_search
+        return evaluate(game, 0), cnt_playout, time_search
+
+    def run(self) -> None:
+        print('--- Dog ISMCTS Benchmark ---')
+        print(f'Games:       {self.cnt_games}')
+        print(f'Time budget: {self.time_budget}s per action')
+        print(f'Steps:       {self.cnt_steps}')
+        print(f'Processes:   {self.cnt_process}')
+        print()
+
+        player_search = ISMCTSPlayer(time_budget=self.time_budget, cnt_process=self.cnt_process, seed=0)
+        cnt_won, cnt_lost, cnt_ahead, cnt_playout, time_search = 0, 0, 0, 0, 0.0
+        time_start = time.perf_counter()
+        try:
+            for seed in range(self.cnt_games):
+                result, cnt_playout_game, time_search_game = self.play(seed, player_search)
+                cnt_won += result == 1.0
+                cnt_lost += result == 0.0
+                cnt_ahead += result > 0.5
+                cnt_playout += cnt_playout_game
+                time_search += time_search_game
+                print(f'Game {seed}: result {result:.2f}, {cnt_playout_game} playouts')
+        finally:
+            player_search.close()
+
+        print()
+        print(f'Time:              {time.perf_counter() - time_start:.1f}s')
+        print(f'Playouts/second:   {cnt_playout / time_search if time_search else 0.0:.0f}')
+        print(f'Won / lost:        {cnt_won} / {cnt_lost} (the other games were cut off)')
+        print(f'Win rate:          {cnt_ahead / self.cnt_games:.0%} (won or ahead when cut off)')
+
+
+def main() -> None:
+    cnt_games, time_budget, cnt_steps, cnt_process = parse_args(
+        {'cnt_games': 10, 'time_budget': 0.1, 'cnt_steps': 300, 'cnt_process': 1})
+    DogISMCTSBenchmark(cnt_games=cnt_games, time_budget=time_budget, cnt_steps=cnt_steps,
+                       cnt_process=cnt_process).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+# runcmd: python benchmark/perft_dog.py [depth] [cnt_seeds] [path_json]
+
+import io
+import os
+import json
+import time
+import random
+import importlib
+import contextlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from dog_bench import parse_args
+from server.py.dog import Action, Dog, GameState, RandomPlayer
+
+CNT_STEPS_MIDGAME = 30  # random actions from a seeded start to a seeded position in the middle of a game
+
+
+def perft(game: Dog, depth: int) -> int:
+    """ Number of action sequences of the given length from the game's position (the pass counts as an
+    action when there is no other), the actions are applied to the game and undone again. An action the
+    engine lists but cannot apply is a bug and its exception is raised. """
+    if depth == 0:
+        return 1
+    actions: List[Optional[Action]] = [*game.get_list_action()] or [None]
+    cnt_node = 0
+    for action in actions:
+        game.apply_action(action)
+        cnt_node += perft(game, depth - 1)
+        game.undo()
+    return cnt_node
+
+
+class RecordingGameServer:
+    """ Game server for benchmark_dog.py playing seeded games in this process and keeping a copy of every
+    state the benchmark sets, so that the same states are made on every run """
+
+    def __init__(self) -> None:
+        self.game = Dog(seed=0)
+        self.player = RandomPlayer()
+        self.list_state: List[GameState] = []
+
+    def reset(self) -> None:
+        self.game = Dog(seed=0)
+        self.player = RandomPlayer()
+
+    def set_state(self, state: GameState) -> None:
+        self.list_state.append(state.model_copy(deep=True))
+        self.game.set_state(state)
+
+    def get_state(self) -> GameState:
+        return self.game.get_state()
+
+    def print_state(self) -> None:
+        self.game.print_state()
+
+    def get_list_action(self) -> List[Action]:
+        return self.game.get_list_action()
+
+    def select_action(self) -> Optional[Action]:
+        return self.player.select_action(self.game.get_state(), self.game.get_list_action())
+
+    def apply_action(self, action: Optional[Action]) -> None:
+        self.game.apply_action(action)
+
+
+def get_benchmark_states() -> List[GameState]:
+    """ The states the tests of benchmark_dog.py make by hand (each once), their output is dropped. The
+    script is untyped and imported from the benchmark folder (the folder of this script). """
+    random.seed(0)  # RandomPlayer uses the module's generator
+    class_benchmark = importlib.import_module('benchmark_dog').DogBenchmark
+    dog_benchmark = class_benchmark(argv=['', 'python', 'dog.Dog'])
+    server = dog_benchmark.game_server = RecordingGameServer()
+    for name in dog_benchmark.get_list_function_name():
+        if name not in class_benchmark.__dict__:
+            continue  # pylint, mypy and pytest of the base class
+        with contextlib.redirect_stdout(io.StringIO()):
+            try:
+                getattr(dog_benchmark, name)()
+            except AssertionError:
+                pass  # a failing test has still set its states, errors of the engine are raised
+    states: Dict[str, GameState] = {}
+    for state in server.list_state:
+        states.setdefault(state.model_dump_json(), state)
+    return list(states.values())
+
+
+def get_seeded_games(cnt_seeds: int) -> List[Tuple[str, Dog]]:
+    """ The start of the games with seeds 0 to cnt_seeds - 1 and their positions after CNT_STEPS_MIDGAME
+    seeded random actions. The games are cloned, a state would lose the steps of a 7 being played. """
+    positions = []
+    for seed in range(cnt_seeds):
+        game = Dog(seed=seed)
+        positions.append((f'seed {seed}', game.clone()))
+        rng = random.Random(seed)
+        for _ in range(CNT_STEPS_MIDGAME):
+            actions = game.get_list_action()
+            game.apply_action(rng.choice(actions) if actions else None)
+        positions.append((f'seed {seed} +{CNT_STEPS_MIDGAME}', game.clone()))
+    return positions
+
+
+def get_game(state: GameState) -> Dog:
+    game = Dog(seed=0)
+    game.set_state(state)
+    return game
+
+
+class DogPerft:
+
+    def __init__(self, depth: int, cnt_seeds: int, path_json: str) -> None:
+        self.depth = depth
+        self.cnt_seeds = cnt_seeds
+        self.path_json = path_json
+
+    def get_report(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """ Print the totals (the hand-crafted states together) and return them with all positions """
+        results_benchmark = [result for result in results if result['name'].startswith('benchmark')]
+        print(f'{"benchmark_dog.py":<16} {sum(result["nodes"] for result in results_benchmark):>10} nodes '
+              f'{sum(result["seconds"] for result in results_benchmark):8.3f}s ({len(results_benchmark)} states)')
+
+        cnt_node_total = sum(result['nodes'] for result in results)
+        seconds_total = sum(result['seconds'] for result in results)
+        nodes_per_second = cnt_node_total / seconds_total if seconds_total else 0.0
+        print()
+        print(f'Positions:    {len(results)}')
+        print(f'Nodes:        {cnt_node_total}')
+        print(f'Time:         {seconds_total:.2f}s')
+        print(f'Nodes/second: {nodes_per_second:.0f}')
+        return {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'depth': self.depth, 'cnt_seeds': self.cnt_seeds,
+                'nodes': cnt_node_total, 'seconds': seconds_total, 'nodes_per_second': nodes_per_second,
+                'positions': results}
+
+    def run(self) -> None:
+        print('--- Dog Perft ---')
+        print(f'Depth: {self.depth}')
+        print(f'Seeds: {self.cnt_seeds}')
+        print()
+
+        positions = get_seeded_games(self.cnt_seeds)
+        positions += [(f'benchmark {idx}', get_game(state)) for idx, state in enumerate(get_benchmark_states())]
+        results = []
+        for name, game in positions:
+            time_start = time.perf_counter()
+            cnt_node = perft(game, self.depth)
+            seconds = time.perf_counter() - time_start
+            results.append({'name': name, 'nodes': cnt_node, 'seconds': seconds,
+                            'nodes_per_second': cnt_node / seconds if seconds else 0.0})
+            if not name.startswith('benchmark'):
+                print(f'{name:<16} {cnt_node:>10} nodes {seconds:8.3f}s')
+
+        report = self.get_report(results)
+        with open(self.path_json, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        print(f'Written to {self.path_json}')
+
+
+def main() -> None:
+    depth, cnt_seeds, path_json = parse_args(
+        {'depth': 2, 'cnt_seeds': 4, 'path_json': os.path.join(os.path.dirname(__file__), 'perft_dog.json')})
+    DogPerft(depth=depth, cnt_seeds=cnt_seeds, path_json=path_json).run()
+
+
+if __name__ == '__main__':
+    main()
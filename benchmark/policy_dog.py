@@ -0,0 +1,73 @@
+# runcmd: python benchmark/policy_dog.py [cnt_games_train] [max_playouts] [cnt_games] [cnt_steps]
+
+import time
+from typing import Any
+
+import numpy as np
+
+from dog_bench import parse_args, play_against_random, print_match
+from server.py.dog_ismcts import ISMCTSPlayer
+from server.py.dog_policy import PolicyPlayer, SelfPlayLog, fit, generate
+
+
+class DogPolicyBenchmark:
+    """ Distil the ISMCTS player into the policy player from self-play, then let the policy player (Blue
+    and Red) play against the random player (Green and Yellow) """
+
+    def __init__(self, cnt_games_train: int, max_playouts: int, cnt_games: int, cnt_steps: int) -> None:
+        self.cnt_games_train = cnt_games_train
+        self.max_playouts = max_playouts
+        self.cnt_games = cnt_games
+        self.cnt_steps = cnt_steps
+
+    @staticmethod
+    def get_agreement(model: Any, log: SelfPlayLog) -> float:
+        """ Share of the decisions in which the model picks an action like the teacher's (same features) """
+        if log.decision.size == 0:
+            return 0.0
+        proba = model.predict_proba(log.features)[:, 1]
+        cnt_agree = 0
+        for decision in np.unique(log.decision):
+            is_decision = log.decision == decision
+            rows = log.features[is_decision]
+            picked = rows[np.argmax(proba[is_decision])]
+            cnt_agree += bool((picked == rows[log.chosen[is_decision] == 1.0][0]).all())
+        return cnt_agree / len(np.unique(log.decision))
+
+    def run(self) -> None:
+        print('--- Dog Policy Benchmark ---')
+        print(f'Training games: {self.cnt_games_train} (ISMCTS teacher, {self.max_playouts} playouts per action)')
+        print(f'Games:          {self.cnt_games}')
+        print(f'Steps:          {self.cnt_steps}')
+        print()
+
+        teacher = ISMCTSPlayer(time_budget=float('inf'), seed=0, max_playouts=self.max_playouts)
+        time_start = time.perf_counter()
+        log = generate(teacher, self.cnt_games_train, self.cnt_steps, seed=1000)
+        time_generate = time.perf_counter() - time_start
+        cnt_decision = len(np.unique(log.decision))
+        is_train = log.decision < int(cnt_decision * 0.8)
+        log_train = SelfPlayLog(log.features[is_train], log.chosen[is_train], log.decision[is_train])
+        log_test = SelfPlayLog(log.features[~is_train], log.chosen[~is_train], log.decision[~is_train])
+        time_start = time.perf_counter()
+        model = fit(log_train)
+        time_fit = time.perf_counter() - time_start
+
+        match = play_against_random(PolicyPlayer(model), self.cnt_games, self.cnt_steps)
+
+        print(f'Self-play:         {time_generate:.1f}s, {cnt_decision} decisions logged, '
+              f'{time_generate / max(cnt_decision, 1) * 1e3:.1f}ms per teacher decision')
+        print(f'Fit:               {time_fit:.2f}s')
+        print(f'Agreement:         {self.get_agreement(model, log_test):.0%} of the held out teacher decisions')
+        print_match(match)
+
+
+def main() -> None:
+    cnt_games_train, max_playouts, cnt_games, cnt_steps = parse_args(
+        {'cnt_games_train': 4, 'max_playouts': 100, 'cnt_games': 20, 'cnt_steps': 1000})
+    DogPolicyBenchmark(cnt_games_train=cnt_games_train, max_playouts=max_playouts, cnt_games=cnt_games,
+                       cnt_steps=cnt_steps).run()
+
+
+if __name__ == '__main__':
+    main()
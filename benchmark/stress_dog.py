@@ -0,0 +1,119 @@
+# runcmd: python benchmark/stress_dog.py [cnt_games] [cnt_steps] [cnt_threads]
+
+import sys
+import time
+import random
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from dog_bench import parse_args
+from server.py.dog import Dog, GamePhase
+
+
+class GameRun:
+    """ One seeded Dog game played by a seeded random player, step by step """
+
+    def __init__(self, seed: int) -> None:
+        self.seed = seed
+        self.game = Dog(seed=seed)
+        self.rng_player = random.Random(seed + 1)
+        self.hasher = hashlib.sha256()
+        self.cnt_steps = 0
+        self.error: Optional[str] = None
+
+    @property
+    def is_done(self) -> bool:
+        return self.error is not None or self.game.get_state().phase == GamePhase.FINISHED
+
+    def step(self) -> None:
+        if self.is_done:
+            return
+        try:
+            list_action = self.game.get_list_action()
+            action = self.rng_player.choice(list_action) if list_action else None
+            self.hasher.update(b'None' if action is None else action.model_dump_json().encode())
+            self.game.apply_action(action)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # a rule error is part of the game's outcome, the replay must hit it too
+            self.error = f'{type(e).__name__}: {e}'
+        self.cnt_steps += 1
+
+    def fingerprint(self) -> str:
+        hasher = self.hasher.copy()
+        hasher.update(self.game.get_state().model_dump_json().encode())
+        hasher.update(str(self.error).encode())
+        return hasher.hexdigest()
+
+
+class DogStressTest:
+
+    COLOR_OKAY = '\033[92m'
+    COLOR_FAIL = '\033[91m'
+    COLOR_ENDC = '\033[0m'
+
+    def __init__(self, cnt_games: int, cnt_steps: int, cnt_threads: int) -> None:
+        self.cnt_games = cnt_games
+        self.cnt_steps = cnt_steps
+        self.cnt_threads = cnt_threads
+
+    def run_interleaved(self) -> List[GameRun]:
+        """ Play all games in one process, advancing them one step at a time in random order """
+        list_run = [GameRun(seed) for seed in range(self.cnt_games)]
+        rng_order = random.Random(-1)
+        with ThreadPoolExecutor(max_workers=self.cnt_threads) as pool:
+            for _ in range(self.cnt_steps):
+                list_order = list_run.copy()
+                rng_order.shuffle(list_order)
+                if self.cnt_threads > 1:
+                    list(pool.map(GameRun.step, list_order))
+                else:
+                    for run in list_order:
+                        run.step()
+        return list_run
+
+    def run_isolated(self, seed: int, cnt_steps: int) -> GameRun:
+        """ Replay a single game on its own """
+        run = GameRun(seed)
+        for _ in range(cnt_steps):
+            run.step()
+        return run
+
+    def run(self) -> bool:
+        print('--- Dog Stress Test ---')
+        print(f'Games:   {self.cnt_games}')
+        print(f'Steps:   {self.cnt_steps}')
+        print(f'Threads: {self.cnt_threads}')
+        print()
+
+        time_start = time.perf_counter()
+        list_run = self.run_interleaved()
+        time_interleaved = time.perf_counter() - time_start
+
+        list_mismatch = []
+        for run in list_run:
+            replay = self.run_isolated(run.seed, run.cnt_steps)
+            if replay.fingerprint() != run.fingerprint():
+                list_mismatch.append(run.seed)
+
+        cnt_steps_total = sum(run.cnt_steps for run in list_run)
+        cnt_errors = sum(1 for run in list_run if run.error is not None)
+        print(f'Interleaved: {cnt_steps_total} steps in {time_interleaved:.1f}s')
+        print(f'Games ending with a rule error: {cnt_errors}')
+        if list_mismatch:
+            print(f'{self.COLOR_FAIL}FAIL{self.COLOR_ENDC}: '
+                  f'{len(list_mismatch)} games differ from their isolated replay')
+            print(f'Seeds: {list_mismatch[:20]}')
+            return False
+        print(f'{self.COLOR_OKAY}OKAY{self.COLOR_ENDC}: all {len(list_run)} games match their isolated replay')
+        return True
+
+
+def main() -> None:
+    cnt_games, cnt_steps, cnt_threads = parse_args({'cnt_games': 2000, 'cnt_steps': 50, 'cnt_threads': 1})
+    stress_test = DogStressTest(cnt_games=cnt_games, cnt_steps=cnt_steps, cnt_threads=cnt_threads)
+    sys.exit(0 if stress_test.run() else 1)
+
+
+if __name__ == '__main__':
+    main()
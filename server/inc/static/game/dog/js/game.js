@@ -123,6 +123,12 @@ Game.prototype.are_cards_equal = function (card_a, card_b) {
 	return card_a.suit==card_b.suit && card_a.rank==card_b.rank;
 }
 
+Game.prototype.get_cnt_card = function (p) {
+	// the cards of the other players are only counted in a player view (cnt_card)
+	var player = this.player_state.list_player[p];
+	return player.cnt_card!=null ? player.cnt_card : player.list_card.length;
+}
+
 Game.prototype.init = function () {
 	this.canvas = document.getElementById(this.config.canvas_id);
 	this.ctx = this.canvas.getContext("2d");
@@ -348,8 +354,8 @@ Game.prototype.calc_objects_rect = function() {
 	for(var p=0; p<4; p++) {
 		this.dict_player_card_rect.list_player[p] = [];
 		if(p%2==0) {
-			for(var i=0; i<this.player_state.list_player[p].list_card.length; i++) {
-				card_x = this.board_center_x - (this.player_state.list_player[p].list_card.length*(card_w + 10) - 10)/2 + i*(card_w + 10);
+			for(var i=0; i<this.get_cnt_card(p); i++) {
+				card_x = this.board_center_x - (this.get_cnt_card(p)*(card_w + 10) - 10)/2 + i*(card_w + 10);
 				if(p==0) {
 					card_y = this.board_y + this.board_width + card_padding;
 				} else {
@@ -358,8 +364,8 @@ Game.prototype.calc_objects_rect = function() {
 				this.dict_player_card_rect.list_player[p][i] = [card_x, card_y, card_w, card_h];
 			}
 		} else {
-			for(var i=0; i<this.player_state.list_player[p].list_card.length; i++) {
-				card_y = this.board_center_x + (this.player_state.list_player[p].list_card.length*(card_w + 10) - 10)/2 - i*(card_w + 10) - card_w;
+			for(var i=0; i<this.get_cnt_card(p); i++) {
+				card_y = this.board_center_x + (this.get_cnt_card(p)*(card_w + 10) - 10)/2 - i*(card_w + 10) - card_w;
 				if(p==1) {
 					card_x = this.board_y + this.board_width + card_padding;
 				} else {
@@ -945,8 +951,8 @@ Game.prototype.render = function () {
 
 		var is_active_and_you = this.player_state.idx_player_active==this.player_state.idx_player_you && p==this.idx_player_you;
 		if(p%2==0) {
-			for(var i=0; i<this.player_state.list_player[p].list_card.length; i++) {
-				var card = this.player_state.list_player[p].list_card[i];
+			for(var i=0; i<this.get_cnt_card(p); i++) {
+				var card = this.player_state.list_player[p].list_card[i] || {suit:'', rank:'BCK'};  // hidden cards are only counted
 				var rect = this.dict_player_card_rect.list_player[p][i];
 				var status = is_active_and_you && this.list_card_selectable[i] ? (i==this.selection_state.idx_card_hover || i==this.selection_state.idx_card_selected ? 2 : 1) : 0;
 				var elevation = is_active_and_you && i==this.selection_state.idx_card_selected && !this.player_state.bool_card_exchanged ? -25 : 0;
@@ -975,8 +981,8 @@ Game.prototype.render = function () {
 			this.ctx.save();
 			this.ctx.translate(this.board_center_x, this.board_center_y);
 			this.ctx.rotate(-Math.PI / 2);
-			for(var i=0; i<this.player_state.list_player[p].list_card.length; i++) {
-				var card = this.player_state.list_player[p].list_card[i];
+			for(var i=0; i<this.get_cnt_card(p); i++) {
+				var card = this.player_state.list_player[p].list_card[i] || {suit:'', rank:'BCK'};  // hidden cards are only counted
 				var rect = this.dict_player_card_rect.list_player[p][i];
 				var status = is_active_and_you && this.list_card_selectable[i] ? (i==this.selection_state.idx_card_hover || i==this.selection_state.idx_card_selected ? 2 : 1) : 0;
 				var elevation = is_active_and_you && i==this.selection_state.idx_card_selected && !this.player_state.bool_card_exchanged ? -25 : 0;
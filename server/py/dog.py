@@ -1,153 +1,109 @@
 import random
-from enum import Enum
-from typing import List, Optional, ClassVar, Union, Tuple
-from pydantic import BaseModel
+from typing import Any, ClassVar, Dict, Iterator, List, Optional, Tuple, cast
+import numpy as np
+import numpy.typing as npt
+from pydantic import BaseModel, ConfigDict
 from server.py.game import Game, Player
-
-class Card(BaseModel):
-    suit: str  # card suit (color)
-    rank: str  # card rank
-
-
-class Marble(BaseModel):
-    pos: int       # position on board (0 to 95)
-    is_save: bool  # true if marble was moved out of kennel and was not yet moved
-
-
-class PlayerState(BaseModel):
-    name: str                  # name of player
-    list_card: List[Card]      # list of cards
-    list_marble: List[Marble]  # list of marbles
-    teamMate: str
-
+from server.py import dog_seven as seven
+from server.py import dog_tables as tables
+from server.py.dog_action_space import ActionSpace
+from server.py.dog_board import BoardIndex
+from server.py.dog_expand import Successor, expand_actions
+from server.py.dog_journal import JournalObserver, UndoJournal
+from server.py.dog_zobrist import ZobristHash
+from server.py.dog_movecache import MarbleMoves, MoveCache, MoveCacheStats, get_marble_key
+from server.py.dog_state import Card, CardPile, DECK, EngineMarble, EnginePlayer, EngineState, GamePhase, GameState, \
+    Marble, PlayerState
 
 class Action(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     card: Optional[Card] = None           # Make optional
     pos_from: Optional[int] = None        # Make optional
     pos_to: Optional[int] = None          # Make optional
     card_swap: Optional[Card] = None      # Make optional)
 
-class GamePhase(str, Enum):
-    SETUP = 'setup'            # before the game has started
-    RUNNING = 'running'        # while the game is running
-    FINISHED = 'finished'      # when the game is finished
-
-
-class GameState(BaseModel):
-
-    LIST_SUIT: ClassVar[List[str]] = ['♠', '♥', '♦', '♣']  # 4 suits (colors)
-    LIST_RANK: ClassVar[List[str]] = [
-        '2', '3', '4', '5', '6', '7', '8', '9', '10',      # 13 ranks + Joker
-        'J', 'Q', 'K', 'A', 'JKR'
-    ]
-    LIST_CARD: ClassVar[List[Card]] = [
-        # 2: Move 2 spots forward
-        Card(suit='♠', rank='2'), Card(suit='♥', rank='2'), Card(suit='♦', rank='2'), Card(suit='♣', rank='2'),
-        # 3: Move 3 spots forward
-        Card(suit='♠', rank='3'), Card(suit='♥', rank='3'), Card(suit='♦', rank='3'), Card(suit='♣', rank='3'),
-        # 4: Move 4 spots forward or back
-        Card(suit='♠', rank='4'), Card(suit='♥', rank='4'), Card(suit='♦', rank='4'), Card(suit='♣', rank='4'),
-        # 5: Move 5 spots forward
-        Card(suit='♠', rank='5'), Card(suit='♥', rank='5'), Card(suit='♦', rank='5'), Card(suit='♣', rank='5'),
-        # 6: Move 6 spots forward
-        Card(suit='♠', rank='6'), Card(suit='♥', rank='6'), Card(suit='♦', rank='6'), Card(suit='♣', rank='6'),
-        # 7: Move 7 single steps forward
-        Card(suit='♠', rank='7'), Card(suit='♥', rank='7'), Card(suit='♦', rank='7'), Card(suit='♣', rank='7'),
-        # 8: Move 8 spots forward
-        Card(suit='♠', rank='8'), Card(suit='♥', rank='8'), Card(suit='♦', rank='8'), Card(suit='♣', rank='8'),
-        # 9: Move 9 spots forward
-        Card(suit='♠', rank='9'), Card(suit='♥', rank='9'), Card(suit='♦', rank='9'), Card(suit='♣', rank='9'),
-        # 10: Move 10 spots forward
-        Card(suit='♠', rank='10'), Card(suit='♥', rank='10'), Card(suit='♦', rank='10'), Card(suit='♣', rank='10'),
-        # Jake: A marble must be exchanged
-        Card(suit='♠', rank='J'), Card(suit='♥', rank='J'), Card(suit='♦', rank='J'), Card(suit='♣', rank='J'),
-        # Queen: Move 12 spots forward
-        Card(suit='♠', rank='Q'), Card(suit='♥', rank='Q'), Card(suit='♦', rank='Q'), Card(suit='♣', rank='Q'),
-        # King: Start or move 13 spots forward
-        Card(suit='♠', rank='K'), Card(suit='♥', rank='K'), Card(suit='♦', rank='K'), Card(suit='♣', rank='K'),
-        # Ass: Start or move 1 or 11 spots forward
-        Card(suit='♠', rank='A'), Card(suit='♥', rank='A'), Card(suit='♦', rank='A'), Card(suit='♣', rank='A'),
-        # Joker: Use as any other card you want
-        Card(suit='', rank='JKR'), Card(suit='', rank='JKR'), Card(suit='', rank='JKR')
-    ] * 2
-
-    cnt_player: int = 4                # number of players (must be 4)
-    phase: GamePhase                   # current phase of the game
-    cnt_round: int                     # current round
-    bool_card_exchanged: bool          # true if cards was exchanged in round
-    idx_player_started: int            # index of player that started the round
-    idx_player_active: int             # index of active player in round
-    list_player: List[PlayerState]     # list of players
-    list_card_draw: List[Card]         # list of cards to draw
-    list_card_discard: List[Card]      # list of cards discarded
-    card_active: Optional[Card]        # active card (for 7 and JKR with sequence of actions)
+    @classmethod
+    def of(cls, card: Card, pos_from: Optional[int], pos_to: Optional[int]) -> 'Action':
+        """ The shared instance of a marble move (actions are immutable, making one is the expensive part) """
+        key = (card, pos_from, pos_to)
+        action = _INTERNED_ACTIONS.get(key)
+        if action is None:
+            action = _INTERNED_ACTIONS.setdefault(key, cls(card=card, pos_from=pos_from, pos_to=pos_to))
+        return action
 
-    @staticmethod
-    def get_card_steps(rank: str) -> Union[int, Tuple[int, ...]]:
-        rank_steps: dict[str, Union[int, Tuple[int,...]]] = {
-            '2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '8': 8, '9': 9, '10': 10,
-            '7': (1, 2, 3, 4, 5, 6, 7),
-            'Q': 12,
-            'K': 13,
-            'A': (1, 11)
-        }
-        if rank in rank_steps:
-            return rank_steps[rank]
-        return 0
+    @property
+    def key(self) -> Tuple[Optional[str], Optional[str], Optional[int], Optional[int], Optional[str], Optional[str]]:
+        """ Compact canonical form of the action, used for hashing and comparing """
+        card, card_swap = self.card, self.card_swap
+        return (None if card is None else card.suit, None if card is None else card.rank,
+                self.pos_from, self.pos_to,
+                None if card_swap is None else card_swap.suit, None if card_swap is None else card_swap.rank)
 
-    @staticmethod
-    def is_valid_move(pos_to: int, marbles: List[Marble]) -> bool:
-        """ Validate if a move from pos_from to pos_to is allowed """
-        # check if own marble occupies spot
-        for marble in marbles:
-            if int(marble.pos) == pos_to:
-                return False
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if isinstance(other, Action):
+            return self.key == other.key
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+
+_INTERNED_ACTIONS: Dict[Tuple[Card, Optional[int], Optional[int]], Action] = {}
 
-        return True
 
 # pylint: disable=too-many-public-methods
 class Dog(Game):
 
-    SEVEN_STEPS_COUNTER: ClassVar[int] = 7
+    START_POSITIONS: ClassVar[dict] = tables.START_POSITIONS
+
+    KENNEL: ClassVar[dict] = tables.KENNEL
 
-    EXCHANGE_COUNTER: ClassVar[int] = 0
+    ENDZONE: ClassVar[dict] = tables.ENDZONE
 
-    START_POSITIONS: ClassVar[dict] = {
-        "Blue": 0,
-        "Green": 16,
-        "Red": 32,
-        "Yellow": 48
-    }
+    # Cards moving a marble a fixed number of steps forward (get_board_move_actions)
+    SIMPLE_RANKS: ClassVar[List[str]] = ["2", "3", "4", "5", "6", "8", "9", "10", "Q"]
+    # Cards moving a marble along the ring: the simple ones, the K and the A (get_board_move_actions)
+    RING_RANKS: ClassVar[List[str]] = SIMPLE_RANKS + ["K", "A"]
 
-    KENNEL: ClassVar[dict] = {
-        "Blue": [64, 65, 66, 67],
-        "Green": [72, 73, 74, 75],
-        "Red": [80, 81, 82, 83],
-        "Yellow": [88, 89, 90, 91]
-    }
+    # Cards a Joker can stand for, in the order their substitute actions are listed
+    JOKER_RANKS: ClassVar[List[str]] = ['2', '3', '4', '5', '6', '8', '9', '10', 'Q', 'J', 'K', 'A', '7']
 
-    ENDZONE: ClassVar[dict] = {
-        "Blue": [68, 69, 70, 71],
-        "Green": [76, 77, 78, 79],
-        "Red": [84, 85, 86, 87],
-        "Yellow": [92, 93, 94, 95]
-    }
+    # Stable integer ids for all actions, see ActionSpace for the layout
+    ACTION_SPACE: ClassVar[ActionSpace] = ActionSpace([(card.suit, card.rank) for card in GameState.LIST_CARD])
 
-    def __init__(self) -> None:
+    # Number of applied actions undo can take back
+    UNDO_DEPTH: ClassVar[int] = 256
+
+    def __init__(self, seed: Optional[int] = None) -> None:
         """ Game initialization (set_state call not necessary, we expect 4 players) """
-        # Shuffle the cards
-        shuffled_cards = random.sample(GameState.LIST_CARD, len(GameState.LIST_CARD))
+        # Every game owns its random generator and mid-turn rule state, so that
+        # many games can share one process (or a thread pool) without interfering
+        self.rng = random.Random(seed)
+        self.seven_steps_counter = 0               # steps left of the 7 currently played
+        self.exchange_counter = 0                  # cards exchanged so far in this round
+        self.seven_start: Optional[int] = None     # journal group of the first step of the 7 being played
+        self._board: Optional[BoardIndex] = None   # occupancy index, see _get_board
+        # every change made by apply_action goes through the journal, so that undo can take it back
+        self._journal = UndoJournal(self._place_marble, Dog.UNDO_DEPTH)
+        self._zobrist: Optional[ZobristHash] = None  # see state_hash
+        self._moves = MoveCache()                    # see get_list_action
+        self._views: Dict[Optional[int], GameState] = {}  # see get_player_view
 
-        Dog.SEVEN_STEPS_COUNTER = 0
+        # Shuffle the cards
+        shuffled_cards = CardPile(DECK)
+        self.rng.shuffle(shuffled_cards.ids)
 
         # Setup the board with 95 places and initial marble positions
-        blue_marbles = [Marble(pos=i, is_save=False) for i in Dog.KENNEL["Blue"]]
-        green_marbles = [Marble(pos=i, is_save=False) for i in Dog.KENNEL["Green"]]
-        red_marbles = [Marble(pos=i, is_save=False) for i in Dog.KENNEL["Red"]]
-        yellow_marbles = [Marble(pos=i, is_save=False) for i in Dog.KENNEL["Yellow"]]
+        blue_marbles = [EngineMarble(pos=i, is_save=False) for i in Dog.KENNEL["Blue"]]
+        green_marbles = [EngineMarble(pos=i, is_save=False) for i in Dog.KENNEL["Green"]]
+        red_marbles = [EngineMarble(pos=i, is_save=False) for i in Dog.KENNEL["Red"]]
+        yellow_marbles = [EngineMarble(pos=i, is_save=False) for i in Dog.KENNEL["Yellow"]]
 
         # Initialize players
-        self.state = GameState(
+        self.state: EngineState = EngineState(
             cnt_player=4,
             phase=GamePhase.SETUP,
             cnt_round=0,
@@ -155,35 +111,132 @@ class Dog(Game):
             idx_player_started=0,                 #random.randint(0, 3),  # Randomly select start player
             idx_player_active=0,
             list_player=[
-                PlayerState(name="Blue", list_card=[], list_marble=blue_marbles, teamMate = "Green"),
-                PlayerState(name="Green", list_card=[], list_marble=green_marbles, teamMate = "Blue"),
-                PlayerState(name="Red", list_card=[], list_marble=red_marbles, teamMate = "Yellow"),
-                PlayerState(name="Yellow", list_card=[], list_marble=yellow_marbles, teamMate= "Red"),
+                EnginePlayer(name="Blue", list_card=CardPile(), list_marble=blue_marbles, teamMate = "Green"),
+                EnginePlayer(name="Green", list_card=CardPile(), list_marble=green_marbles, teamMate = "Blue"),
+                EnginePlayer(name="Red", list_card=CardPile(), list_marble=red_marbles, teamMate = "Yellow"),
+                EnginePlayer(name="Yellow", list_card=CardPile(), list_marble=yellow_marbles, teamMate= "Red"),
             ],
             list_card_draw=shuffled_cards,
-            list_card_discard=[],
+            list_card_discard=CardPile(),
             card_active=None
         )
 
          # Deal 6 cards to each player directly in the init
         num_cards_per_player = 6  # Example number of cards per player
         for player in self.state.list_player:
-            player.list_card = [self.state.list_card_draw.pop() for _ in range(num_cards_per_player)]
+            for _ in range(num_cards_per_player):
+                player.list_card.append(self.state.list_card_draw.pop())
 
         # Transition to the running phase, since we're starting the game directly
         self.state.phase = GamePhase.RUNNING
         self.state.cnt_round = 1
         self.state.idx_player_active = self.state.idx_player_started
 
-        self.original_state_before_7: Optional[GameState] = None
-
     def set_state(self, state: GameState) -> None:
-        """ Set the game to a given state """
-        self.state = state
+        """ Set the game to a given state. The game goes on with this object, so the caller sees the
+        changes of the next actions (the engine handles models and engine states alike). """
+        # Use the canonical card instances, so that comparing cards is mostly an identity check
+        for player in state.list_player:
+            player.list_card = [card.interned() for card in player.list_card]
+        state.list_card_draw = [card.interned() for card in state.list_card_draw]
+        state.list_card_discard = [card.interned() for card in state.list_card_discard]
+        if state.card_active is not None:
+            state.card_active = state.card_active.interned()
+        self.state = cast(EngineState, state)  # a GameState has the same attributes
+        self._journal.clear()  # the actions applied so far do not lead to this state
+        self.mark_state_changed()
+
+    def mark_state_changed(self) -> None:
+        """ Tell the game that game.state was changed from outside (e.g. marbles moved by a test), so that
+        the board index, the hash and the player views are built again from the state when next used """
+        self._board = self._zobrist = None
+        self._journal.observers.clear()
+        self._views = {}
 
     def get_state(self) -> GameState:
-        """ Get the complete, unmasked game state """
-        return self.state
+        """ Get the complete, unmasked game state (a snapshot, changing it does not change the game) """
+        return self._to_model(self.state)
+
+    @staticmethod
+    def _to_model(state: EngineState, hide_cards: bool = False) -> GameState:
+        """ The pydantic model of an engine state (with hide_cards, the hands and the draw pile are only counted) """
+        return GameState(
+            cnt_player=state.cnt_player, phase=state.phase, cnt_round=state.cnt_round,
+            bool_card_exchanged=state.bool_card_exchanged, idx_player_started=state.idx_player_started,
+            idx_player_active=state.idx_player_active,
+            list_player=[PlayerState(name=player.name, list_card=[] if hide_cards else list(player.list_card),
+                                     teamMate=player.teamMate, cnt_card=len(player.list_card) if hide_cards else None,
+                                     list_marble=[Marble(pos=marble.pos, is_save=marble.is_save)
+                                                  for marble in player.list_marble])
+                         for player in state.list_player],
+            list_card_draw=[] if hide_cards else list(state.list_card_draw),
+            cnt_card_draw=len(state.list_card_draw) if hide_cards else None,
+            list_card_discard=list(state.list_card_discard), card_active=state.card_active)
+
+    def clone(self) -> 'Dog':
+        """ Independent copy of the game: state, rule counters and random generator. The undo journal
+        is not copied, except for the steps of a 7 being played (so that it can still be taken back). """
+        # pylint: disable=protected-access
+        game = Dog.__new__(Dog)
+        game.rng = random.Random(0)  # a fixed seed is cheap, the state is replaced anyway
+        game.rng.setstate(self.rng.getstate())
+        game.seven_steps_counter = self.seven_steps_counter
+        game.exchange_counter = self.exchange_counter
+        game.seven_start = self.seven_start
+        game._board = None
+        game._zobrist = None
+        game._moves = MoveCache()
+        game._views = {}
+        if self.seven_start is None:
+            game.state = EngineState.copy_of(self.state)
+            game._journal = UndoJournal(game._place_marble, Dog.UNDO_DEPTH)
+            game._journal.cnt_begun = self._journal.cnt_begun
+        else:
+            memo: Dict[int, Any] = {id(self): game, id(self.rng): game.rng}
+            game.state = EngineState.copy_of(self.state, memo)
+            game._journal = self._journal.clone(game._place_marble, memo, self.seven_start)
+        return game
+
+    def state_hash(self) -> int:
+        """ 64 bit Zobrist hash of the position (marbles, hands, turn, active card and the 7 being played),
+        equal positions have equal hashes. It is kept up to date by every change apply_action and undo make,
+        changes from outside (e.g. to the marbles of game.state) need a set_state or mark_state_changed. """
+        zobrist = self._zobrist
+        if zobrist is None or zobrist.state is not self.state:
+            zobrist_old, zobrist = zobrist, ZobristHash(self)
+            self._observe(zobrist_old, zobrist)
+            self._zobrist = zobrist
+        return zobrist.value
+
+    def _get_board(self) -> BoardIndex:
+        """ Occupancy index and field bitmasks of the current state. Every move the game makes itself updates
+        it (_place_marble), is_save changes reach it through the undo journal. set_state and mark_state_changed
+        drop it (it is also built anew for a state assigned to game.state). """
+        board = self._board
+        if board is None or board.list_player is not self.state.list_player:
+            board_old, board = board, BoardIndex(self.state.list_player, Dog.KENNEL, Dog.ENDZONE)
+            self._observe(board_old, board)
+            self._board = board
+        return board
+
+    def _observe(self, observer_old: Optional[JournalObserver], observer_new: JournalObserver) -> None:
+        """ Let observer_new follow the changes of the undo journal instead of observer_old """
+        observers = self._journal.observers
+        if observer_old in observers:
+            observers.remove(observer_old)
+        observers.append(observer_new)
+
+    def _set_marble_pos(self, marble: EngineMarble, pos: int) -> None:
+        """ Move a marble, recorded in the undo journal """
+        self._journal.move(marble, pos)
+
+    def _place_marble(self, marble: EngineMarble, pos: int) -> None:
+        """ Move a marble and keep the occupancy index up to date """
+        board = self._get_board()
+        location = board.locate(marble)
+        marble.pos = pos
+        if location is not None:
+            board.move(location[0], location[1], pos)
 
     def print_state(self) -> None:
         """ Print the current game state """
@@ -209,10 +262,11 @@ class Dog(Game):
 
     def get_list_action(self) -> List[Action]:
         """
-        Get a list of possible actions for the active player.
+        Get a list of possible actions for the active player (made of cached sections, see get_move_cache_stats).
+        Listing does not change the game.
         Returns: actions -> list
         """
-        state = self.get_state()
+        state = self.state
         player = state.list_player[state.idx_player_active]
 
         # Handle teammate's marbles if the player's own marbles are all in the finish zone
@@ -226,60 +280,135 @@ class Dog(Game):
         # Handle the player's own actions
         return self._get_player_actions(player)
 
-    def _all_marbles_in_finish(self, player: PlayerState) -> bool:
+    def get_action_id(self, action: Optional[Action]) -> int:
+        """ Integer id of an action (0 for None) """
+        action_id = Dog.ACTION_SPACE.encode(None if action is None else action.key)
+        if action_id is None:
+            raise ValueError(f"Action {action} has no id in the action space")
+        return action_id
+
+    def get_action_from_id(self, action_id: int) -> Optional[Action]:
+        """ Action with the given integer id (None for id 0) """
+        key = Dog.ACTION_SPACE.decode(action_id)
+        if key is None:
+            return None
+        suit, rank, pos_from, pos_to, swap_suit, swap_rank = key
+        card = Card.of(suit, rank) if suit is not None and rank is not None else None
+        card_swap = Card.of(swap_suit, swap_rank) if swap_suit is not None and swap_rank is not None else None
+        return Action(card=card, pos_from=pos_from, pos_to=pos_to, card_swap=card_swap)
+
+    def get_legal_action_mask(self) -> npt.NDArray[np.bool_]:
+        """
+        Boolean vector over the action space, True for every action of get_list_action.
+        If there is no action, only the pass (id 0) is set.
+        """
+        mask = np.zeros(len(Dog.ACTION_SPACE), dtype=np.bool_)
+        list_action = self.get_list_action()
+        if not list_action:
+            mask[Dog.ACTION_SPACE.id_pass] = True
+            return mask
+        mask[[self.get_action_id(action) for action in list_action]] = True
+        return mask
+
+    def get_move_cache_stats(self) -> MoveCacheStats:
+        """ How often sections of the listings were reused and how often they were computed (see MoveCache) """
+        return self._moves.get_stats()
+
+    def apply_action_id(self, action_id: int) -> None:
+        """ Apply the action with the given integer id (0 applies None) """
+        self.apply_action(self.get_action_from_id(int(action_id)))
+
+    def undo(self) -> None:
+        """ Take back the last applied action. Only the changes it made are restored, so this is
+        much cheaper than copying the state before every action (e.g. for searching players). """
+        if not self._journal.can_undo():
+            raise ValueError("There is no applied action to undo")
+        self._journal.undo()
+        self._views.clear()
+
+    def expand(self) -> List[Successor]:
+        """ Every legal action (the pass if there is none) with a summary of the state it leads to: marble
+        positions, marbles sent home, progress per player and whether the game is over. The actions are
+        applied to this game and undone again, which is much cheaper than a copy per action. """
+        return expand_actions(self)
+
+    def _all_marbles_in_finish(self, player: EnginePlayer) -> bool:
         """Check if all marbles of the player are in the finish zone."""
         return all(int(marble.pos) >= Dog.ENDZONE[player.name][0] for marble in player.list_marble)
 
-    def _get_partner_actions(self, player: PlayerState, state: GameState) -> List[Action]:
-        """Generate actions for partner's marbles when the active player's marbles are all in the finish zone."""
+    def _get_partner_actions(self, player: EnginePlayer, state: EngineState) -> List[Action]:
+        """Generate actions for partner's marbles when the active player's marbles are all in the finish zone.
+        The partner's unprotected marbles on the ring move along it like its own. The 7 is left out, its
+        steps are only split over the own marbles (see _handle_seven_action)."""
         actions = []
         idx_partner = (state.idx_player_active + 2) % len(state.list_player)
         partner = state.list_player[idx_partner]
+        partner_ring = self._get_board().ring_mask[idx_partner]
+        moves_of_colour = tables.MOVE_TABLE[tables.IDX_COLOUR[partner.name]]
 
         for card in player.list_card:
-            steps = GameState.get_card_steps(card.rank)
-            possible_steps = steps if isinstance(steps, tuple) else (steps,)
+            if card.rank == "7":
+                continue
+            possible_steps = tables.CARD_STEPS.get(card.rank, ())
 
             for marble in partner.list_marble:
-                if marble.is_save:
-                    continue  # Skip marbles in save zones
+                if marble.is_save or not 0 <= marble.pos < tables.CNT_RING:
+                    continue  # Skip marbles in save zones, the kennel and the finish
 
                 for step in possible_steps:
-                    pos_to = int(marble.pos) + step
-                    if GameState.is_valid_move(pos_to, partner.list_marble):
+                    pos_to = moves_of_colour[marble.pos][step + tables.STEP_OFFSET].pos_to
+                    if pos_to is not None and not partner_ring >> pos_to & 1:
                         actions.append(Action(card=card, pos_from=int(marble.pos), pos_to=pos_to))
 
         return actions
 
-    def _get_exchange_actions(self, player: PlayerState) -> List[Action]:
+    def _get_exchange_actions(self, player: EnginePlayer) -> List[Action]:
         """Generate actions for card exchange."""
         return [Action(card=card, pos_from=None, pos_to=None) for card in player.list_card]
 
-    def _get_player_actions(self, player: PlayerState) -> List[Action]:
+    def _get_player_actions(self, player: EnginePlayer) -> List[Action]:
         """Generate actions for the active player's own marbles."""
-        actions = []
-
+        actions: List[Action] = []
+        moves_added = False  # kennel exits and board moves cover the whole hand
+
+        # While a 7 is played (or a Joker was swapped for one) only its steps can be moved
+        card_active = self.state.card_active
+        if card_active is not None and card_active.rank == '7':
+            return self.get_seven_actions(player, card_active)
+
+        # 7s and Jakes of different suits move the same marbles, their moves are only generated once per rank
+        moves_by_rank: Dict[str, List[Tuple[Optional[int], Optional[int]]]] = {}
+        # a 7 listed after the board moves sees the marbles on their start as save if a simple card is held,
+        # as apply_action will leave them (see _mark_start_save), one listed before sees them as they are
+        start_save = False
         for card in player.list_card:
-            if card.rank == '7':  # Special case for card "7"
-                actions.extend(self.get_seven_actions(player, card))
-            elif card.rank == 'J':  # Jake card
-                actions.extend(self.get_jake_actions(player, card))
-            else:
-                if self.state.card_active is None:
-                    actions.extend(self.get_kennel_exit_actions(player))
-                    actions.extend(self.get_board_move_actions(player))
+            if card.rank in ('7', 'J'):
+                moves = moves_by_rank.get(card.rank)
+                if moves is None:
+                    moves = moves_by_rank[card.rank] = self._get_rank_moves(player, card, start_save)
+                actions.extend(Action.of(card, pos_from, pos_to) for pos_from, pos_to in moves)
+            elif self.state.card_active is None and not moves_added:
+                actions.extend(self.get_kennel_exit_actions(player))
+                actions.extend(self.get_board_move_actions(player))
+                moves_added = True
+                start_save = any(card.rank in Dog.SIMPLE_RANKS for card in player.list_card)
 
         return self._remove_duplicate_actions(actions)
 
+    def _get_rank_moves(self, player: EnginePlayer, card: Card,
+                        start_save: bool = False) -> List[Tuple[Optional[int], Optional[int]]]:
+        """ Moves (pos_from, pos_to) of a 7 or a Jake. The Jake swaps only depend on the marbles and are
+        shared by every hand with the same marbles. """
+        if card.rank == '7':
+            return [(action.pos_from, action.pos_to) for action in self.get_seven_actions(player, card, start_save)]
+        return self._moves.get_section(('J', self.state.idx_player_active, get_marble_key(self.state)), lambda: [
+            (action.pos_from, action.pos_to) for action in self.get_jake_actions(player, card)])
+
     def _remove_duplicate_actions(self, actions: List[Action]) -> List[Action]:
-        """Remove duplicate actions from the list."""
-        unique_actions = []
-        for action in actions:
-            if action not in unique_actions:
-                unique_actions.append(action)
-        return unique_actions
-
-    def get_kennel_exit_actions(self, player: PlayerState) -> List[Action]:
+        """Remove duplicate actions from the list (keeps the first of each, in order)."""
+        return list(dict.fromkeys(actions))
+
+    def get_kennel_exit_actions(self, player: EnginePlayer) -> List[Action]:
         """ Generate actions to move marbles out of the kennel. """
         actions = []
         player_kennel = Dog.KENNEL[player.name]
@@ -291,41 +420,22 @@ class Dog(Game):
         )
 
         if not starting_position_occupied:
-            for card in player.list_card:
-                if card.rank in ["K", "A"]:
-                    marbles_in_kennel = [
-                        marble for marble in player.list_marble if marble.pos in map(int, player_kennel)
-                    ]
-                    if marbles_in_kennel:
-                        actions.append(
-                            Action(
-                                card=card,
-                                pos_from=int(marbles_in_kennel[0].pos),
-                                pos_to=player_start_position
-                            )
-                        )
-                elif card.rank == "JKR":
-                    marbles_in_kennel = [
-                        marble for marble in player.list_marble if marble.pos in map(int, player_kennel)
-                    ]
-                    if marbles_in_kennel:
-                        actions.append(
-                            Action(
-                                card=card,
-                                pos_from=int(marbles_in_kennel[0].pos),
-                                pos_to=player_start_position
-                            )
-                        )
-                        self.add_substitute_actions(actions, card)
+            marbles_in_kennel = [marble for marble in player.list_marble if marble.pos in player_kennel]
+            if marbles_in_kennel:
+                pos_from = int(marbles_in_kennel[0].pos)
+                for card in player.list_card:
+                    # the K and A substitutes of a Joker follow from get_board_move_actions
+                    if card.rank in ("K", "A", "JKR"):
+                        actions.append(Action(card=card, pos_from=pos_from, pos_to=player_start_position))
         return actions
 
-    def add_substitute_actions(self, actions: List[Action], card: Card) -> None:
+    def add_substitute_actions(self, actions: List[Action], card: Card, ranks: Tuple[str, ...] = ("K", "A")) -> None:
         """
         Helper function to append substitute actions for a Joker card.
         """
-        for substitute_rank in ["K", "A"]:
+        for substitute_rank in ranks:
             for suit in GameState.LIST_SUIT:
-                substitute_card = Card(suit=suit, rank=substitute_rank)
+                substitute_card = Card.of(suit, substitute_rank)
                 actions.append(
                     Action(
                         card=card,
@@ -335,67 +445,105 @@ class Dog(Game):
                     )
                 )
 
-    def get_board_move_actions(self, player: PlayerState) -> List[Action]:
-        """Generate actions to move marbles on the board."""
-        actions = []
-
-        valid_ranks = ["2", "3", "4", "5", "6", "8", "9", "10", "Q"]
-        other_ranks = ["J", "K", "A", "7"]
-
-        actions.extend(self._get_into_endzone_actions(player))
-        actions.extend(self._move_inside_endzone_actions(player))
+    def get_board_move_actions(self, player: EnginePlayer) -> List[Action]:
+        """Generate actions to move marbles on the board: into the finish, inside it and along the ring.
+        The moves of a marble with a rank are a cached section (see _get_marble_moves)."""
+        board = self._get_board()
+        idx_player = board.idx_player(player)
+        endzone = tables.ENDZONE[player.name]
+        cards = [card for card in player.list_card if card.rank != '7' and tables.CARD_STEPS[card.rank]]
+        ranks = list(dict.fromkeys(card.rank for card in cards))
+        marble_moves = [(int(marble.pos), {rank: self._get_marble_moves(idx_player, marble, rank) for rank in ranks})
+                        for marble in player.list_marble if marble.pos < tables.CNT_RING or marble.pos in endzone]
+
+        actions = self._get_into_endzone_actions(cards, marble_moves)
+        actions.extend(self._move_inside_endzone_actions(cards, marble_moves))
+        joker_added = simple_seen = False
         for card in player.list_card:
-            if card.rank not in valid_ranks and card.rank != "JKR":
-                continue
-
             if card.rank == "JKR":
-                # Generate substitute actions for Joker cards
-                actions.extend(self._generate_joker_actions(player, card, valid_ranks, other_ranks))
-                continue
-
-            steps = GameState.get_card_steps(str(card.rank))
-
-            for marble in player.list_marble:
-                if marble.pos is None or int(marble.pos) < 0:
-                    continue
-
-                pos_from = int(marble.pos)
-                possible_steps = steps if isinstance(steps, tuple) else (steps,)
-
-                for step in possible_steps:
-                    pos_to = pos_from + step
-                    if int(marble.pos) == Dog.START_POSITIONS[player.name]:
-                        marble.is_save = True
-                    if pos_to > 63 or not marble.is_save:
-                        continue
-
-                    if GameState.is_valid_move(pos_to, player.list_marble):
-                        actions.append(Action(card=card, pos_from=int(marble.pos), pos_to=pos_to))
+                # Substitute actions, once for all Jokers of the hand (they are the same card)
+                if not joker_added:
+                    actions.extend(self.iter_joker_actions(player, card, start_save=simple_seen))
+                    joker_added = True
+            elif card.rank in Dog.RING_RANKS:
+                simple_seen = simple_seen or card.rank in Dog.SIMPLE_RANKS
+                actions.extend(Action.of(card, pos_from, pos_to)
+                               for pos_from, moves in marble_moves for pos_to in moves[card.rank].on_ring)
 
         return actions
 
-    def _generate_joker_actions(
-        self, player: PlayerState, joker_card: Card, valid_ranks: List[str], other_ranks: List[str]
-    ) -> List[Action]:
-        """Generate substitute actions for Joker cards."""
-        actions = []
-        for marble in player.list_marble:
-            if marble.pos is None or not 0 <= int(marble.pos) <= 63 or not marble.is_save:
+    def _get_marble_moves(self, idx_player: int, marble: EngineMarble, rank: str) -> MarbleMoves:
+        """ Where a card of the rank takes the marble: into the finish (only marbles that are not save and if
+        no own save marble waits on the start), inside it (not past its end) and along the ring (only save
+        marbles or the ones on their start, never past 63). It is cached under the marble, the rank and the
+        own fields it could reach, so only the moves of marbles that moved or whose way changed and of new
+        ranks are computed. """
+        board = self._get_board()
+        pos, is_save = int(marble.pos), marble.is_save
+        name = board.list_player[idx_player].name
+        pos_start = tables.START_POSITIONS[name]
+        start_blocked = bool(board.save_mask[idx_player] >> pos_start & 1)
+        ring_taken = board.ring_mask[idx_player] & tables.RING_REACH[rank][pos] if pos < tables.CNT_RING else 0
+        finish_taken = board.finish_mask[idx_player]
+
+        def compute() -> MarbleMoves:
+            moves = tables.MOVE_TABLE[tables.IDX_COLOUR[name]][pos]
+            targets = [moves[step + tables.STEP_OFFSET] for step in tables.CARD_STEPS[rank]]
+            lane_bit = board.lane_bit[idx_player]
+            if pos >= tables.CNT_RING:
+                return MarbleMoves((), tuple(move.pos_to for move in targets if move.pos_to is not None
+                                             and not finish_taken & lane_bit[move.pos_to]), ())
+            into_finish = () if is_save or start_blocked else tuple(
+                move.pos_to_finish for move in targets
+                if move.pos_to_finish is not None and not finish_taken & lane_bit[move.pos_to_finish])
+            on_ring = () if rank not in Dog.RING_RANKS or not (is_save or pos == pos_start) else tuple(
+                move.pos_to for move in targets
+                if move.pos_to is not None and move.pos_to >= pos and not ring_taken >> move.pos_to & 1)
+            return MarbleMoves(into_finish, (), on_ring)
+
+        return self._moves.get_section((name, pos, is_save, rank, start_blocked, ring_taken, finish_taken), compute)
+
+    def iter_joker_actions(self, player: EnginePlayer, joker_card: Card,
+                           rng: Optional[random.Random] = None, start_save: bool = False) -> Iterator[Action]:
+        """
+        Lazily generate the substitute actions of a Joker, only for cards the player could
+        actually play now. The substitutes are listed in JOKER_RANKS order. With rng, ranks
+        and suits come in random order and the first action is a uniform random choice.
+        start_save is passed on to get_seven_actions.
+        """
+        list_rank = Dog.JOKER_RANKS if rng is None else rng.sample(Dog.JOKER_RANKS, len(Dog.JOKER_RANKS))
+        for rank in list_rank:
+            if not self._is_substitute_playable(player, rank, start_save):
                 continue
-            for rank in valid_ranks + other_ranks:
-                for suit in GameState.LIST_SUIT:
-                    substitute_card = Card(suit=suit, rank=rank)
-                    actions.append(
-                        Action(
-                            card=joker_card,
-                            pos_from=None,
-                            pos_to=None,
-                            card_swap=substitute_card,
-                        )
-                    )
-        return actions
-
-    def _run_joker_swap(self, player: PlayerState, card_action:Action) -> List[Action]:
+            actions: List[Action] = []
+            self.add_substitute_actions(actions, joker_card, (rank,))
+            if rng is not None:
+                rng.shuffle(actions)
+            yield from actions
+
+    def _is_substitute_playable(self, player: EnginePlayer, rank: str, start_save: bool = False) -> bool:
+        """ True if a card of this rank instead of the Joker would have a move, from the same code that lists
+        the moves of the cards in the hand (get_kennel_exit_actions, _get_marble_moves) """
+        card = Card.of(GameState.LIST_SUIT[0], rank)
+        if rank == 'J':
+            return bool(self.get_jake_actions(player, card))
+        if rank == '7':
+            return bool(self.get_seven_actions(player, card, start_save))
+        if rank in ('K', 'A') and self._can_leave_kennel(player):
+            return True
+        board = self._get_board()
+        idx_player = board.idx_player(player)
+        endzone = tables.ENDZONE[player.name]
+        return any(any(self._get_marble_moves(idx_player, marble, rank)) for marble in player.list_marble
+                   if marble.pos < tables.CNT_RING or marble.pos in endzone)
+
+    def _can_leave_kennel(self, player: EnginePlayer) -> bool:
+        board = self._get_board()
+        idx_player = board.idx_player(player)
+        pos_start = Dog.START_POSITIONS[player.name]
+        return board.cnt_kennel[idx_player] > 0 and not board.ring_mask[idx_player] >> pos_start & 1
+
+    def _run_joker_swap(self, player: EnginePlayer, card_action:Action) -> List[Action]:
         """Swap Joker card with another chosen one"""
         swapped_action = []
 
@@ -407,188 +555,110 @@ class Dog(Game):
                 card_swap=card_action.card_swap,
             )
         )
-        self.state.card_active = card_action.card_swap
+        self._journal.set(self.state, 'card_active', card_action.card_swap)
         if card_action.card is not None:
-            player.list_card.remove(card_action.card)
-            self.state.list_card_discard.append(card_action.card)
+            self._journal.remove(player.list_card, card_action.card)
+            self._journal.append(self.state.list_card_discard, card_action.card)
 
         return swapped_action
 
-    def _get_into_endzone_actions(self, player: PlayerState) -> List[Action]:
-        actions: List[Action] = []
-        taken_positions = {marble.pos for marble in player.list_marble if marble.pos in Dog.ENDZONE[player.name]}
-        available_positions = [pos for pos in Dog.ENDZONE[player.name] if pos not in taken_positions]
-        available_indices = [pos - Dog.ENDZONE[player.name][0] + 1 for pos in available_positions]
-        start_save_blocked = any(marble.pos == Dog.START_POSITIONS[player.name] and marble.is_save
-                                 for marble in player.list_marble)
-
-        for marble in player.list_marble:
-            pos_from = marble.pos
-            if not marble.is_save and pos_from < 64 and not start_save_blocked:
-                if player.name == "Blue":
-                    if pos_from == 0:
-                        steps_until_ez = available_indices
-                    else:
-                        steps_until_ez = [63 - pos_from + 1 + pos for pos in available_indices]
-                else:
-                    steps_until_ez = [Dog.START_POSITIONS[player.name] - pos_from + pos for pos in available_indices]
-
-                for card in player.list_card:
-                    if card.rank != "7":
-                        actions.extend(self._get_card_actions(card, pos_from, steps_until_ez, available_positions))
-
-        return actions
-
-    def _get_card_actions(self, card: Card, pos_from: int, steps_until_ez: List[int],
-                          available_positions: List[int]) -> List[Action]:
-        endzone_actions: List[Action] = []
-        card_steps = GameState.get_card_steps(card.rank)
-        possible_steps = card_steps if isinstance(card_steps, tuple) else (card_steps,)
-
-        for step in possible_steps:
-            for idx, pos in enumerate(available_positions):
-                if step == steps_until_ez[idx] and step != 0:
-                    endzone_actions.append(Action(card=card, pos_from=pos_from, pos_to=pos))
-
-        return endzone_actions
-
-    def _move_inside_endzone_actions(self, player: PlayerState) -> List[Action]:
-        actions: List[Action] = []
-        endzone_positions = Dog.ENDZONE[player.name]
-        #taken_positions = {marble.pos for marble in player.list_marble if marble.pos in endzone_positions}
+    def _get_into_endzone_actions(self, cards: List[Card],
+                                  marble_moves: List[Tuple[int, Dict[str, MarbleMoves]]]) -> List[Action]:
+        """ Moves into the finish, per marble and card """
+        return [Action.of(card, pos_from, pos_to) for pos_from, moves in marble_moves
+                for card in cards for pos_to in moves[card.rank].into_finish]
+
+    def _move_inside_endzone_actions(self, cards: List[Card],
+                                     marble_moves: List[Tuple[int, Dict[str, MarbleMoves]]]) -> List[Action]:
+        """ Moves inside the finish, per marble and card """
+        return [Action.of(card, pos_from, pos_to) for pos_from, moves in marble_moves
+                for card in cards for pos_to in moves[card.rank].in_finish]
+
+    def get_jake_actions(self, player: EnginePlayer, card: Card) -> List[Action]:
+        """ Swaps of an own marble on the ring with an unprotected (not is_save) marble of another player on
+        the ring, both ways. Only if there is none, the own marbles swap among themselves. Marbles in kennel
+        and finish are skipped up front, each pair of positions is listed once (in marble order). """
+        board = self._get_board()
+        idx_player = board.idx_player(player)
+        own = list(dict.fromkeys(pos for pos in board.positions[idx_player] if 0 <= pos < tables.CNT_RING))
+        others = list(dict.fromkeys(
+            pos for idx_other, other in enumerate(self.state.list_player) if idx_other != idx_player
+            for marble, pos in zip(other.list_marble, board.positions[idx_other])
+            if not marble.is_save and 0 <= pos < tables.CNT_RING))
 
-        for marble in player.list_marble:
-            pos_from = marble.pos
-            if not self._is_marble_in_endzone(pos_from, endzone_positions):
-                continue
-
-            max_steps = max(endzone_positions) - pos_from
-            self._add_actions_for_possibl_steps(actions, player, pos_from, max_steps)
-
-        return actions
-
-    def _is_marble_in_endzone(self, pos_from: int, endzone_positions: List[int]) -> bool:
-        """Helper function to check if the marble is in the endzone."""
-        return pos_from in endzone_positions
-
-    def _add_actions_for_possibl_steps(self, actions: List[Action], player: PlayerState,
-                                       pos_from: int, max_steps: int) -> None:
-        """Helper function to add actions for valid moves."""
-        endzone_positions = Dog.ENDZONE[player.name]
-        taken_positions = {marble.pos for marble in player.list_marble if marble.pos in endzone_positions}
-        for card in player.list_card:
-            if card.rank != "7":
-                card_steps = GameState.get_card_steps(card.rank)
-                possible_steps = card_steps if isinstance(card_steps, tuple) else (card_steps,)
-
-                for step in possible_steps:
-                    if step <= max_steps:
-                        target_position = pos_from + step
-                        if target_position not in taken_positions:
-                            actions.append(Action(card=card, pos_from=pos_from, pos_to=target_position))
-
-    def get_jake_actions(self, player: PlayerState, card: Card) -> List[Action]:
-        """Generate possible actions for using a Jake card"""
         actions = []
-        player_marbles = [m for m in player.list_marble if m.pos is not None]
-        opponent_marbles = [
-            m
-            for p in self.state.list_player
-            if p != player
-            for m in p.list_marble
-            if not m.is_save
-        ]
-
-        # Generate actions by swapping with opponent marbles
-        for pm in player_marbles:
-            if pm.pos is not None and 0 <= int(pm.pos) <= 63:
-                for om in opponent_marbles:
-                    if om.pos is not None and 0 <= int(om.pos) <= 63:
-                        actions.append(Action(card=card, pos_from=int(pm.pos), pos_to=int(om.pos)))
-                        actions.append(Action(card=card, pos_from=int(om.pos), pos_to=int(pm.pos)))
-
-        # If no opponent marbles are available, generate swaps within the player's own marbles
+        for pos_own in own:
+            for pos_other in others:
+                actions.append(Action.of(card, pos_own, pos_other))
+                actions.append(Action.of(card, pos_other, pos_own))
+
         if not actions:
-            for i, m1 in enumerate(player_marbles):
-                if m1.pos is not None and 0 <= int(m1.pos) <= 63:
-                    for m2 in player_marbles[i + 1:]:  # Avoid duplicate pairs
-                        if m2.pos is not None and 0 <= int(m2.pos) <= 63:
-                            actions.append(Action(card=card, pos_from=int(m1.pos), pos_to=int(m2.pos)))
-                            actions.append(Action(card=card, pos_from=int(m2.pos), pos_to=int(m1.pos)))
+            for idx, pos_first in enumerate(own):
+                for pos_second in own[idx + 1:]:
+                    actions.append(Action.of(card, pos_first, pos_second))
+                    actions.append(Action.of(card, pos_second, pos_first))
 
         return actions
 
-    def get_seven_actions(self, player: PlayerState, card: Card) -> List[Action]:
+    def get_seven_actions(self, player: EnginePlayer, card: Card, start_save: bool = False) -> List[Action]:
         """
-        Generate all possible actions for a card with rank '7'.
-        Distribute 7 movement points across the player's marbles.
+        Generate the next partial moves for a card with rank '7'. The 7 steps (or the
+        ones left of the 7 being played) are split across the player's marbles, only moves
+        after which all remaining steps can still be played are returned. With start_save,
+        the player's marbles on their start count as save (see _mark_start_save).
         """
-        actions: list = []
-
         if not card:
-            return actions
-
-        for marble in self.state.list_player[self.state.idx_player_active].list_marble:
-            if (marble.pos not in Dog.KENNEL[player.name] and marble.pos != Dog.ENDZONE[player.name]):
-                pos_from = marble.pos
-                for steps in range(1, Dog.SEVEN_STEPS_COUNTER +1):
-                    pos_to = pos_from + steps
-                    if pos_to > 63:
-                        continue
-                    if GameState.is_valid_move(pos_to, player.list_marble):
-                        if Dog.SEVEN_STEPS_COUNTER == 0:
-                            actions.append(Action(card=card, pos_from=pos_from, pos_to=pos_to))
-
-        return actions
-
-        # if card.rank != "7":
-        #     return []  # Only handle "7" cards
-        # actions = []
-
-        # steps = GameState.get_card_steps(str(card.rank))
-        # for marble in player.list_marble:
-        #     if marble.pos is None or not 0 <= int(marble.pos) <= 63:
-        #         continue
-        #     pos_from = int(marble.pos)
-        #     possible_steps = steps if isinstance(steps, tuple) else (steps,)
-        #     for step in possible_steps:
-        #         pos_to = pos_from + step
-        #         if pos_to > 63:
-        #             continue
-        #         if GameState.is_valid_move(pos_to, player.list_marble):
-        #             actions.append(Action(card=card, pos_from=int(marble.pos), pos_to=pos_to))
-
-        # return actions
+            return []
+
+        idx_colour, config, blocked, masks = self._get_seven_config(player, start_save)
+        steps_remaining = self.seven_steps_counter if self.seven_start is not None else seven.CNT_STEPS_SEVEN
+        return [Action.of(card, config[move.idx_marble][0], move.pos_to)
+                for move in seven.get_next_moves(idx_colour, config, blocked, steps_remaining, masks)]
+
+    def _get_seven_config(self, player: EnginePlayer,
+                          start_save: bool = False) -> Tuple[int, seven.MarbleConfig, int, seven.ConfigMasks]:
+        """ Colour, own marbles, the ring mask of the fields blocked by other players' save marbles
+        and the masks of the own marbles """
+        board = self._get_board()
+        idx_player = board.idx_player(player)
+        pos_start = tables.START_POSITIONS[player.name] if start_save else None
+        config = tuple((int(marble.pos), marble.is_save or marble.pos == pos_start) for marble in player.list_marble)
+        save = board.save_mask[idx_player]
+        if pos_start is not None:
+            save |= board.ring_mask[idx_player] & 1 << pos_start
+        masks = seven.ConfigMasks(ring=board.ring_mask[idx_player], save=save, finish=board.finish_mask[idx_player])
+        return tables.IDX_COLOUR[player.name], config, board.get_blocked_mask(idx_player), masks
 
     # pylint: disable=too-many-branches
     def apply_action(self, action: Optional[Action]) -> None:
-        """ Apply the given action to the game """
+        """ Apply the given action to the game (undo takes it back) """
         active_player = self.state.list_player[self.state.idx_player_active]
+        journal = self._journal
+        journal.begin()
+        self._views.clear()
+        self._mark_start_save(active_player)
 
-        if not self.state.bool_card_exchanged and Dog.EXCHANGE_COUNTER <= 4 and action and action.card:
+        if not self.state.bool_card_exchanged and self.exchange_counter <= 4 and action and action.card:
             teammate = self.state.list_player[(self.state.idx_player_active + 2) % self.state.cnt_player]
-            teammate.list_card.append(action.card)
-            active_player.list_card.remove(action.card)
-            Dog.EXCHANGE_COUNTER += 1
-
-            if Dog.EXCHANGE_COUNTER == 4:
-                self.state.bool_card_exchanged = True
-                Dog.EXCHANGE_COUNTER = 0
-            self.state.idx_player_active = (self.state.idx_player_active + 1) % self.state.cnt_player
+            journal.append(teammate.list_card, action.card)
+            journal.remove(active_player.list_card, action.card)
+            journal.set(self, 'exchange_counter', self.exchange_counter + 1)
+
+            if self.exchange_counter == 4:
+                journal.set(self.state, 'bool_card_exchanged', True)
+                journal.set(self, 'exchange_counter', 0)
+            journal.set(self.state, 'idx_player_active', (self.state.idx_player_active + 1) % self.state.cnt_player)
             return
 
         if action is None:
-            if self.state.card_active is not None and self.state.card_active.rank == "7" and \
-                Dog.SEVEN_STEPS_COUNTER > 0:
-                if self.original_state_before_7 is not None:
-                    self.state = self.original_state_before_7
-                self.original_state_before_7 = None
+            if self.seven_start is not None:
+                # take back the steps moved so far with the 7 being played
+                journal.revert_since(self.seven_start)
                 return
 
             if self._can_fold_cards(self.state.cnt_round, active_player):
                 while active_player.list_card:
-                    folded_card = active_player.list_card.pop(0)
-                    self.state.list_card_discard.append(folded_card)
+                    journal.append(self.state.list_card_discard, journal.pop(active_player.list_card, 0))
             self._advance_turn()
             return
 
@@ -599,6 +669,7 @@ class Dog(Game):
 
         if action.card is not None and action.card.rank == "7":
             self._handle_seven_action(action, active_player)
+            self._check_game_finished()
             return
 
         if action.pos_from is None:
@@ -610,10 +681,12 @@ class Dog(Game):
             idx_partner = (self.state.idx_player_active + 2) % len(self.state.list_player)
             partner = self.state.list_player[idx_partner]
 
-            if action.pos_from in [int(m.pos) for m in partner.list_marble]:
-                marble_to_move = next((m for m in partner.list_marble if int(m.pos) == action.pos_from), None)
+            if self._get_board().is_occupied_by(action.pos_from, idx_partner):
+                marble_to_move = self._find_marble_to_move(partner, action.pos_from)
             else:
                 marble_to_move = self._find_marble_to_move(active_player, action.pos_from)
+            if marble_to_move is None and action.card is not None and action.card.rank == 'J':
+                marble_to_move = self._get_marble_at(action.pos_from)  # a swap listed from the other marble
 
             if marble_to_move:
                 self._handle_action_with_card(active_player, marble_to_move, action)
@@ -621,62 +694,74 @@ class Dog(Game):
             # Discard the card and advance the turn
             self._discard_card_and_advance(action, active_player)
 
-        active_player_index = self.state.idx_player_active-1
-        teammate_index = (active_player_index + 2) % len(self.state.list_player)
-
-        active_player = self.state.list_player[active_player_index]
-        teammate = self.state.list_player[teammate_index]
-
-        active_endzone = Dog.ENDZONE[active_player.name]
-        active_all_in_endzone = all(int(marble.pos) in active_endzone for marble in active_player.list_marble)
-
-        teammate_endzone = Dog.ENDZONE[teammate.name]
-        teammate_all_in_endzone = all(int(marble.pos) in teammate_endzone for marble in teammate.list_marble)
+        self._check_game_finished()
 
-        if active_all_in_endzone and teammate_all_in_endzone:
-            self.state.phase = GamePhase.FINISHED
-
-    def _handle_seven_action(self, action: Action, active_player: PlayerState) -> None:
-        if self.state.card_active is None or Dog.SEVEN_STEPS_COUNTER == 7:
-            self.original_state_before_7 = self.state.model_copy(deep=True)
-            self.state.card_active = action.card
-            Dog.SEVEN_STEPS_COUNTER = 7
+    def _mark_start_save(self, player: EnginePlayer) -> None:
+        """ A marble on its own start moves with the simple cards like a save one (get_board_move_actions).
+        When the player acts holding such a card, it is marked save (the listing only takes it as save). """
+        state = self.state
+        if not state.bool_card_exchanged or state.card_active is not None or self._all_marbles_in_finish(player) \
+                or not any(card.rank in Dog.SIMPLE_RANKS for card in player.list_card):
+            return
+        board = self._get_board()
+        idx_player, pos_start = state.idx_player_active, Dog.START_POSITIONS[player.name]
+        if (board.ring_mask[idx_player] & ~board.save_mask[idx_player]) >> pos_start & 1:
+            for marble in player.list_marble:
+                if marble.pos == pos_start and not marble.is_save:
+                    self._journal.set(marble, 'is_save', True)
+
+    def _check_game_finished(self) -> None:
+        """ The game is over when both players of a team have all their marbles in the finish (whoever
+        moved last: a 7 finishes in steps and a new round changes the active player) """
+        board = self._get_board()
+        cnt_team = len(self.state.list_player) // 2
+        for idx_player in range(cnt_team):
+            team = (idx_player, idx_player + cnt_team)
+            if all(board.cnt_finish[idx] == len(self.state.list_player[idx].list_marble) for idx in team):
+                self._journal.set(self.state, 'phase', GamePhase.FINISHED)
+
+    def _handle_seven_action(self, action: Action, active_player: EnginePlayer) -> None:
+        journal = self._journal
+        if self.seven_start is None:
+            journal.set(self, 'seven_start', journal.idx_group)
+            journal.set(self.state, 'card_active', action.card)
+            journal.set(self, 'seven_steps_counter', seven.CNT_STEPS_SEVEN)
 
         steps = self.calculate_steps_for_7(action.pos_from, action.pos_to, active_player)
-
-        marble_moved = False
-        for marble in active_player.list_marble:
-            if marble.pos == action.pos_from:
-                for step in range(1, steps + 1):
-                    temp_pos = (marble.pos + step) % 64
-                    self.send_home(temp_pos)
-
-                marble.pos = action.pos_to if action.pos_to is not None else 0
-                marble_moved = True
-                break
-
-        if not marble_moved:
+        marble = self._find_marble_to_move(active_player, action.pos_from) if action.pos_from is not None else None
+        if marble is None or action.pos_to is None:
             raise ValueError("Error_JH")
 
-        Dog.SEVEN_STEPS_COUNTER -= steps
+        # marbles on the way (and on the destination) go home, the finish is only entered at the own start
+        into_finish = action.pos_to in Dog.ENDZONE[active_player.name]
+        for pos in seven.get_ring_path(tables.IDX_COLOUR[active_player.name], marble.pos, steps, into_finish):
+            self.send_home(pos)
 
-        if Dog.SEVEN_STEPS_COUNTER == 0:
+        self._set_marble_pos(marble, action.pos_to)
+        journal.set(marble, 'is_save', into_finish)
+        journal.set(self, 'seven_steps_counter', self.seven_steps_counter - steps)
+
+        if self.seven_steps_counter == 0:
             if action.card in active_player.list_card:
-                active_player.list_card.remove(action.card)
-                self.state.list_card_discard.append(action.card)
+                journal.remove(active_player.list_card, action.card)
+                journal.append(self.state.list_card_discard, action.card)
 
-            self.state.card_active = None
-            self.original_state_before_7 = None
-            self.state.idx_player_active = (self.state.idx_player_active + 1) % self.state.cnt_player
+            journal.set(self.state, 'card_active', None)
+            journal.set(self, 'seven_start', None)
+            journal.set(self.state, 'idx_player_active', (self.state.idx_player_active + 1) % self.state.cnt_player)
 
     def send_home(self, pos: int) -> None:
-        for player in self.state.list_player:
-            for marble in player.list_marble:
-                if marble.pos == pos:
-                    marble.pos = self.KENNEL[player.name][0]
-                    marble.is_save = False
-
-    def calculate_steps_for_7(self, pos_from: int | None, pos_to: int | None, active_player: PlayerState) -> int:
+        """ Send all marbles on the position back to a free place in their kennel """
+        board = self._get_board()
+        for idx_player, idx_marble in board.marbles_at(pos):
+            player = self.state.list_player[idx_player]
+            marble = player.list_marble[idx_marble]
+            kennel = self.KENNEL[player.name]
+            pos_home = next((pos_kennel for pos_kennel in kennel if not board.is_occupied(pos_kennel)), kennel[0])
+            self._set_marble_pos(marble, pos_home)
+            self._journal.set(marble, 'is_save', False)
+
+    def calculate_steps_for_7(self, pos_from: int | None, pos_to: int | None, active_player: EnginePlayer) -> int:
         """Calculate the number of steps for a 7 card move"""
         if pos_from is None or pos_to is None:
             raise ValueError("pos_from and pos_to must not be None")
@@ -693,11 +778,21 @@ class Dog(Game):
 
         return 0
 
-    def _find_marble_to_move(self, player: PlayerState, pos_from: int) -> Optional[Marble]:
+    def _find_marble_to_move(self, player: EnginePlayer, pos_from: int) -> Optional[EngineMarble]:
         """ Find the marble to move based on the position """
-        return next((m for m in player.list_marble if int(m.pos) == pos_from), None)
+        board = self._get_board()
+        for idx_player, idx_marble in board.marbles_at(pos_from):
+            if board.list_player[idx_player] is player:
+                return player.list_marble[idx_marble]
+        return None
+
+    def _get_marble_at(self, pos: int) -> Optional[EngineMarble]:
+        """ The (first) marble at the position, whoever it belongs to """
+        for idx_player, idx_marble in self._get_board().marbles_at(pos):
+            return self.state.list_player[idx_player].list_marble[idx_marble]
+        return None
 
-    def _handle_action_with_card(self, player: PlayerState, marble_to_move: Marble, action: Action) -> None:
+    def _handle_action_with_card(self, player: EnginePlayer, marble_to_move: EngineMarble, action: Action) -> None:
         """ Handle the specific action when a card is involved """
         if action.card is not None:
             if action.card.rank == "J":
@@ -709,26 +804,27 @@ class Dog(Game):
             else:
                 self.move_marble_on_board(marble_to_move, action)
 
-    def _discard_card_and_advance(self, action: Action, active_player: PlayerState) -> None:
+    def _discard_card_and_advance(self, action: Action, active_player: EnginePlayer) -> None:
         """ Discard the card and advance the turn """
         if action.card is not None:
             if action.card.rank == "7":
                 self._handle_seven_card(action)
             else:
-                active_player.list_card.remove(action.card)
-                self.state.list_card_discard.append(action.card)
+                self._journal.remove(active_player.list_card, action.card)
+                self._journal.append(self.state.list_card_discard, action.card)
                 self._advance_turn()
 
     def _handle_seven_card(self, action: Action) -> None:
         """ Handle the special case for the '7' card """
+        journal = self._journal
         if self.state.card_active is None:
-            self.state.card_active = action.card
-        if Dog.SEVEN_STEPS_COUNTER == 7:
-            Dog.SEVEN_STEPS_COUNTER = 0
-            self.state.card_active = None
-            self.state.idx_player_active = (self.state.idx_player_active + 1) % self.state.cnt_player
+            journal.set(self.state, 'card_active', action.card)
+        if self.seven_steps_counter == 7:
+            journal.set(self, 'seven_steps_counter', 0)
+            journal.set(self.state, 'card_active', None)
+            journal.set(self.state, 'idx_player_active', (self.state.idx_player_active + 1) % self.state.cnt_player)
 
-    def _can_fold_cards(self, round_number: int, player: PlayerState) -> bool:
+    def _can_fold_cards(self, round_number: int, player: EnginePlayer) -> bool:
         """ Determine if it is appropriate to fold cards based on game round and state """
         # Avoid folding if it's a round with specific card count requirements
         if round_number == 6 and len(player.list_card) == 6:
@@ -737,65 +833,67 @@ class Dog(Game):
 
     def _advance_turn(self) -> None:
         """ Advances the game to the next player and checks if the round should end. """
-        self.state.idx_player_active = (self.state.idx_player_active + 1) % self.state.cnt_player
+        self._journal.set(self.state, 'idx_player_active', (self.state.idx_player_active + 1) % self.state.cnt_player)
         if self.state.idx_player_active == self.state.idx_player_started:
             self.end_round()
 
-    def move_marble_to_start(self, player: PlayerState, marble: Marble, action: Action) -> None:
+    def move_marble_to_start(self, player: EnginePlayer, marble: EngineMarble, action: Action) -> None:
         """Move a marble out of the kennel to the starting position."""
         if action.pos_to is None:
             return
 
         # Move opponent marble back to the kennel if the starting position is occupied
-        for opponent in self.state.list_player:
+        board = self._get_board()
+        for idx_opponent, idx_marble in board.marbles_at(action.pos_to):
+            opponent = self.state.list_player[idx_opponent]
             if opponent == player:
                 continue  # Skip active player's own marbles
-
-            opponent_marble = next((m for m in opponent.list_marble if int(m.pos) == action.pos_to), None)
-            if opponent_marble:
-                self.send_opponent_marble_home(opponent, opponent_marble)
+            self.send_opponent_marble_home(opponent, opponent.list_marble[idx_marble])
 
         # Move active player's marble to the starting position
-        marble.pos = action.pos_to
-        marble.is_save = True  # Mark as moved out of the kennel
+        self._set_marble_pos(marble, action.pos_to)
+        self._journal.set(marble, 'is_save', True)  # Mark as moved out of the kennel
 
 
-    def send_opponent_marble_home(self, opponent: PlayerState, marble: Marble) -> None:
+    def send_opponent_marble_home(self, opponent: EnginePlayer, marble: EngineMarble) -> None:
         """Send an opponent's marble back to their kennel."""
         player_kennel = Dog.KENNEL[opponent.name]
+        board = self._get_board()
         for kennel_position in player_kennel:
-            if not any(marble.pos == kennel_position for marble in opponent.list_marble):
-                marble.pos = kennel_position
-                marble.is_save = False  # Reset "saved" state
+            if not board.is_occupied(kennel_position):
+                self._set_marble_pos(marble, kennel_position)
+                self._journal.set(marble, 'is_save', False)  # Reset "saved" state
                 return
 
 
-    def move_marble_to_finish(self, marble: Marble, action: Action) -> None:
+    def move_marble_to_finish(self, marble: EngineMarble, action: Action) -> None:
         """ Move a marble into a finish position. """
         if action.pos_to:
-            marble.pos = action.pos_to
-            marble.is_save = True
+            self._set_marble_pos(marble, action.pos_to)
+            self._journal.set(marble, 'is_save', True)
 
-    def move_marble_on_board(self, marble: Marble, action: Action) -> None:
+    def move_marble_on_board(self, marble: EngineMarble, action: Action) -> None:
         """ Move a marble on the board. """
         if action.pos_to:
-            marble.pos = action.pos_to
-            marble.is_save = False
+            self._set_marble_pos(marble, action.pos_to)
+            self._journal.set(marble, 'is_save', False)
 
         if action.pos_to is not None and action.pos_from is not None:
-            Dog.SEVEN_STEPS_COUNTER += (action.pos_to - action.pos_from)
+            self._journal.set(self, 'seven_steps_counter', self.seven_steps_counter + action.pos_to - action.pos_from)
 
-    def apply_jake_action(self, player: PlayerState, action: Action) -> None:
+    def apply_jake_action(self, player: EnginePlayer, action: Action) -> None:
         """ Apply a Jake card action to swap marbles. """
-        marble_to_swap = next(
-            (m for p in self.state.list_player for m in p.list_marble if int(m.pos) == action.pos_to),
-            None
-        )
-        if marble_to_swap and action.pos_from is not None:
-            marble_to_swap.pos, player.list_marble[action.pos_from].pos = (
-                player.list_marble[action.pos_from].pos,
-                marble_to_swap.pos
-            )
+        board = self._get_board()
+        marbles_at_pos_to = board.marbles_at(action.pos_to) if action.pos_to is not None else []
+        # the swaps are listed both ways, the marble at pos_from is the own one or the other player's
+        marble_own = None if action.pos_from is None else \
+            self._find_marble_to_move(player, action.pos_from) or self._get_marble_at(action.pos_from)
+        if marbles_at_pos_to and marble_own is not None:
+            idx_player, idx_marble = marbles_at_pos_to[0]
+            marble_to_swap = self.state.list_player[idx_player].list_marble[idx_marble]
+            pos_own, pos_swap = marble_own.pos, marble_to_swap.pos
+            self._set_marble_pos(marble_to_swap, pos_own)
+            self._set_marble_pos(marble_own, pos_swap)
 
     def exchange_cards(self) -> None:
         # Exchange the first card with teammate
@@ -804,19 +902,33 @@ class Dog(Game):
                 card_to_exchange = player.list_card[0]
                 idx_player_partner = (idx_player + 2) % len(self.state.list_player)
                 teammate_ = self.state.list_player[idx_player_partner]
-                player.list_card.remove(card_to_exchange)
-                teammate_.list_card.append(card_to_exchange)
-        self.state.bool_card_exchanged = True
+                self._journal.remove(player.list_card, card_to_exchange)
+                self._journal.append(teammate_.list_card, card_to_exchange)
+        self._journal.set(self.state, 'bool_card_exchanged', True)
 
     def get_player_view(self, idx_player: int) -> GameState:
-        """ Get the masked state for the active player (e.g. the oppontent's cards are face down)"""
-        return self.state
+        """ The state as the given player sees it: the own hand, the other hands and the draw pile only as
+        numbers of cards (cnt_card, cnt_card_draw). A view is kept until the next apply_action, undo or
+        set_state and the views share what all players see, so they are not to be changed. """
+        if not 0 <= idx_player < len(self.state.list_player):
+            raise ValueError(f"There is no player {idx_player}")
+        view = self._views.get(idx_player)
+        if view is None:
+            public = self._views.get(None)
+            if public is None:
+                public = self._views[None] = self._to_model(self.state, hide_cards=True)
+            list_player = list(public.list_player)
+            list_player[idx_player] = list_player[idx_player].model_copy(update={
+                'list_card': list(self.state.list_player[idx_player].list_card), 'cnt_card': None})
+            view = self._views[idx_player] = public.model_copy(update={'list_player': list_player})
+        return view
 
     def end_round(self) -> None:
-        self.state.cnt_round += 1
-        self.state.idx_player_started = (self.state.idx_player_started + 1) % self.state.cnt_player
-        self.state.idx_player_active = (self.state.idx_player_started + 1) % self.state.cnt_player
-        self.state.bool_card_exchanged = False
+        journal = self._journal
+        journal.set(self.state, 'cnt_round', self.state.cnt_round + 1)
+        journal.set(self.state, 'idx_player_started', (self.state.idx_player_started + 1) % self.state.cnt_player)
+        journal.set(self.state, 'idx_player_active', (self.state.idx_player_started + 1) % self.state.cnt_player)
+        journal.set(self.state, 'bool_card_exchanged', False)
         # Prepare next round
         self.distribute_cards()
 
@@ -831,13 +943,20 @@ class Dog(Game):
         while len(self.state.list_card_draw) < num_cards*4:
             self.reshuffle_if_empty()
 
+        journal = self._journal
         for player in self.state.list_player:
-            player.list_card = [self.state.list_card_draw.pop() for _ in range(num_cards)]
+            if player.list_card:
+                journal.replace(player.list_card, [])  # cards left from the last round are dropped
+            for _ in range(num_cards):
+                journal.append(player.list_card, journal.pop(self.state.list_card_draw))
 
     def reshuffle_if_empty(self) -> None:
-        self.state.list_card_draw = random.sample(GameState.LIST_CARD, len(GameState.LIST_CARD))
-        self.state.list_card_discard.clear()
-        random.shuffle(self.state.list_card_draw)
+        """ Refill the draw pile with a newly shuffled deck and clear the discard pile (in place) """
+        rng = self._journal.use_rng(self.rng)
+        list_card_draw = self.state.list_card_draw
+        self._journal.replace(list_card_draw, DECK)
+        self._journal.replace(self.state.list_card_discard, [])
+        rng.shuffle(list_card_draw.ids if isinstance(list_card_draw, CardPile) else list_card_draw)
 
 # pylint: disable=R0903
 class RandomPlayer(Player):
@@ -847,36 +966,3 @@ class RandomPlayer(Player):
         if len(actions) > 0:
             return random.choice(actions)
         return None
-
-if __name__ == '__main__':
-    game = Dog()
-    # idx_player_active = 0
-    # player = game.state.list_player[game.state.idx_player_active]
-    # player.list_card = [Card(suit='♣', rank='7'), Card(suit='♦', rank='7'),
-    # Card(suit='♥', rank='7'), Card(suit='♠', rank='7'), Card(suit='♠', rank='K')]
-    # print(player.list_card)
-    # player.list_marble[0] = Marble(pos=str(0), is_save=True)
-    # print(player.list_marble[0])
-    # print(game.state.idx_player_active)
-
-    # actions = game.get_list_action()
-    # print(actions)
-    # print(game.state.idx_player_active)
-
-    # print(actions[0])
-    # action = game.apply_action(actions[0])
-    # print(game.state.idx_player_active)
-    # print(player.list_marble[0])
-    # print(game.state.card_active)
-
-    # n_cards = len(game.state.list_player[0].list_card)
-    # print(player, round, n_cards)
-    # action = game.apply_action(None)
-    # action = game.apply_action(None)
-    # action = game.apply_action(None)
-    # action = game.apply_action(None)
-    # action = game.apply_action(None)
-    # player = game.state.idx_player_active
-    # round = game.state.cnt_round
-    # n_cards = len(game.state.list_player[0].list_card)
-    # print(player, round, n_cards)
@@ -0,0 +1,129 @@
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from server.py import dog_tables as tables
+
+# Action.key: (card suit, card rank, pos_from, pos_to, card_swap suit, card_swap rank)
+ActionKey = Tuple[Optional[str], Optional[str], Optional[int], Optional[int], Optional[str], Optional[str]]
+CardKey = Tuple[str, str]
+
+RANK_JOKER = 'JKR'
+RANK_JAKE = 'J'
+RANKS_OPENER = ('A', 'K', RANK_JOKER)  # cards leaving the kennel
+CNT_STEPS_SEVEN = 7                    # the 7 is split into moves of 1 to 7 steps
+
+PosPair = Tuple[int, int]
+
+
+def get_reachable_pairs(rank: str) -> List[PosPair]:
+    """ The (pos_from, pos_to) pairs a card of the given rank can move a marble by, of any colour (partner
+    moves included), sorted. The Jake swaps any two marbles on the ring, the Joker plays as any card. """
+    if rank == RANK_JOKER:
+        return sorted({pair for rank_other in tables.CARD_STEPS if rank_other != RANK_JOKER
+                       for pair in get_reachable_pairs(rank_other)} |
+                      {(pos_kennel, tables.START_POSITIONS[colour]) for colour in tables.COLOURS
+                       for pos_kennel in tables.KENNEL[colour]})
+    if rank == RANK_JAKE:
+        return [(pos_a, pos_b) for pos_a in range(tables.CNT_RING) for pos_b in range(tables.CNT_RING)]
+
+    steps = range(1, CNT_STEPS_SEVEN + 1) if rank == '7' else tables.CARD_STEPS[rank]
+    pairs: Set[PosPair] = set()
+    for moves_of_colour in tables.MOVE_TABLE:
+        for pos, moves in enumerate(moves_of_colour):
+            for step in steps:
+                move = moves[step + tables.STEP_OFFSET]
+                pairs.update((pos, pos_to) for pos_to in (move.pos_to, move.pos_to_finish) if pos_to is not None)
+    if rank in RANKS_OPENER:
+        pairs.update((pos_kennel, tables.START_POSITIONS[colour]) for colour in tables.COLOURS
+                     for pos_kennel in tables.KENNEL[colour])
+    return sorted(pairs)
+
+
+class ActionSpace:
+    """ Fixed integer ids for all Dog actions
+
+    The ids are laid out in four consecutive blocks:
+
+    ======================  ==========================================================
+    id                      action
+    ======================  ==========================================================
+    0                       None (pass: fold the cards or undo an unfinished 7)
+    1 + c                   card exchange of card c (pos_from and pos_to are None)
+    1 + C + s               Joker played as card s (card_swap, positions are None)
+    1 + C + S + m           marble move m (see move_ids)
+    ======================  ==========================================================
+
+    c indexes the C distinct cards in deck order (2♠, 2♥, ..., A♣, JKR) and s the S distinct
+    cards without the Joker. The marble moves are numbered card by card, and per card only
+    the (pos_from, pos_to) pairs its rank can reach (see get_reachable_pairs), which keeps
+    the space at about a twentieth of all card x 96 x 96 moves. The ids only depend on this
+    layout, never on the game state, so they are stable across games.
+    """
+
+    def __init__(self, list_card: Sequence[CardKey]) -> None:
+        self.list_card: List[CardKey] = list(dict.fromkeys(list_card))
+        self.list_card_swap: List[CardKey] = [card for card in self.list_card if card[1] != RANK_JOKER]
+        self.cnt_positions = tables.CNT_POSITIONS
+        self.idx_card: Dict[CardKey, int] = {card: idx for idx, card in enumerate(self.list_card)}
+        self.idx_card_swap: Dict[CardKey, int] = {card: idx for idx, card in enumerate(self.list_card_swap)}
+        self.suit_joker = next((suit for suit, rank in self.list_card if rank == RANK_JOKER), '')
+
+        self.id_pass = 0
+        self.offset_exchange = 1
+        self.offset_joker = self.offset_exchange + len(self.list_card)
+        self.offset_move = self.offset_joker + len(self.list_card_swap)
+
+        # move_ids[c, pos_from, pos_to] -> action id (-1 outside the space), move_keys[id - offset_move] -> row
+        # (c, pos_from, pos_to)
+        pairs_by_rank = {rank: get_reachable_pairs(rank) for rank in dict.fromkeys(rank for _, rank in self.list_card)}
+        self.move_keys: npt.NDArray[np.int64] = np.array(
+            [(idx_card, pos_from, pos_to) for idx_card, (_, rank) in enumerate(self.list_card)
+             for pos_from, pos_to in pairs_by_rank[rank]], dtype=np.int64).reshape(-1, 3)
+        self.move_ids: npt.NDArray[np.int64] = np.full(
+            (len(self.list_card), self.cnt_positions, self.cnt_positions), -1, dtype=np.int64)
+        self.move_ids[tuple(self.move_keys.T)] = self.offset_move + np.arange(len(self.move_keys))
+        self.cnt_action = self.offset_move + len(self.move_keys)
+
+    def __len__(self) -> int:
+        return self.cnt_action
+
+    def encode(self, key: Optional[ActionKey]) -> Optional[int]:
+        """ Id of an action given by its key (None for the pass), None if the action is outside the space
+        (e.g. an unknown card or a move its card can never make) """
+        if key is None:
+            return self.id_pass
+        suit, rank, pos_from, pos_to, swap_suit, swap_rank = key
+        idx_card = self.idx_card.get((suit, rank)) if suit is not None and rank is not None else None
+
+        action_id: Optional[int] = None
+        if idx_card is None:
+            pass
+        elif swap_suit is not None and swap_rank is not None:
+            idx_swap = self.idx_card_swap.get((swap_suit, swap_rank))
+            if rank == RANK_JOKER and idx_swap is not None and pos_from is None and pos_to is None:
+                action_id = self.offset_joker + idx_swap
+        elif pos_from is None and pos_to is None:
+            action_id = self.offset_exchange + idx_card
+        elif pos_from is not None and pos_to is not None and \
+                0 <= pos_from < self.cnt_positions and 0 <= pos_to < self.cnt_positions:
+            move_id = int(self.move_ids[idx_card, pos_from, pos_to])
+            action_id = move_id if move_id >= 0 else None
+        return action_id
+
+    def decode(self, action_id: int) -> Optional[ActionKey]:
+        """ Key of the action with the given id (None for the pass) """
+        if not 0 <= action_id < self.cnt_action:
+            raise ValueError(f"Action id {action_id} is outside the action space (0 to {self.cnt_action - 1})")
+        if action_id == self.id_pass:
+            return None
+        if action_id < self.offset_joker:
+            suit, rank = self.list_card[action_id - self.offset_exchange]
+            return suit, rank, None, None, None, None
+        if action_id < self.offset_move:
+            swap_suit, swap_rank = self.list_card_swap[action_id - self.offset_joker]
+            return self.suit_joker, RANK_JOKER, None, None, swap_suit, swap_rank
+        idx_card, pos_from, pos_to = self.move_keys[action_id - self.offset_move].tolist()
+        suit, rank = self.list_card[idx_card]
+        return suit, rank, pos_from, pos_to, None, None
@@ -0,0 +1,156 @@
+from typing import Any, ClassVar, Iterable, List, Optional, Protocol, Sequence, Tuple
+
+
+class MarbleLike(Protocol):
+    pos: int
+    is_save: bool
+
+
+class PlayerLike(Protocol):
+    name: str
+
+    @property
+    def list_marble(self) -> Sequence[MarbleLike]: ...
+
+
+class BoardIndex:
+    """ Position -> (idx_player, idx_marble) index over the 96 positions of the board,
+    with the number of marbles each player has in kennel and finish and per player bitmasks of
+    the fields taken: on the ring (bit pos), by save marbles on the ring and in the own finish
+    lane (bit i for its i-th field). Moves are passed in by move, is_save changes are seen as
+    an observer of the undo journal (JournalObserver). """
+
+    CNT_POSITIONS: ClassVar[int] = 96
+    CNT_RING: ClassVar[int] = 64
+
+    def __init__(self, list_player: Sequence[PlayerLike], kennel: dict, endzone: dict) -> None:
+        self.list_player = list_player
+        self.positions = [[int(marble.pos) for marble in player.list_marble] for player in list_player]
+        self.saves = [[bool(marble.is_save) for marble in player.list_marble] for player in list_player]
+        self.occupant: List[Optional[Tuple[int, int]]] = [None] * self.CNT_POSITIONS
+        self.cnt_occupant = [0] * self.CNT_POSITIONS
+        self.set_kennel = [frozenset(kennel.get(player.name, ())) for player in list_player]
+        self.set_finish = [frozenset(endzone.get(player.name, ())) for player in list_player]
+        self.cnt_kennel = [0] * len(list_player)
+        self.cnt_finish = [0] * len(list_player)
+        self.lane_bit = [{pos: 1 << idx for idx, pos in enumerate(endzone.get(player.name, ()))}
+                         for player in list_player]
+        self.ring_mask = [0] * len(list_player)    # ring fields of the player's marbles
+        self.save_mask = [0] * len(list_player)    # ring fields of the player's save marbles
+        self.finish_mask = [0] * len(list_player)  # fields of the own finish lane taken
+        for idx_player, positions in enumerate(self.positions):
+            for idx_marble, pos in enumerate(positions):
+                self._add(idx_player, idx_marble, pos)
+
+    def idx_player(self, player: PlayerLike) -> int:
+        for idx_player, indexed_player in enumerate(self.list_player):
+            if indexed_player is player:
+                return idx_player
+        raise ValueError(f"Player {player.name} is not part of the game state")
+
+    def marbles_at(self, pos: int) -> List[Tuple[int, int]]:
+        """ All marbles on a position, usually none or one """
+        if 0 <= pos < self.CNT_POSITIONS:
+            if self.cnt_occupant[pos] == 0:
+                return []
+            if self.cnt_occupant[pos] == 1:
+                return [self.occupant[pos]]  # type: ignore[list-item]
+        return [(idx_player, idx_marble)
+                for idx_player, positions in enumerate(self.positions)
+                for idx_marble, pos_marble in enumerate(positions) if pos_marble == pos]
+
+    def is_occupied(self, pos: int) -> bool:
+        if 0 <= pos < self.CNT_POSITIONS:
+            return self.cnt_occupant[pos] > 0
+        return bool(self.marbles_at(pos))
+
+    def is_occupied_by(self, pos: int, idx_player: int) -> bool:
+        """ True if a marble of the given player is on the position """
+        if 0 <= pos < self.CNT_POSITIONS and self.cnt_occupant[pos] == 1:
+            return self.occupant[pos][0] == idx_player  # type: ignore[index]
+        return any(idx == idx_player for idx, _ in self.marbles_at(pos))
+
+    def locate(self, marble: MarbleLike) -> Optional[Tuple[int, int]]:
+        """ (idx_player, idx_marble) of a marble object of the game state """
+        for idx_player, idx_marble in self.marbles_at(int(marble.pos)):
+            if self.list_player[idx_player].list_marble[idx_marble] is marble:
+                return idx_player, idx_marble
+        return None
+
+    def get_blocked_mask(self, idx_player: int) -> int:
+        """ Ring fields of the save marbles of all other players """
+        blocked = 0
+        for idx_other, save_mask in enumerate(self.save_mask):
+            if idx_other != idx_player:
+                blocked |= save_mask
+        return blocked
+
+    def move(self, idx_player: int, idx_marble: int, pos_to: int) -> None:
+        self._remove(idx_player, idx_marble, self.positions[idx_player][idx_marble])
+        self.positions[idx_player][idx_marble] = pos_to
+        self._add(idx_player, idx_marble, pos_to)
+
+    def set_save(self, idx_player: int, idx_marble: int, is_save: bool) -> None:
+        pos = self.positions[idx_player][idx_marble]
+        self._remove(idx_player, idx_marble, pos)
+        self.saves[idx_player][idx_marble] = is_save
+        self._add(idx_player, idx_marble, pos)
+
+    def changed(self, obj: Any, name: str, value_old: Any) -> None:
+        """ JournalObserver: a marble's is_save was changed (moves were passed in by move already) """
+        if name == 'is_save' and obj.is_save != value_old:
+            location = self.locate(obj)
+            if location is not None:
+                self.set_save(location[0], location[1], obj.is_save)
+
+    def changed_items(self, items: Any, removed: Iterable[Any], added: Iterable[Any]) -> None:
+        """ JournalObserver: cards do not change the board """
+
+    def _add(self, idx_player: int, idx_marble: int, pos: int) -> None:
+        if 0 <= pos < self.CNT_POSITIONS:
+            self.occupant[pos] = (idx_player, idx_marble)
+            self.cnt_occupant[pos] += 1
+        if 0 <= pos < self.CNT_RING:
+            self.ring_mask[idx_player] |= 1 << pos
+            if self.saves[idx_player][idx_marble]:
+                self.save_mask[idx_player] |= 1 << pos
+        if pos in self.set_kennel[idx_player]:
+            self.cnt_kennel[idx_player] += 1
+        if pos in self.set_finish[idx_player]:
+            self.cnt_finish[idx_player] += 1
+            self.finish_mask[idx_player] |= self.lane_bit[idx_player][pos]
+
+    def _remove(self, idx_player: int, idx_marble: int, pos: int) -> None:
+        if 0 <= pos < self.CNT_POSITIONS:
+            self.cnt_occupant[pos] -= 1
+            if self.cnt_occupant[pos] == 0:
+                self.occupant[pos] = None
+            elif self.occupant[pos] == (idx_player, idx_marble):
+                # marbles sharing a position (should not happen): keep one of the others
+                self.occupant[pos] = next(
+                    (idx_p, idx_m) for idx_p, positions in enumerate(self.positions)
+                    for idx_m, pos_marble in enumerate(positions)
+                    if pos_marble == pos and (idx_p, idx_m) != (idx_player, idx_marble))
+        if 0 <= pos < self.CNT_RING:
+            self._clear_ring_bits(idx_player, idx_marble, pos)
+        if pos in self.set_kennel[idx_player]:
+            self.cnt_kennel[idx_player] -= 1
+        if pos in self.set_finish[idx_player]:
+            self.cnt_finish[idx_player] -= 1
+            if not self._is_shared(idx_player, idx_marble, pos):
+                self.finish_mask[idx_player] &= ~self.lane_bit[idx_player][pos]
+
+    def _clear_ring_bits(self, idx_player: int, idx_marble: int, pos: int) -> None:
+        """ The marble leaves a ring field, its bits are cleared unless another marble of the player keeps them """
+        bit = 1 << pos
+        if not self._is_shared(idx_player, idx_marble, pos):
+            self.ring_mask[idx_player] &= ~bit
+            self.save_mask[idx_player] &= ~bit
+        elif not any(self.saves[idx_player][idx] for idx, pos_marble in enumerate(self.positions[idx_player])
+                     if pos_marble == pos and idx != idx_marble):
+            self.save_mask[idx_player] &= ~bit
+
+    def _is_shared(self, idx_player: int, idx_marble: int, pos: int) -> bool:
+        """ True if another marble of the player is on the position as well (should not happen) """
+        return self.cnt_occupant[pos] > 0 and any(
+            pos_marble == pos for idx, pos_marble in enumerate(self.positions[idx_player]) if idx != idx_marble)
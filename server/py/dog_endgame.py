@@ -0,0 +1,183 @@
+import time
+from typing import Hashable, List, NamedTuple, Optional, Sequence, Tuple
+
+from server.py import dog_tables as tables
+from server.py.dog import Action, Dog, GamePhase, GameState
+from server.py.dog_greedy import GreedyPlayer
+from server.py.dog_ismcts import GamePlayer
+from server.py.dog_movecache import LruCache, get_marble_key
+from server.py.dog_state import EngineState
+from server.py.game import Player
+
+# Values of a position, seen by the team of the active player
+WIN, UNDECIDED, LOSS = 1, 0, -1
+
+
+class EndgameStats(NamedTuple):
+    cnt_hit: int     # positions answered from the memo table
+    cnt_miss: int    # positions searched
+    cnt_entry: int   # positions in the memo table
+
+    @property
+    def hit_rate(self) -> float:
+        cnt = self.cnt_hit + self.cnt_miss
+        return self.cnt_hit / cnt if cnt else 0.0
+
+
+class _OutOfNodes(Exception):
+    pass
+
+
+def is_known(state: GameState) -> bool:
+    """ Whether all hands are in the state (not a player view with the other hands hidden) """
+    return state.cnt_card_draw is None and all(player.cnt_card is None for player in state.list_player)
+
+
+def estimate_size(state: GameState) -> int:
+    """ Rough size of what is left to search: every card in the hands played with any of the marbles
+    outside the finish (or with none) """
+    cnt_outside = sum(marble.pos not in tables.ENDZONE[player.name]
+                      for player in state.list_player for marble in player.list_marble)
+    cnt_card = sum(len(player.list_card) for player in state.list_player)
+    return int((cnt_outside + 1) ** cnt_card)
+
+
+def get_position_key(game: Dog) -> Tuple[Hashable, ...]:
+    """ What the rest of the game depends on: marbles, all hands, the round (it sets the cards dealt next),
+    the active player and the one who started the round (the round ends when the turn comes back to them),
+    the card exchange, the active card and the 7 being played """
+    state = game.state
+    seven = game.seven_steps_counter if game.seven_start is not None else None
+    return (state.cnt_round, state.idx_player_active, state.idx_player_started, state.bool_card_exchanged,
+            game.exchange_counter, state.card_active, seven, get_marble_key(state),
+            tuple(tuple(player.list_card) for player in state.list_player))
+
+
+class EndgameSolver:
+    """ Exact solver of the rest of the round when all hands are known: a team wins if it can finish
+    whatever the other team plays, the value is undecided if the round can end first (the next deal is
+    not known). The actions are applied to one Dog and undone again, the values of the positions seen
+    are kept in a memo table of at most size entries (least recently used dropped first), so later
+    turns of the same endgame are mostly answered from it. A search gives up after max_nodes positions. """
+
+    def __init__(self, size: int = 100_000, max_nodes: int = 50_000) -> None:
+        self.memo: LruCache[int] = LruCache(size)
+        self.max_nodes = max_nodes
+        self.cnt_hit = self.cnt_miss = 0
+        self.cnt_node = 0
+        self.cnt_round = 0
+
+    def solve(self, game: Dog) -> Optional[int]:
+        """ Value of the game's position for the active team, None if the search was too large """
+        self._start(game)
+        try:
+            return self._get_value(game)
+        except _OutOfNodes:
+            return None
+
+    def get_best_action(self, game: Dog, actions: Sequence[Optional[Action]]) \
+            -> Optional[Tuple[Optional[Action], int]]:
+        """ The best of the actions (listed for the game's position) and its value, None if the search
+        was too large """
+        self._start(game)
+        idx_team = game.state.idx_player_active % 2
+        candidates = list(actions) or [None]
+        action_best, value_best = candidates[0], LOSS
+        try:
+            for action in candidates:
+                value = self._get_action_value(game, action, idx_team)
+                if value > value_best:
+                    action_best, value_best = action, value
+                    if value == WIN:
+                        break
+        except _OutOfNodes:
+            return None
+        return action_best, value_best
+
+    def get_stats(self) -> EndgameStats:
+        return EndgameStats(self.cnt_hit, self.cnt_miss, len(self.memo.entries))
+
+    def reset_stats(self) -> None:
+        self.cnt_hit = self.cnt_miss = 0
+
+    def _start(self, game: Dog) -> None:
+        self.cnt_node = 0
+        self.cnt_round = game.state.cnt_round
+
+    def _get_value(self, game: Dog) -> int:
+        state = game.state
+        if state.phase == GamePhase.FINISHED:
+            return self._get_result(state)
+        if state.cnt_round != self.cnt_round:
+            return UNDECIDED  # all cards played, the new ones are not known
+        key = get_position_key(game)
+        value = self.memo.get(key)
+        if value is not None:
+            self.cnt_hit += 1
+            return value
+        self.cnt_miss += 1
+        self.cnt_node += 1
+        if self.cnt_node > self.max_nodes:
+            raise _OutOfNodes()
+        actions: List[Optional[Action]] = [*game.get_list_action()] or [None]
+        idx_team = state.idx_player_active % 2
+        best = LOSS
+        for action in actions:
+            best = max(best, self._get_action_value(game, action, idx_team))
+            if best == WIN:
+                break
+        self.memo.put(key, best)
+        return best
+
+    def _get_action_value(self, game: Dog, action: Optional[Action], idx_team: int) -> int:
+        """ Value of an action for idx_team """
+        game.apply_action(action)
+        try:
+            value = self._get_value(game)
+            return value if game.state.idx_player_active % 2 == idx_team else -value
+        finally:
+            game.undo()
+
+    @staticmethod
+    def _get_result(state: EngineState) -> int:
+        is_finished = [True, True]
+        for idx, player in enumerate(state.list_player):
+            is_finished[(idx - state.idx_player_active) % 2] &= all(
+                marble.pos in tables.ENDZONE[player.name] for marble in player.list_marble)
+        if is_finished[0] == is_finished[1]:
+            return UNDECIDED
+        return WIN if is_finished[0] else LOSS
+
+
+class EndgamePlayer(GamePlayer):
+    """ Dog player solving the rest of the round exactly when it sees all hands and the estimated size
+    (see estimate_size) is at most threshold, else (or when the solver gives up) the fallback player
+    chooses. The solver and its memo table are kept across turns. """
+
+    def __init__(self, fallback: Optional[Player] = None, threshold: int = 10 ** 6,
+                 solver: Optional[EndgameSolver] = None) -> None:
+        self.fallback = fallback if fallback is not None else GreedyPlayer()
+        self.threshold = threshold
+        self.solver = solver if solver is not None else EndgameSolver()
+        self.cnt_solved = 0
+        self.cnt_fallback = 0
+        self.time_select = 0.0
+
+    def select_game_action(self, game: Dog, state: GameState, actions: List[Action]) -> Optional[Action]:
+        """ Solve the game (a copy) if the state the player sees holds all hands, else let the fallback
+        player choose """
+        time_start = time.perf_counter()
+        result = None
+        if len(actions) > 1 and is_known(state) and estimate_size(state) <= self.threshold:
+            result = self.solver.get_best_action(game, actions)
+        if result is not None:
+            self.cnt_solved += 1
+            action = result[0]
+        else:
+            self.cnt_fallback += 1
+            if isinstance(self.fallback, GamePlayer):
+                action = self.fallback.select_game_action(game, state, actions)
+            else:
+                action = self.fallback.select_action(state, actions)
+        self.time_select = time.perf_counter() - time_start
+        return action
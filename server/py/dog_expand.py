@@ -0,0 +1,61 @@
+from typing import Any, List, NamedTuple, Optional, Protocol, Sequence, Tuple
+
+from server.py import dog_tables as tables
+from server.py.dog_state import EngineState, GamePhase
+
+
+class ExpandableGame(Protocol):
+    """ What expand_actions uses of a game (Dog, which imports this module) """
+    state: EngineState
+
+    def get_list_action(self) -> Sequence[Any]:
+        """ The legal actions """
+
+    def apply_action(self, action: Any) -> None:
+        """ Apply an action (None for the pass) """
+
+    def undo(self) -> None:
+        """ Take the last action applied back """
+
+
+class Successor(NamedTuple):
+    action: Any                                # the Action applied (None for the pass)
+    marble_pos: Tuple[Tuple[int, ...], ...]    # positions of the marbles per player afterwards
+    sent_home: Tuple[Tuple[int, int], ...]     # (idx_player, idx_marble) of the marbles sent to their kennel
+    progress_delta: Tuple[int, ...]            # change of the progress per player (see tables.PROGRESS)
+    is_finished: bool                          # the game is over afterwards
+
+
+def expand_actions(game: ExpandableGame, list_action: Optional[Sequence[Any]] = None) -> List[Successor]:
+    """ Apply every action (default: the legal ones, the pass if there is none) to the game, summarise the
+    state it leads to and undo it again. All actions share the game's occupancy index and no state is copied. """
+    # pylint: disable=too-many-locals
+    state = game.state
+    if list_action is None:
+        list_action = game.get_list_action() or [None]
+    list_player = state.list_player
+    progress = [tables.PROGRESS[tables.IDX_COLOUR.get(player.name, idx_player) % len(tables.COLOURS)]
+                for idx_player, player in enumerate(list_player)]
+    kennels = [frozenset(tables.KENNEL.get(player.name, ())) for player in list_player]
+    pos_before = tuple(tuple(marble.pos for marble in player.list_marble) for player in list_player)
+
+    list_successor: List[Successor] = []
+    for action in list_action:
+        game.apply_action(action)
+        marble_pos = tuple(tuple(marble.pos for marble in player.list_marble) for player in list_player)
+        sent_home: List[Tuple[int, int]] = []
+        progress_delta = [0] * len(list_player)
+        for idx_player, (positions, positions_before) in enumerate(zip(marble_pos, pos_before)):
+            if positions == positions_before:
+                continue  # only the players whose marbles moved are looked at
+            table, kennel = progress[idx_player], kennels[idx_player]
+            for idx_marble, (pos, pos_old) in enumerate(zip(positions, positions_before)):
+                if pos != pos_old:
+                    progress_delta[idx_player] += table[pos] - table[pos_old]
+                    if pos in kennel and pos_old not in kennel:
+                        sent_home.append((idx_player, idx_marble))
+        list_successor.append(Successor(action=action, marble_pos=marble_pos, sent_home=tuple(sent_home),
+                                        progress_delta=tuple(progress_delta),
+                                        is_finished=state.phase == GamePhase.FINISHED))
+        game.undo()
+    return list_successor
@@ -0,0 +1,173 @@
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from server.py import dog_seven as seven
+from server.py import dog_tables as tables
+from server.py.dog import Action, GameState
+from server.py.game import Player
+
+FloatArray = npt.NDArray[np.float64]
+
+# Fields an opponent marble can reach with one card (Q 12, K 13), a marble within is at risk
+REACH = 13
+# Cards kept for later: the ones that leave the kennel or split, used last when the scores are equal
+CARD_VALUE: Dict[str, float] = {'JKR': 0.5, 'K': 0.3, 'A': 0.3, '7': 0.2, '4': 0.1, 'J': 0.1}
+
+RANKS = ('2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A', 'JKR')
+# Columns of an action's feature vector (see encode), seen by the team of the active player
+PROGRESS, FINISH, OUT, RISK, BLOCK, HOME_OPPONENT, HOME_TEAM, HOME_PROGRESS, PARTNER, SWAP, EXCHANGE, \
+    KENNEL_OWN, FINISH_OWN, CNT_HAND = range(14)
+RANK_FIRST = CNT_HAND + 1
+CNT_FEATURE = RANK_FIRST + len(RANKS)
+
+
+class Features:
+    """ What the scores of all actions of a turn are computed from: who stands where, which ring fields
+    opponents can reach and the progress tables. Made once per turn from the state (16 marbles), each
+    action is then scored with a few lookups (a 7 with its path), no state is copied. """
+
+    def __init__(self, state: GameState) -> None:
+        self.idx_player = state.idx_player_active
+        self.idx_colour = [tables.IDX_COLOUR.get(player.name, idx) % len(tables.COLOURS)
+                           for idx, player in enumerate(state.list_player)]
+        self.occupant: Dict[int, Tuple[int, bool]] = {}  # pos -> (idx_player, is_save)
+        self.risk = 0                                    # ring mask of the fields opponents can reach
+        for idx, player in enumerate(state.list_player):
+            for marble in player.list_marble:
+                self.occupant[marble.pos] = (idx, marble.is_save)
+                if not self.is_team(idx) and 0 <= marble.pos < tables.CNT_RING:
+                    self.risk |= tables.get_ring_mask((marble.pos + step) % tables.CNT_RING
+                                                      for step in range(1, REACH + 1))
+
+    def is_team(self, idx_player: int) -> bool:
+        return (idx_player - self.idx_player) % 2 == 0
+
+    def get_progress(self, idx_player: int, pos: int) -> int:
+        table = tables.PROGRESS[self.idx_colour[idx_player]]
+        return table[pos] if 0 <= pos < len(table) else 0
+
+    def is_at_risk(self, pos: int) -> bool:
+        return 0 <= pos < tables.CNT_RING and bool(self.risk >> pos & 1)
+
+
+def get_seven_passed(features: Features, idx_player: int, pos_from: int, pos_to: int) -> List[int]:
+    """ Ring fields a 7 step passes, the destination excluded (the marbles on them are sent home) """
+    if pos_to >= tables.CNT_RING:
+        return seven.get_ring_path(features.idx_colour[idx_player], pos_from, 0, into_finish=True)
+    steps = (pos_to - pos_from) % tables.CNT_RING
+    return seven.get_ring_path(features.idx_colour[idx_player], pos_from, steps)[:-1]
+
+
+def encode(state: GameState, actions: Sequence[Action]) -> FloatArray:
+    """ Feature vectors of the actions of the active player (one row each): progress, marbles into the
+    finish and out of the kennel, risk, blocking, marbles sent home, the kind of action, the card played
+    and a few numbers of the own position """
+    features = Features(state)
+    player = state.list_player[state.idx_player_active]
+    rows = np.zeros((len(actions), CNT_FEATURE))
+    rows[:, KENNEL_OWN] = sum(marble.pos in tables.KENNEL[player.name] for marble in player.list_marble)
+    rows[:, FINISH_OWN] = sum(marble.pos in tables.ENDZONE[player.name] for marble in player.list_marble)
+    rows[:, CNT_HAND] = len(player.list_card)
+    for row, action in zip(rows, actions):
+        _encode_action(row, features, action)
+    return rows
+
+
+def _encode_action(row: FloatArray, features: Features, action: Action) -> None:
+    if action.card is not None and action.card.rank in RANKS:
+        row[RANK_FIRST + RANKS.index(action.card.rank)] = 1.0
+    pos_from, pos_to = action.pos_from, action.pos_to
+    if pos_from is None or pos_to is None:
+        row[EXCHANGE] = 1.0  # card exchange or Joker substitute
+        return
+    moved = features.occupant.get(pos_from)
+    if moved is None:
+        return
+    row[PARTNER] = float(moved[0] != features.idx_player)
+    target = features.occupant.get(pos_to)
+    if action.card is not None and action.card.rank == 'J' and target is not None:
+        row[SWAP] = 1.0
+        _encode_move(row, features, moved, pos_from, pos_to)
+        _encode_move(row, features, target, pos_to, pos_from)
+        return
+    _encode_move(row, features, moved, pos_from, pos_to)
+    if target is not None and target[0] != moved[0]:
+        _encode_home(row, features, target[0], pos_to)
+    if action.card is not None and action.card.rank == '7':
+        for pos in get_seven_passed(features, moved[0], pos_from, pos_to):
+            overtaken = features.occupant.get(pos)
+            if overtaken is not None:
+                _encode_home(row, features, overtaken[0], pos)
+
+
+def _encode_move(row: FloatArray, features: Features, marble: Tuple[int, bool], pos_from: int, pos_to: int) -> None:
+    """ Moving a marble (idx_player, is_save), against the features when it is an opponent's """
+    idx_player, is_save = marble
+    sign = 1.0 if features.is_team(idx_player) else -1.0
+    progress_from = features.get_progress(idx_player, pos_from)
+    progress_to = features.get_progress(idx_player, pos_to)
+    row[PROGRESS] += sign * (progress_to - progress_from)
+    row[FINISH] += sign * ((progress_to > tables.CNT_RING) - (progress_from > tables.CNT_RING))
+    row[OUT] += sign * ((progress_to > 0) - (progress_from > 0))
+    if sign > 0:
+        row[RISK] += features.is_at_risk(pos_to) - features.is_at_risk(pos_from)
+        row[BLOCK] += bool(is_save and progress_from == 1)  # the marble on its start blocks the others
+
+
+def _encode_home(row: FloatArray, features: Features, idx_player: int, pos: int) -> None:
+    """ Sending a marble of idx_player home from pos """
+    progress = features.get_progress(idx_player, pos)
+    if features.is_team(idx_player):
+        row[HOME_TEAM] += 1.0
+        row[HOME_PROGRESS] -= progress
+    else:
+        row[HOME_OPPONENT] += 1.0
+        row[HOME_PROGRESS] += progress
+
+
+class GreedyPlayer(Player):
+    """ Dog player choosing the action with the best score, a weighted sum of its features (see encode):
+    progress of the team's marbles (distance to the finish), marbles moved out of the kennel, into the
+    finish and into or out of reach of opponents, the own start given up while it blocks, partner progress
+    and opponents sent home. The cost is bounded by the number of actions (each encoded in constant time),
+    the time of the last choice and the sum over all choices are kept. """
+
+    WEIGHT_PROGRESS = 1.0      # per field of progress of a team marble
+    WEIGHT_HOME = 30.0         # per opponent marble sent home (and against team marbles)
+    WEIGHT_RISK = 8.0          # per team marble moved into reach of an opponent (gain when moved out)
+    WEIGHT_BLOCK = 4.0         # for leaving the own start while it blocks the others
+    WEIGHT_FINISH = 10.0       # per marble moved into the finish
+    WEIGHT_OUT = 8.0           # per marble moved out of the kennel
+
+    def __init__(self) -> None:
+        self.weights = np.zeros(CNT_FEATURE)
+        self.weights[[PROGRESS, HOME_PROGRESS]] = self.WEIGHT_PROGRESS
+        self.weights[FINISH] = self.WEIGHT_FINISH
+        self.weights[OUT] = self.WEIGHT_OUT
+        self.weights[RISK] = -self.WEIGHT_RISK
+        self.weights[BLOCK] = -self.WEIGHT_BLOCK
+        self.weights[HOME_OPPONENT] = self.WEIGHT_HOME
+        self.weights[HOME_TEAM] = -self.WEIGHT_HOME
+        for idx_rank, rank in enumerate(RANKS):
+            self.weights[RANK_FIRST + idx_rank] = -CARD_VALUE.get(rank, 0.0)
+        self.time_select = 0.0
+        self.time_total = 0.0
+        self.cnt_select = 0
+
+    def select_action(self, state: GameState, actions: List[Action]) -> Optional[Action]:
+        """ Given masked game state and possible actions, select the next action """
+        time_start = time.perf_counter()
+        action_best = None
+        if actions:
+            action_best = actions[int(np.argmax(self.get_scores(state, actions)))]
+        self.time_select = time.perf_counter() - time_start
+        self.time_total += self.time_select
+        self.cnt_select += 1
+        return action_best
+
+    def get_scores(self, state: GameState, actions: Sequence[Action]) -> FloatArray:
+        """ Score of each of the actions of the active player """
+        return encode(state, actions) @ self.weights
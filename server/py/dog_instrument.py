@@ -0,0 +1,125 @@
+import functools
+import inspect
+import time
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from server.py.dog import Dog
+
+# get_list_action and the generators it is made of (the times include the generators called inside)
+GENERATORS: Tuple[str, ...] = (
+    'get_list_action', '_get_partner_actions', '_get_exchange_actions', '_get_player_actions',
+    'get_kennel_exit_actions', 'get_board_move_actions', '_get_into_endzone_actions', '_move_inside_endzone_actions',
+    'iter_joker_actions', 'get_jake_actions', 'get_seven_actions')
+# Copies of the whole state: clone (engine state) and get_state / get_player_view (pydantic model)
+COPIES: Tuple[str, ...] = ('clone', '_to_model')
+
+
+class Instrumentation:
+    """ Call counts and cumulative time of the Dog action generators, actions generated and kept after
+    removing the duplicates, and state copies. While enabled the methods of the class are wrapped, when
+    disabled the plain methods are back, so an engine that is not instrumented pays nothing. """
+
+    def __init__(self, cls: type = Dog) -> None:
+        self.cls = cls
+        self.originals: Dict[str, Any] = {}  # attribute of the class -> unwrapped attribute
+        self.cnt_call: Dict[str, int] = dict.fromkeys(GENERATORS, 0)
+        self.time: Dict[str, float] = dict.fromkeys(GENERATORS, 0.0)
+        self.cnt_generated = 0
+        self.cnt_kept = 0
+        self.cnt_copy: Dict[str, int] = dict.fromkeys(COPIES, 0)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.originals)
+
+    def reset(self) -> None:
+        self.cnt_call = dict.fromkeys(GENERATORS, 0)
+        self.time = dict.fromkeys(GENERATORS, 0.0)
+        self.cnt_generated = self.cnt_kept = 0
+        self.cnt_copy = dict.fromkeys(COPIES, 0)
+
+    def enable(self) -> None:
+        if self.enabled:
+            return
+        self.reset()
+        for name in GENERATORS:
+            self._wrap(name, self._timed)
+        for name in COPIES:
+            self._wrap(name, self._counted)
+        self._wrap('_remove_duplicate_actions', self._deduplicated)
+
+    def disable(self) -> None:
+        for name, attribute in self.originals.items():
+            setattr(self.cls, name, attribute)
+        self.originals.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """ The numbers so far, as plain values (e.g. to scrape them periodically) """
+        return {
+            'enabled': self.enabled,
+            'generators': {name: {'calls': self.cnt_call[name], 'seconds': self.time[name]} for name in GENERATORS},
+            'actions_generated': self.cnt_generated,
+            'actions_kept': self.cnt_kept,
+            'copies': dict(self.cnt_copy)}
+
+    def _wrap(self, name: str, wrapper: Callable[[str, Callable[..., Any]], Callable[..., Any]]) -> None:
+        attribute = self.cls.__dict__[name]
+        self.originals[name] = attribute
+        if isinstance(attribute, staticmethod):
+            setattr(self.cls, name, staticmethod(wrapper(name, attribute.__func__)))
+        else:
+            setattr(self.cls, name, wrapper(name, attribute))
+
+    def _timed(self, name: str, method: Callable[..., Any]) -> Callable[..., Any]:
+        if inspect.isgeneratorfunction(method):
+            @functools.wraps(method)
+            def timed_generator(*args: Any, **kwargs: Any) -> Iterator[Any]:
+                self.cnt_call[name] += 1
+                time_start = time.perf_counter()
+                try:
+                    yield from method(*args, **kwargs)  # the time includes the consumer's, it only collects
+                finally:
+                    self.time[name] += time.perf_counter() - time_start
+            return timed_generator
+
+        @functools.wraps(method)
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            self.cnt_call[name] += 1
+            time_start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.time[name] += time.perf_counter() - time_start
+        return timed
+
+    def _counted(self, name: str, method: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(method)
+        def counted(*args: Any, **kwargs: Any) -> Any:
+            self.cnt_copy[name] += 1
+            return method(*args, **kwargs)
+        return counted
+
+    def _deduplicated(self, _: str, method: Callable[..., List[Any]]) -> Callable[..., List[Any]]:
+        @functools.wraps(method)
+        def deduplicated(game: Any, actions: List[Any]) -> List[Any]:
+            kept = method(game, actions)
+            self.cnt_generated += len(actions)
+            self.cnt_kept += len(kept)
+            return kept
+        return deduplicated
+
+
+# The instrumentation of the Dog class, off until enabled
+INSTRUMENTATION = Instrumentation(Dog)
+
+
+def enable() -> None:
+    INSTRUMENTATION.enable()
+
+
+def disable() -> None:
+    INSTRUMENTATION.disable()
+
+
+def snapshot() -> Dict[str, Any]:
+    return INSTRUMENTATION.snapshot()
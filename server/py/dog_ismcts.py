@@ -0,0 +1,252 @@
+import math
+import random
+import time
+from abc import abstractmethod
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Hashable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, cast
+
+from server.py import dog_tables as tables
+from server.py.dog import Action, Dog, GamePhase, GameState
+from server.py.dog_state import LIST_CARD, EngineState
+from server.py.game import Player
+
+# Progress lead (fields, see tables.PROGRESS) of a team that counts as a sure win when a playout is cut off
+LEAD_WIN = 128
+
+
+class _Node:
+    """ Node of the search tree: the action leading to it, who played it and the results seen """
+    __slots__ = ('action', 'idx_player', 'children', 'cnt_visit', 'cnt_available', 'reward')
+
+    def __init__(self, action: Optional[Action], idx_player: int) -> None:
+        self.action = action
+        self.idx_player = idx_player  # player who played the action
+        self.children: Dict[Hashable, '_Node'] = {}
+        self.cnt_visit = 0
+        self.cnt_available = 0        # iterations in which the action was legal
+        self.reward = 0.0             # sum of the results, seen by the team of idx_player
+
+    def get_ucb(self, exploration: float) -> float:
+        return self.reward / self.cnt_visit + exploration * math.sqrt(math.log(self.cnt_available) / self.cnt_visit)
+
+
+def get_action_key(action: Optional[Action]) -> Hashable:
+    return None if action is None else action.key
+
+
+class Determinizer:
+    """ Deals the cards a player cannot see (the other hands and the draw pile) at random from the cards
+    that are not in the own hand or on the discard pile. Hidden hands are counted in a player view
+    (cnt_card, cnt_card_draw), a full state is treated the same way (its hidden cards are not looked at). """
+
+    def __init__(self, state: GameState, idx_player: int) -> None:
+        self.idx_player = idx_player
+        self.hidden = [(idx, len(player.list_card) if player.cnt_card is None else player.cnt_card)
+                       for idx, player in enumerate(state.list_player) if idx != idx_player]
+        self.cnt_draw = len(state.list_card_draw) if state.cnt_card_draw is None else state.cnt_card_draw
+        seen = Counter(state.list_player[idx_player].list_card) + Counter(state.list_card_discard)
+        self.pool = list((Counter(LIST_CARD) - seen).elements())
+
+    def deal(self, game: Dog, rng: random.Random) -> None:
+        """ Replace the hidden cards of the game (which must be at the state this was made from) """
+        cards = self.pool[:]
+        rng.shuffle(cards)
+        cnt_needed = sum(cnt for _, cnt in self.hidden) + self.cnt_draw
+        if len(cards) < cnt_needed:  # made up states can hold more cards than the deck
+            cards.extend(rng.choices(LIST_CARD, k=cnt_needed - len(cards)))
+        idx_card = 0
+        for idx_player, cnt in self.hidden:
+            game.state.list_player[idx_player].list_card[:] = cards[idx_card:idx_card + cnt]
+            idx_card += cnt
+        game.state.list_card_draw[:] = cards[idx_card:idx_card + self.cnt_draw]
+
+
+def evaluate(game: Dog, idx_player: int) -> float:
+    """ Result for the team of idx_player: 1 for a win, 0 for a loss, in between by the progress lead """
+    state = game.state
+    progress = [0, 0]
+    is_finished = [True, True]  # all marbles of the team in the finish
+    for idx, player in enumerate(state.list_player):
+        table = tables.PROGRESS[tables.IDX_COLOUR.get(player.name, idx) % len(tables.COLOURS)]
+        for marble in player.list_marble:
+            progress_marble = table[marble.pos] if 0 <= marble.pos < len(table) else 0
+            progress[(idx - idx_player) % 2] += progress_marble
+            is_finished[(idx - idx_player) % 2] &= progress_marble > tables.CNT_RING
+    if state.phase == GamePhase.FINISHED and is_finished[0] != is_finished[1]:
+        return 1.0 if is_finished[0] else 0.0
+    return min(max(0.5 + (progress[0] - progress[1]) / (2 * LEAD_WIN), 0.0), 1.0)
+
+
+class Turn(NamedTuple):
+    idx_player: int
+    state: GameState                # the player's view the action was chosen on
+    actions: List[Action]
+    action: Optional[Action]
+
+
+def get_game(state: GameState) -> Dog:
+    """ A game at the state, on an engine copy of it. A state does not hold the steps of a 7 being played,
+    a game that is at hand is cloned instead (see GamePlayer). """
+    game = Dog()
+    game.set_state(cast(GameState, EngineState.copy_of(state)))  # an engine state has the same attributes
+    return game
+
+
+class GamePlayer(Player):
+    """ Dog player that searches a copy of the game. play() hands it a clone of the game, so a 7 being
+    played goes on with the steps left; select_action builds the game from the state (see get_game). """
+
+    def select_action(self, state: GameState, actions: List[Action]) -> Optional[Action]:
+        """ Given masked game state and possible actions, select the next action """
+        return self.select_game_action(get_game(state), state, actions)
+
+    @abstractmethod
+    def select_game_action(self, game: Dog, state: GameState, actions: List[Action]) -> Optional[Action]:
+        """ Select the next action of the game (a copy the player may change), state is what the player
+        sees of it """
+
+
+def play(game: Dog, players: Sequence[Player], cnt_steps: int) -> Iterator[Turn]:
+    """ Let players[idx_player % len(players)] play the seat idx_player for at most cnt_steps actions or
+    until the game is over. Every turn is yielded once its action is applied. """
+    for _ in range(cnt_steps):
+        if game.state.phase == GamePhase.FINISHED:
+            return
+        idx_player = game.state.idx_player_active
+        state = game.get_player_view(idx_player)
+        actions = game.get_list_action()
+        player = players[idx_player % len(players)]
+        if isinstance(player, GamePlayer):
+            action = player.select_game_action(game.clone(), state, actions)
+        else:
+            action = player.select_action(state, actions)
+        game.apply_action(action)
+        yield Turn(idx_player, state, actions, action)
+
+
+class Search:
+    """ Single observer information set MCTS: every iteration deals the hidden cards anew, walks down the
+    tree among the actions legal in this deal (UCB1 with the number of times a child was available),
+    adds one node, plays a random playout of at most depth_playout actions and backs up the result.
+    The actions are applied to the game (the search's own copy, state is what the player sees of it) and
+    undone again, no state is copied per iteration. """
+
+    def __init__(self, game: Dog, state: GameState, actions: Sequence[Optional[Action]], seed: Optional[int] = None,
+                 exploration: float = 0.7, depth_playout: int = 40) -> None:
+        # pylint: disable=too-many-arguments
+        self.idx_player = state.idx_player_active
+        self.rng = random.Random(seed)
+        self.exploration = exploration
+        self.depth_playout = depth_playout
+        self.game = game
+        self.game.rng.seed(self.rng.randrange(2 ** 32))
+        self.determinizer = Determinizer(state, self.idx_player)
+        self.root_actions: List[Optional[Action]] = list(actions) or [None]
+        self.root = _Node(None, self.idx_player)
+        self.cnt_playout = 0
+
+    def run(self, time_budget: float, max_playouts: Optional[int] = None) -> Dict[Hashable, int]:
+        """ Search until the time is up (or max_playouts were played), returns the visits per root action """
+        time_end = time.perf_counter() + time_budget
+        while (max_playouts is None or self.cnt_playout < max_playouts) and \
+                (self.cnt_playout == 0 or time.perf_counter() < time_end):
+            self.iterate()
+        return {key: child.cnt_visit for key, child in self.root.children.items()}
+
+    def iterate(self) -> None:
+        game = self.game
+        self.determinizer.deal(game, self.rng)
+        path: List[_Node] = []
+        cnt_applied = 0
+        node = self.root
+        try:
+            while game.state.phase != GamePhase.FINISHED:
+                actions = self.root_actions if node is self.root else self._get_actions()
+                node = self._select(node, actions)
+                path.append(node)
+                cnt_applied += 1
+                if node.cnt_visit == 0:
+                    break  # a new node, the playout goes on from here
+            while cnt_applied - len(path) < self.depth_playout and game.state.phase != GamePhase.FINISHED:
+                game.apply_action(self.rng.choice(self._get_actions()))  # random playout
+                cnt_applied += 1
+            value = evaluate(game, self.idx_player)
+        finally:
+            for _ in range(cnt_applied):
+                game.undo()
+        for node in path:
+            node.cnt_visit += 1
+            node.reward += value if (node.idx_player - self.idx_player) % 2 == 0 else 1.0 - value
+        self.cnt_playout += 1
+
+    def _select(self, node: _Node, actions: Sequence[Optional[Action]]) -> _Node:
+        """ Apply an untried action (a new child) or else the best legal child by UCB """
+        idx_player = self.game.state.idx_player_active
+        untried = [action for action in actions if get_action_key(action) not in node.children]
+        if untried:
+            action = self.rng.choice(untried)
+            child = node.children[get_action_key(action)] = _Node(action, idx_player)
+            child.cnt_available += 1
+        else:
+            children = [node.children[get_action_key(action)] for action in actions]
+            for child in children:
+                child.cnt_available += 1
+            child = max(children, key=lambda child: child.get_ucb(self.exploration))
+        self.game.apply_action(child.action)
+        return child
+
+    def _get_actions(self) -> List[Optional[Action]]:
+        """ The legal actions (the pass if there is none) """
+        return [*self.game.get_list_action()] or [None]
+
+
+def search(game: Dog, state: GameState, actions: Sequence[Optional[Action]], seed: Optional[int],
+           time_budget: float, max_playouts: Optional[int] = None) -> Tuple[Dict[Hashable, int], int]:
+    """ Visits per root action and number of playouts of one search (run by the worker processes) """
+    # pylint: disable=too-many-arguments
+    tree = Search(game, state, actions, seed)
+    return tree.run(time_budget, max_playouts), tree.cnt_playout
+
+
+class ISMCTSPlayer(GamePlayer):
+    """ Dog player searching with information set MCTS for time_budget seconds per action. With
+    cnt_process > 1 the search runs in that many processes at once, their root visits are added
+    (root parallelisation). The number of playouts and the time of the last search are kept. """
+
+    def __init__(self, time_budget: float = 1.0, cnt_process: int = 1, seed: Optional[int] = None,
+                 max_playouts: Optional[int] = None) -> None:
+        self.time_budget = time_budget
+        self.cnt_process = cnt_process
+        self.max_playouts = max_playouts
+        self.rng = random.Random(seed)
+        self.cnt_playout = 0
+        self.time_search = 0.0
+        self._executor: Optional[Executor] = None
+
+    def select_game_action(self, game: Dog, state: GameState, actions: List[Action]) -> Optional[Action]:
+        """ Search the game (a copy) from the state the player sees, select the most visited action """
+        if len(actions) <= 1:
+            return actions[0] if actions else None
+        time_start = time.perf_counter()
+        seeds = [self.rng.randrange(2 ** 32) for _ in range(self.cnt_process)]
+        if self.cnt_process > 1:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.cnt_process)
+            futures = [self._executor.submit(search, game, state, actions, seed, self.time_budget,
+                                             self.max_playouts) for seed in seeds]
+            results = [future.result() for future in futures]
+        else:
+            results = [search(game, state, actions, seeds[0], self.time_budget, self.max_playouts)]
+        visits: Counter[Hashable] = Counter()
+        for visits_search, _ in results:
+            visits.update(visits_search)
+        self.cnt_playout = sum(cnt for _, cnt in results)
+        self.time_search = time.perf_counter() - time_start
+        return max(actions, key=lambda action: visits[get_action_key(action)])
+
+    def close(self) -> None:
+        """ Stop the worker processes (if any) """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
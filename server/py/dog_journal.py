@@ -0,0 +1,164 @@
+import random
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Iterable, MutableSequence, Protocol, Tuple
+
+# Journal entries: (operation, target, ...) with what is needed to take the change back
+SET = 0      # (SET, obj, name, value_old)          attribute was assigned
+POP = 1      # (POP, list)                           item was appended
+INSERT = 2   # (INSERT, list, index, item)           item was removed at index
+DELETE = 3   # (DELETE, list, index)                 item was inserted at index
+REPLACE = 4  # (REPLACE, list, items_old)            list content was replaced (items_old is a copy)
+RNG = 5      # (RNG, rng, state_old)                 random numbers were drawn
+MOVE = 6     # (MOVE, marble, pos_old)               marble was moved
+
+Entry = Tuple[Any, ...]
+
+
+class JournalObserver(Protocol):
+    """ Is told about every change made through the journal (recorded or taken back) """
+
+    def changed(self, obj: Any, name: str, value_old: Any) -> None:
+        """ Attribute 'name' of obj was assigned (a marble move is a change of 'pos') """
+
+    def changed_items(self, items: Any, removed: Iterable[Any], added: Iterable[Any]) -> None:
+        """ Items were removed from and added to a list """
+
+
+class UndoJournal:
+    """ Make/unmake log: every change records how to take it back, grouped per applied action.
+
+    Changes are only recorded while a group is open (see begin). At most 'depth' groups are
+    kept, older ones are dropped. Groups are numbered from the first one ever begun. """
+
+    def __init__(self, move_marble: Callable[[Any, int], None], depth: int) -> None:
+        self.move_marble = move_marble  # moves a marble without recording (keeps indexes in sync)
+        self.groups: Deque[List[Entry]] = deque(maxlen=depth)
+        self.cnt_begun = 0
+        self.observers: List[JournalObserver] = []
+
+    @property
+    def idx_group(self) -> int:
+        """ Number of the current (last) group, -1 if there is none """
+        return self.cnt_begun - 1
+
+    def begin(self) -> None:
+        self.groups.append([])
+        self.cnt_begun += 1
+
+    def clear(self) -> None:
+        self.groups.clear()
+
+    def can_undo(self) -> bool:
+        return bool(self.groups)
+
+    def _record(self, entry: Entry) -> None:
+        if self.groups:
+            self.groups[-1].append(entry)
+
+    # The changes of the game, recorded. The observers are told about each.
+
+    def set(self, obj: Any, name: str, value: Any) -> None:
+        value_old = getattr(obj, name)
+        self._record((SET, obj, name, value_old))
+        setattr(obj, name, value)
+        for observer in self.observers:
+            observer.changed(obj, name, value_old)
+
+    def append(self, items: MutableSequence[Any], item: Any) -> None:
+        items.append(item)
+        self._record((POP, items))
+        for observer in self.observers:
+            observer.changed_items(items, (), (item,))
+
+    def remove(self, items: MutableSequence[Any], item: Any) -> None:
+        self.pop(items, items.index(item))
+
+    def pop(self, items: MutableSequence[Any], index: int = -1) -> Any:
+        index = index % len(items)
+        item = items.pop(index)
+        self._record((INSERT, items, index, item))
+        for observer in self.observers:
+            observer.changed_items(items, (item,), ())
+        return item
+
+    def insert(self, items: MutableSequence[Any], index: int, item: Any) -> None:
+        items.insert(index, item)
+        self._record((DELETE, items, index))
+        for observer in self.observers:
+            observer.changed_items(items, (), (item,))
+
+    def replace(self, items: MutableSequence[Any], items_new: Iterable[Any]) -> None:
+        items_old = items[:]
+        self._record((REPLACE, items, items_old))
+        items[:] = items_new
+        for observer in self.observers:
+            observer.changed_items(items, items_old, items)
+
+    def use_rng(self, rng: random.Random) -> random.Random:
+        """ Record the generator's state before numbers are drawn from it """
+        self._record((RNG, rng, rng.getstate()))
+        return rng
+
+    def move(self, marble: Any, pos: int) -> None:
+        pos_old = marble.pos
+        self._record((MOVE, marble, pos_old))
+        self.move_marble(marble, pos)
+        for observer in self.observers:
+            observer.changed(marble, 'pos', pos_old)
+
+    def undo(self) -> None:
+        """ Take back the changes of the last group and drop it """
+        group = self.groups.pop()
+        groups, self.groups = self.groups, deque()  # no group is open, so that nothing is recorded
+        try:
+            for entry in reversed(group):
+                self._revert(entry)
+        finally:
+            self.groups = groups
+        self.cnt_begun -= 1
+
+    def revert_since(self, idx_group: int) -> None:
+        """ Take back the changes of all groups from idx_group on (the current one excluded) and record
+        this as changes of the current group, so that undo restores them again """
+        idx_first = self.cnt_begun - len(self.groups)
+        if idx_group < idx_first:
+            raise ValueError(f"Undo journal does not reach back to group {idx_group}")
+        groups = list(self.groups)[idx_group - idx_first:-1]
+        for group in reversed(groups):
+            for entry in reversed(group):
+                self._revert(entry)
+
+    def _revert(self, entry: Entry) -> None:
+        """ Take back a change (recorded as a change of the current group, if there is one) """
+        operation = entry[0]
+        if operation == SET:
+            self.set(*entry[1:])
+        elif operation == POP:
+            self.pop(entry[1])
+        elif operation == INSERT:
+            self.insert(*entry[1:])
+        elif operation == DELETE:
+            self.pop(*entry[1:])
+        elif operation == REPLACE:
+            self.replace(*entry[1:])
+        elif operation == RNG:
+            _, rng, state = entry
+            self.use_rng(rng)
+            rng.setstate(state)
+        elif operation == MOVE:
+            self.move(*entry[1:])
+
+    def clone(self, move_marble: Callable[[Any, int], None], memo: Dict[int, Any], idx_group: int) -> 'UndoJournal':
+        """ Journal for a copy of the game with the groups from idx_group on. memo maps the ids of
+        the changed objects to their copies, other lists are copied so that the games share none """
+        journal = UndoJournal(move_marble, self.groups.maxlen or 0)
+        journal.cnt_begun = self.cnt_begun
+        idx_first = self.cnt_begun - len(self.groups)
+        for group in list(self.groups)[max(idx_group - idx_first, 0):]:
+            journal.groups.append([tuple(memo.get(id(item), item[:] if isinstance(item, MutableSequence) else item)
+                                         for item in entry) for entry in group])
+        return journal
+
+    def get_size(self) -> Tuple[int, int]:
+        """ Number of groups and entries kept """
+        return len(self.groups), sum(len(group) for group in self.groups)
@@ -0,0 +1,73 @@
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, NamedTuple, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+
+
+class MoveCacheStats(NamedTuple):
+    cnt_hit: int        # sections answered from the cache
+    cnt_recompute: int  # sections computed
+
+    @property
+    def hit_rate(self) -> float:
+        cnt = self.cnt_hit + self.cnt_recompute
+        return self.cnt_hit / cnt if cnt else 0.0
+
+
+class MarbleMoves(NamedTuple):
+    """ Where a card of one rank takes one marble, a section of the listing (see Dog._get_marble_moves) """
+    into_finish: Tuple[int, ...]
+    in_finish: Tuple[int, ...]
+    on_ring: Tuple[int, ...]
+
+
+class LruCache(Generic[T]):
+    """ Mapping of at most size entries, the least recently used one is dropped first """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.entries: 'OrderedDict[Hashable, T]' = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[T]:
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: T) -> None:
+        self.entries[key] = value
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+
+def get_marble_key(state: Any) -> Tuple[Any, ...]:
+    """ Names and marbles (position, is_save) of all players, what the moves on the board depend on """
+    return tuple((player.name, tuple((marble.pos, marble.is_save) for marble in player.list_marble))
+                 for player in state.list_player)
+
+
+class MoveCache:
+    """ Sections of the listings seen: the moves of one marble with one rank, the Jake swaps of all marbles.
+    A section is kept under a key of everything it depends on, so a listing only computes the sections of
+    the marbles that moved (or whose way changed) and of the ranks that are new in the hand. """
+
+    def __init__(self, size: int = 1024) -> None:
+        self.sections: LruCache[Any] = LruCache(size)
+        self.cnt_hit = self.cnt_recompute = 0
+
+    def get_section(self, key: Hashable, compute: Callable[[], T]) -> T:
+        """ A part of a listing that is the same for every state with the same key (not copied) """
+        section = self.sections.get(key)
+        if section is None:
+            self.cnt_recompute += 1
+            section = compute()
+            self.sections.put(key, section)
+        else:
+            self.cnt_hit += 1
+        return section
+
+    def get_stats(self) -> MoveCacheStats:
+        return MoveCacheStats(self.cnt_hit, self.cnt_recompute)
+
+    def reset_stats(self) -> None:
+        self.cnt_hit = self.cnt_recompute = 0
@@ -0,0 +1,109 @@
+import pickle
+import time
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+from sklearn.linear_model import LogisticRegression  # type: ignore[import-untyped]
+from sklearn.pipeline import make_pipeline  # type: ignore[import-untyped]
+from sklearn.preprocessing import StandardScaler  # type: ignore[import-untyped]
+
+from server.py.dog import Action, Dog, GameState
+from server.py.dog_greedy import CNT_FEATURE, FloatArray, encode
+from server.py.dog_ismcts import play
+from server.py.game import Player
+
+IntArray = npt.NDArray[np.int64]
+
+
+class SelfPlayLog(NamedTuple):
+    features: FloatArray    # one row per legal action of the decisions (see encode)
+    chosen: FloatArray      # 1 for the action the player chose, else 0
+    decision: IntArray      # number of the decision the action belongs to
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(path, features=self.features, chosen=self.chosen, decision=self.decision)
+
+    @staticmethod
+    def load(path: str) -> 'SelfPlayLog':
+        with np.load(path) as data:
+            return SelfPlayLog(data['features'], data['chosen'], data['decision'])
+
+
+def generate(teacher: Player, cnt_games: int, cnt_steps: int = 500, seed: int = 0) -> SelfPlayLog:
+    """ Let the teacher play all four seats of cnt_games games (seeds seed, seed + 1, ...) for at most
+    cnt_steps actions each, and log the decisions with more than one legal action """
+    list_features: List[FloatArray] = []
+    list_chosen: List[FloatArray] = []
+    list_decision: List[IntArray] = []
+    for idx_game in range(cnt_games):
+        for turn in play(Dog(seed=seed + idx_game), [teacher], cnt_steps):
+            if len(turn.actions) > 1 and turn.action is not None:
+                chosen = np.zeros(len(turn.actions))
+                chosen[turn.actions.index(turn.action)] = 1.0
+                list_features.append(encode(turn.state, turn.actions))
+                list_chosen.append(chosen)
+                list_decision.append(np.full(len(turn.actions), len(list_decision), dtype=np.int64))
+    if not list_features:
+        return SelfPlayLog(np.zeros((0, CNT_FEATURE)), np.zeros(0), np.zeros(0, dtype=np.int64))
+    return SelfPlayLog(np.concatenate(list_features), np.concatenate(list_chosen), np.concatenate(list_decision))
+
+
+def get_pairs(log: SelfPlayLog) -> Tuple[FloatArray, FloatArray]:
+    """ Differences of the chosen action's features to those of each other action of its decision
+    (label 1) and the negated ones (label 0), actions with the same features as the chosen one left out """
+    list_difference = []
+    for decision in np.unique(log.decision):
+        rows = log.features[log.decision == decision]
+        is_chosen = log.chosen[log.decision == decision] == 1.0
+        chosen = rows[is_chosen][0]
+        others = rows[~is_chosen]
+        list_difference.append(chosen - others[(others != chosen).any(axis=1)])
+    differences = np.concatenate(list_difference) if list_difference else np.zeros((0, CNT_FEATURE))
+    return np.concatenate([differences, -differences]), \
+        np.concatenate([np.ones(len(differences)), np.zeros(len(differences))])
+
+
+def fit(log: SelfPlayLog) -> Any:
+    """ Linear model of which of two actions the teacher prefers, fitted on the pairs of a decision (see
+    get_pairs): a pointwise fit of chosen or not cannot tell a good action from one that is only good
+    in another position. Its predict_proba of an action is the probability that it is preferred to an
+    action with all features 0, which orders the actions of a decision like the teacher. """
+    model = make_pipeline(StandardScaler(with_mean=False), LogisticRegression(max_iter=1000, fit_intercept=False))
+    model.fit(*get_pairs(log))
+    return model
+
+
+def save_model(model: Any, path: str) -> None:
+    with open(path, 'wb') as file:
+        pickle.dump(model, file)
+
+
+def load_model(path: str) -> Any:
+    """ A model written by save_model (pickled, so only load files you trust) """
+    with open(path, 'rb') as file:
+        return pickle.load(file)
+
+
+class PolicyPlayer(Player):
+    """ Dog player distilled from a slow player's choices: all legal actions are encoded and scored with
+    one predict_proba call of the model (see fit), the most likely choice of the teacher is played. The
+    time of the last choice and the sum over all choices are kept. """
+
+    def __init__(self, model: Any) -> None:
+        self.model = model
+        self.time_select = 0.0
+        self.time_total = 0.0
+        self.cnt_select = 0
+
+    def select_action(self, state: GameState, actions: List[Action]) -> Optional[Action]:
+        """ Given masked game state and possible actions, select the next action """
+        time_start = time.perf_counter()
+        action_best = actions[0] if actions else None
+        if len(actions) > 1:
+            proba = self.model.predict_proba(encode(state, actions))[:, 1]
+            action_best = actions[int(np.argmax(proba))]
+        self.time_select = time.perf_counter() - time_start
+        self.time_total += self.time_select
+        self.cnt_select += 1
+        return action_best
@@ -0,0 +1,140 @@
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Tuple
+
+from server.py import dog_tables as tables
+
+# The moving player's marbles as ((pos, is_save), ...) in the order of PlayerState.list_marble
+MarbleConfig = Tuple[Tuple[int, bool], ...]
+
+CNT_STEPS_SEVEN = 7
+CACHE_SIZE = 1 << 16
+
+
+class ConfigMasks(NamedTuple):
+    ring: int     # ring fields of the own marbles
+    save: int     # ring fields of the own save marbles
+    finish: int   # fields of the own finish lane taken (bit i for the i-th field)
+
+
+class SevenMove(NamedTuple):
+    idx_marble: int        # index in PlayerState.list_marble
+    pos_to: int
+    steps: int
+    config: MarbleConfig   # own marbles after the move (overtaken ones are back in the kennel)
+    masks: ConfigMasks     # of config, updated from the ones before the move
+
+
+def get_config_masks(idx_colour: int, config: MarbleConfig) -> ConfigMasks:
+    """ The masks of a configuration, built from scratch (a game keeps them up to date in its BoardIndex) """
+    endzone = tables.ENDZONE[tables.COLOURS[idx_colour]]
+    finish = 0
+    for pos, _ in config:
+        if pos in endzone:
+            finish |= 1 << (pos - endzone[0])
+    return ConfigMasks(ring=tables.get_ring_mask(pos for pos, _ in config),
+                       save=tables.get_ring_mask(pos for pos, is_save in config if is_save), finish=finish)
+
+
+def get_ring_path(idx_colour: int, pos_from: int, steps: int, into_finish: bool = False) -> List[int]:
+    """ Ring positions a marble passes on a 7 move, destination included (overtaken marbles go home) """
+    if pos_from >= tables.CNT_RING:
+        return []  # moving inside the finish
+    if into_finish:
+        steps = (tables.START_POSITIONS[tables.COLOURS[idx_colour]] - pos_from) % tables.CNT_RING
+    return [(pos_from + step) % tables.CNT_RING for step in range(1, steps + 1)]
+
+
+def _send_home(config: List[Tuple[int, bool]], idx_colour: int, path: List[int]) -> None:
+    """ Put the own marbles standing on the path back to the first free kennel position """
+    kennel = tables.KENNEL[tables.COLOURS[idx_colour]]
+    for pos in path:
+        for idx_marble, (pos_marble, _) in enumerate(config):
+            if pos_marble == pos:
+                occupied = {pos_other for pos_other, _ in config}
+                pos_home = next((pos_kennel for pos_kennel in kennel if pos_kennel not in occupied), kennel[0])
+                config[idx_marble] = (pos_home, False)
+
+
+def _get_marble_moves(idx_colour: int, config: MarbleConfig, masks: ConfigMasks, blocked: int,
+                      idx_marble: int, steps: int) -> List[SevenMove]:
+    """ Moves of one marble by exactly 'steps' fields: along the ring and/or into (or inside) the finish.
+    Paths are checked with one AND of their PATH_MASK against the blocked fields. """
+    # pylint: disable=too-many-arguments,too-many-locals
+    moves: List[SevenMove] = []
+    pos, is_save = config[idx_marble]
+    colour = tables.COLOURS[idx_colour]
+    endzone = tables.ENDZONE[colour]
+    bit_own = 1 << pos if 0 <= pos < tables.CNT_RING else 0
+    own_ring = masks.ring & ~bit_own
+    # save marbles (fresh out of the kennel) block everybody, the own ones included
+    blocking = blocked | masks.save & ~bit_own
+    finish_taken = masks.finish
+    bit_lane = 1 << (pos - endzone[0]) if pos in endzone else 0
+
+    def add_move(pos_to: int, is_save_to: bool, steps_ring: int) -> None:
+        config_new = list(config)
+        ring, save = own_ring, masks.save & ~bit_own
+        home = own_ring & tables.PATH_MASK[pos][steps_ring + tables.STEP_OFFSET] if steps_ring else 0
+        if home:  # overtaken own marbles go home
+            _send_home(config_new, idx_colour, get_ring_path(idx_colour, pos, steps_ring))
+            ring, save = ring & ~home, save & ~home
+        config_new[idx_marble] = (pos_to, is_save_to)
+        finish = finish_taken & ~bit_lane
+        if pos_to < tables.CNT_RING:
+            ring |= 1 << pos_to
+        else:
+            finish |= 1 << (pos_to - endzone[0])
+        moves.append(SevenMove(idx_marble=idx_marble, pos_to=pos_to, steps=steps, config=tuple(config_new),
+                               masks=ConfigMasks(ring=ring, save=save, finish=finish)))
+
+    if 0 <= pos < tables.CNT_RING:
+        if not blocking & tables.PATH_MASK[pos][steps + tables.STEP_OFFSET]:
+            add_move((pos + steps) % tables.CNT_RING, False, steps)
+
+        pos_to_finish = tables.MOVE_TABLE[idx_colour][pos][steps + tables.STEP_OFFSET].pos_to_finish
+        if pos_to_finish is not None and not is_save:  # no shortcut into the finish straight from the kennel
+            steps_ring = (tables.START_POSITIONS[colour] - pos) % tables.CNT_RING
+            if not blocking & tables.PATH_MASK[pos][steps_ring + tables.STEP_OFFSET] and \
+                    not finish_taken & tables.LANE_UPTO[pos_to_finish - endzone[0]]:
+                add_move(pos_to_finish, True, steps_ring)
+
+    elif pos in endzone:
+        pos_to = pos + steps
+        if pos_to <= endzone[-1] and \
+                not finish_taken & tables.LANE_UPTO[pos_to - endzone[0]] & ~tables.LANE_UPTO[pos - endzone[0]]:
+            add_move(pos_to, True, 0)
+
+    return moves
+
+
+# The functions below take the masks of config, if they are not given they are built from it
+
+@lru_cache(maxsize=CACHE_SIZE)
+def get_moves(idx_colour: int, config: MarbleConfig, blocked: int, steps: int,
+              masks: Optional[ConfigMasks] = None) -> Tuple[SevenMove, ...]:
+    """ All moves of one own marble by exactly 'steps' fields (blocked: ring mask of foreign save marbles) """
+    masks = masks or get_config_masks(idx_colour, config)
+    return tuple(move for idx_marble in range(len(config))
+                 for move in _get_marble_moves(idx_colour, config, masks, blocked, idx_marble, steps))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def can_complete(idx_colour: int, config: MarbleConfig, blocked: int, steps_remaining: int,
+                 masks: Optional[ConfigMasks] = None) -> bool:
+    """ True if the remaining steps of a 7 can all be moved """
+    if steps_remaining == 0:
+        return True
+    return any(can_complete(idx_colour, move.config, blocked, steps_remaining - steps, move.masks)
+               for steps in range(1, steps_remaining + 1)
+               for move in get_moves(idx_colour, config, blocked, steps, masks))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def get_next_moves(idx_colour: int, config: MarbleConfig, blocked: int, steps_remaining: int,
+                   masks: Optional[ConfigMasks] = None) -> Tuple[SevenMove, ...]:
+    """ The next partial moves of a 7 after which the split can still be completed,
+    ordered by marble, then by steps """
+    moves = [move for steps in range(1, steps_remaining + 1)
+             for move in get_moves(idx_colour, config, blocked, steps, masks)
+             if can_complete(idx_colour, move.config, blocked, steps_remaining - steps, move.masks)]
+    return tuple(sorted(moves, key=lambda move: move.idx_marble))
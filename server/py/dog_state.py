@@ -0,0 +1,315 @@
+from collections.abc import MutableSequence
+from enum import Enum
+from typing import Any, ClassVar, Dict, Iterable, Iterator, List, Optional, Tuple, Union, overload
+
+from pydantic import BaseModel, ConfigDict
+
+from server.py import dog_tables as tables
+
+
+class Card(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    suit: str  # card suit (color)
+    rank: str  # card rank
+
+    @classmethod
+    def of(cls, suit: str, rank: str) -> 'Card':
+        """ The canonical (interned) instance of a card """
+        card = _INTERNED_CARDS.get((suit, rank))
+        if card is None:
+            card = _INTERNED_CARDS.setdefault((suit, rank), cls(suit=suit, rank=rank))
+        return card
+
+    def interned(self) -> 'Card':
+        """ The canonical instance equal to this card """
+        return _INTERNED_CARDS.setdefault((self.suit, self.rank), self)
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if isinstance(other, Card):
+            return self.suit == other.suit and self.rank == other.rank
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((self.suit, self.rank))
+
+    def __deepcopy__(self, memo: Optional[Dict[int, Any]] = None) -> 'Card':
+        return self  # immutable, copies of a game state share their cards
+
+
+_INTERNED_CARDS: Dict[Tuple[str, str], Card] = {}
+
+LIST_SUIT: List[str] = ['♠', '♥', '♦', '♣']  # 4 suits (colors)
+LIST_RANK: List[str] = [
+    '2', '3', '4', '5', '6', '7', '8', '9', '10',      # 13 ranks + Joker
+    'J', 'Q', 'K', 'A', 'JKR'
+]
+LIST_CARD: List[Card] = [
+    # 2: Move 2 spots forward
+    Card(suit='♠', rank='2'), Card(suit='♥', rank='2'), Card(suit='♦', rank='2'), Card(suit='♣', rank='2'),
+    # 3: Move 3 spots forward
+    Card(suit='♠', rank='3'), Card(suit='♥', rank='3'), Card(suit='♦', rank='3'), Card(suit='♣', rank='3'),
+    # 4: Move 4 spots forward or back
+    Card(suit='♠', rank='4'), Card(suit='♥', rank='4'), Card(suit='♦', rank='4'), Card(suit='♣', rank='4'),
+    # 5: Move 5 spots forward
+    Card(suit='♠', rank='5'), Card(suit='♥', rank='5'), Card(suit='♦', rank='5'), Card(suit='♣', rank='5'),
+    # 6: Move 6 spots forward
+    Card(suit='♠', rank='6'), Card(suit='♥', rank='6'), Card(suit='♦', rank='6'), Card(suit='♣', rank='6'),
+    # 7: Move 7 single steps forward
+    Card(suit='♠', rank='7'), Card(suit='♥', rank='7'), Card(suit='♦', rank='7'), Card(suit='♣', rank='7'),
+    # 8: Move 8 spots forward
+    Card(suit='♠', rank='8'), Card(suit='♥', rank='8'), Card(suit='♦', rank='8'), Card(suit='♣', rank='8'),
+    # 9: Move 9 spots forward
+    Card(suit='♠', rank='9'), Card(suit='♥', rank='9'), Card(suit='♦', rank='9'), Card(suit='♣', rank='9'),
+    # 10: Move 10 spots forward
+    Card(suit='♠', rank='10'), Card(suit='♥', rank='10'), Card(suit='♦', rank='10'), Card(suit='♣', rank='10'),
+    # Jake: A marble must be exchanged
+    Card(suit='♠', rank='J'), Card(suit='♥', rank='J'), Card(suit='♦', rank='J'), Card(suit='♣', rank='J'),
+    # Queen: Move 12 spots forward
+    Card(suit='♠', rank='Q'), Card(suit='♥', rank='Q'), Card(suit='♦', rank='Q'), Card(suit='♣', rank='Q'),
+    # King: Start or move 13 spots forward
+    Card(suit='♠', rank='K'), Card(suit='♥', rank='K'), Card(suit='♦', rank='K'), Card(suit='♣', rank='K'),
+    # Ass: Start or move 1 or 11 spots forward
+    Card(suit='♠', rank='A'), Card(suit='♥', rank='A'), Card(suit='♦', rank='A'), Card(suit='♣', rank='A'),
+    # Joker: Use as any other card you want
+    Card(suit='', rank='JKR'), Card(suit='', rank='JKR'), Card(suit='', rank='JKR')
+] * 2
+LIST_CARD = [card.interned() for card in LIST_CARD]
+
+# Card ids: the distinct cards of the deck are 0 to 52 in deck order (as in the action space)
+LIST_CARD_BY_ID: List[Card] = list(dict.fromkeys(LIST_CARD))
+CARD_IDS: Dict[Card, int] = {card: idx for idx, card in enumerate(LIST_CARD_BY_ID)}
+
+
+def get_card_id(card: Card) -> int:
+    """ Id of a card (suit and rank are LIST_CARD_BY_ID[id]), a card not in the deck raises a ValueError """
+    idx = CARD_IDS.get(card)
+    if idx is None:
+        raise ValueError(f'Card {card.suit}{card.rank} is not in the deck')
+    return idx
+
+
+class CardPile(MutableSequence[Card]):  # pylint: disable=too-many-ancestors
+    """ Cards (hand, draw or discard pile) as a compact array of card ids, with the list interface the
+    engine uses. Moving cards between piles neither creates Card objects nor allocates lists. """
+    __slots__ = ('ids',)
+
+    def __init__(self, cards: Iterable[Card] = ()) -> None:
+        self.ids: bytearray = bytearray(cards.ids if isinstance(cards, CardPile) else map(get_card_id, cards))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[Card]:
+        return map(LIST_CARD_BY_ID.__getitem__, self.ids)
+
+    @overload
+    def __getitem__(self, index: int) -> Card: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> 'CardPile': ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Card, 'CardPile']:
+        if isinstance(index, slice):
+            pile = CardPile()
+            pile.ids = self.ids[index]
+            return pile
+        return LIST_CARD_BY_ID[self.ids[index]]
+
+    @overload
+    def __setitem__(self, index: int, value: Card) -> None: ...
+
+    @overload
+    def __setitem__(self, index: slice, value: Iterable[Card]) -> None: ...
+
+    def __setitem__(self, index: Union[int, slice], value: Any) -> None:
+        if isinstance(index, slice):
+            self.ids[index] = value.ids if isinstance(value, CardPile) else bytes(map(get_card_id, value))
+        else:
+            self.ids[index] = get_card_id(value)
+
+    def __delitem__(self, index: Union[int, slice]) -> None:
+        del self.ids[index]
+
+    def __contains__(self, card: object) -> bool:
+        idx = CARD_IDS.get(card) if isinstance(card, Card) else None
+        return idx is not None and idx in self.ids
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CardPile):
+            return self.ids == other.ids
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]  # mutable
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def insert(self, index: int, value: Card) -> None:
+        self.ids.insert(index, get_card_id(value))
+
+    def append(self, value: Card) -> None:
+        self.ids.append(get_card_id(value))
+
+    def pop(self, index: int = -1) -> Card:
+        return LIST_CARD_BY_ID[self.ids.pop(index)]
+
+    def index(self, value: Any, start: int = 0, stop: int = 2 ** 31) -> int:
+        idx = CARD_IDS.get(value) if isinstance(value, Card) else None
+        if idx is None:
+            raise ValueError(f"{value} is not in the pile")
+        return self.ids.index(idx, start, stop)
+
+    def remove(self, value: Card) -> None:
+        del self.ids[self.index(value)]
+
+    def clear(self) -> None:
+        self.ids.clear()
+
+
+# The full deck, to refill the draw pile from (never changed)
+DECK = CardPile(LIST_CARD)
+
+# The pydantic models of a game state, as seen by get_state, set_state and get_player_view
+
+class Marble(BaseModel):
+    pos: int       # position on board (0 to 95)
+    is_save: bool  # true if marble was moved out of kennel and was not yet moved
+
+
+class PlayerState(BaseModel):
+    name: str                  # name of player
+    list_card: List[Card]      # list of cards
+    list_marble: List[Marble]  # list of marbles
+    teamMate: str
+    cnt_card: Optional[int] = None  # number of cards, if they are hidden (see Dog.get_player_view)
+
+
+class GamePhase(str, Enum):
+    SETUP = 'setup'            # before the game has started
+    RUNNING = 'running'        # while the game is running
+    FINISHED = 'finished'      # when the game is finished
+
+
+class GameState(BaseModel):
+
+    LIST_SUIT: ClassVar[List[str]] = LIST_SUIT  # 4 suits (colors)
+    LIST_RANK: ClassVar[List[str]] = LIST_RANK  # 13 ranks + Joker
+    LIST_CARD: ClassVar[List[Card]] = LIST_CARD  # 2 decks with 3 Jokers each
+
+    cnt_player: int = 4                # number of players (must be 4)
+    phase: GamePhase                   # current phase of the game
+    cnt_round: int                     # current round
+    bool_card_exchanged: bool          # true if cards was exchanged in round
+    idx_player_started: int            # index of player that started the round
+    idx_player_active: int             # index of active player in round
+    list_player: List[PlayerState]     # list of players
+    list_card_draw: List[Card]         # list of cards to draw
+    list_card_discard: List[Card]      # list of cards discarded
+    card_active: Optional[Card]        # active card (for 7 and JKR with sequence of actions)
+    cnt_card_draw: Optional[int] = None  # number of cards to draw, if they are hidden (see Dog.get_player_view)
+
+    @staticmethod
+    def get_card_steps(rank: str) -> Union[int, Tuple[int, ...]]:
+        return tables.RANK_STEPS.get(rank, 0)
+
+    @staticmethod
+    def is_valid_move(pos_to: int, marbles: List[Marble]) -> bool:
+        """ Validate if a move from pos_from to pos_to is allowed """
+        # check if own marble occupies spot
+        for marble in marbles:
+            if int(marble.pos) == pos_to:
+                return False
+
+        return True
+
+
+# Engine state: the game mutates these plain classes (the pydantic models above are only
+# used by get_state, set_state and get_player_view). The attribute names are the same, so
+# the engine also runs on the models, e.g. when a test assigns them directly.
+
+class EngineMarble:
+    __slots__ = ('pos', 'is_save')
+
+    def __init__(self, pos: int, is_save: bool) -> None:
+        self.pos = pos            # position on board (0 to 95)
+        self.is_save = is_save    # true if marble was moved out of kennel and was not yet moved
+
+    def __repr__(self) -> str:
+        return f"EngineMarble(pos={self.pos}, is_save={self.is_save})"
+
+
+class EnginePlayer:
+    __slots__ = ('name', 'list_card', 'list_marble', 'teamMate')
+
+    def __init__(self, name: str, list_card: CardPile, list_marble: List[EngineMarble], teamMate: str) -> None:
+        # pylint: disable=invalid-name
+        self.name = name
+        self.list_card = list_card
+        self.list_marble = list_marble
+        self.teamMate = teamMate
+
+    def __repr__(self) -> str:
+        return f"EnginePlayer(name={self.name!r}, list_card={self.list_card}, list_marble={self.list_marble})"
+
+
+class EngineState:
+    __slots__ = ('cnt_player', 'phase', 'cnt_round', 'bool_card_exchanged', 'idx_player_started',
+                 'idx_player_active', 'list_player', 'list_card_draw', 'list_card_discard', 'card_active')
+
+    LIST_SUIT: ClassVar[List[str]] = LIST_SUIT
+    LIST_RANK: ClassVar[List[str]] = LIST_RANK
+    LIST_CARD: ClassVar[List[Card]] = LIST_CARD
+
+    def __init__(self, phase: Any, cnt_round: int, bool_card_exchanged: bool, idx_player_started: int,
+                 idx_player_active: int, list_player: List[EnginePlayer], list_card_draw: CardPile,
+                 list_card_discard: CardPile, card_active: Optional[Card], cnt_player: int = 4) -> None:
+        # pylint: disable=too-many-arguments
+        self.cnt_player = cnt_player
+        self.phase = phase
+        self.cnt_round = cnt_round
+        self.bool_card_exchanged = bool_card_exchanged
+        self.idx_player_started = idx_player_started
+        self.idx_player_active = idx_player_active
+        self.list_player = list_player
+        self.list_card_draw = list_card_draw
+        self.list_card_discard = list_card_discard
+        self.card_active = card_active
+
+    @staticmethod
+    def get_card_steps(rank: str) -> Union[int, Tuple[int, ...]]:
+        return tables.RANK_STEPS.get(rank, 0)
+
+    @classmethod
+    def copy_of(cls, state: Any, memo: Optional[Dict[int, Any]] = None) -> 'EngineState':
+        """ Engine copy of a state (engine state or GameState model). If given, memo
+        maps the id of every copied object (state, players, marbles and lists) to its copy. """
+        list_player = []
+        for player in state.list_player:
+            list_marble = [EngineMarble(marble.pos, marble.is_save) for marble in player.list_marble]
+            player_new = EnginePlayer(player.name, CardPile(player.list_card), list_marble, player.teamMate)
+            list_player.append(player_new)
+            if memo is not None:
+                memo.update(zip(map(id, player.list_marble), list_marble))
+                memo[id(player)] = player_new
+                memo[id(player.list_card)] = player_new.list_card
+                memo[id(player.list_marble)] = list_marble
+        state_new = cls(phase=state.phase, cnt_round=state.cnt_round, bool_card_exchanged=state.bool_card_exchanged,
+                        idx_player_started=state.idx_player_started, idx_player_active=state.idx_player_active,
+                        list_player=list_player, list_card_draw=CardPile(state.list_card_draw),
+                        list_card_discard=CardPile(state.list_card_discard), card_active=state.card_active,
+                        cnt_player=state.cnt_player)
+        if memo is not None:
+            memo[id(state)] = state_new
+            memo[id(state.list_player)] = list_player
+            memo[id(state.list_card_draw)] = state_new.list_card_draw
+            memo[id(state.list_card_discard)] = state_new.list_card_discard
+        return state_new
+
+    def clone(self) -> 'EngineState':
+        """ Independent copy """
+        return EngineState.copy_of(self)
@@ -0,0 +1,104 @@
+from typing import List, Optional, Sequence, Tuple
+
+from server.py import dog_tables as tables
+from server.py.dog import Action, Dog, GameState, Marble, PlayerState
+
+# The board turns by a quarter from one seat to the next: 16 ring fields and 8 kennel/finish fields
+CNT_SEAT = len(tables.COLOURS)
+RING_PER_SEAT = tables.CNT_RING // CNT_SEAT
+CNT_ZONE = tables.CNT_POSITIONS - tables.CNT_RING
+ZONE_PER_SEAT = CNT_ZONE // CNT_SEAT
+
+
+def rotate_pos(pos: int, cnt_seat: int) -> int:
+    """ Position moved on by cnt_seat seats (positions off the board stay where they are) """
+    if not 0 <= pos < tables.CNT_POSITIONS:
+        return pos
+    if pos < tables.CNT_RING:
+        return (pos + cnt_seat * RING_PER_SEAT) % tables.CNT_RING
+    return tables.CNT_RING + (pos - tables.CNT_RING + cnt_seat * ZONE_PER_SEAT) % CNT_ZONE
+
+
+def rotate_colour(colour: str, cnt_seat: int) -> str:
+    """ Colour of the seat cnt_seat seats on (names that are no colour are kept) """
+    idx_colour = tables.IDX_COLOUR.get(colour)
+    return colour if idx_colour is None else tables.COLOURS[(idx_colour + cnt_seat) % CNT_SEAT]
+
+
+def rotate_state(state: GameState, cnt_seat: int) -> GameState:
+    """ Copy of the state with every seat moved on by cnt_seat: the player of seat i sits at seat i + cnt_seat
+    (with that seat's colour), the marbles are moved accordingly. The cards are the same. The engine
+    finds partners by seat (idx + 2), the teamMate names are turned like the colours. """
+    cnt_player = len(state.list_player)
+    list_player: List[PlayerState] = []
+    for idx_player in range(cnt_player):
+        player = state.list_player[(idx_player - cnt_seat) % cnt_player]
+        list_player.append(PlayerState(
+            name=tables.COLOURS[idx_player], teamMate=rotate_colour(player.teamMate, cnt_seat),
+            list_card=list(player.list_card), cnt_card=player.cnt_card,
+            list_marble=[Marble(pos=rotate_pos(marble.pos, cnt_seat), is_save=marble.is_save)
+                         for marble in player.list_marble]))
+    return state.model_copy(update={
+        'list_player': list_player,
+        'idx_player_active': (state.idx_player_active + cnt_seat) % cnt_player,
+        'idx_player_started': (state.idx_player_started + cnt_seat) % cnt_player,
+        'list_card_draw': list(state.list_card_draw),
+        'list_card_discard': list(state.list_card_discard)})
+
+
+def rotate_action(action: Optional[Action], cnt_seat: int) -> Optional[Action]:
+    if action is None or (action.pos_from is None and action.pos_to is None):
+        return action
+    pos_from, pos_to = action.pos_from, action.pos_to
+    return Action(card=action.card, pos_from=None if pos_from is None else rotate_pos(pos_from, cnt_seat),
+                  pos_to=None if pos_to is None else rotate_pos(pos_to, cnt_seat), card_swap=action.card_swap)
+
+
+def rotate_actions(actions: Sequence[Optional[Action]], cnt_seat: int) -> List[Optional[Action]]:
+    return [rotate_action(action, cnt_seat) for action in actions]
+
+
+def is_seat_independent(state: GameState, cnt_seat: int) -> bool:
+    """ True if the state turned by cnt_seat seats has the same legal moves (turned as well). Moves along
+    the ring don't go round from 63 to 0 (see Dog.get_board_move_actions), so a marble of the active player that
+    can make one of its ring steps in only one of the two frames changes the moves. """
+    if not state.bool_card_exchanged or state.card_active is not None:
+        return True  # no moves along the ring are listed
+    player = state.list_player[state.idx_player_active]
+    list_step = {step for card in player.list_card if card.rank in Dog.RING_RANKS
+                 for step in tables.CARD_STEPS[card.rank]}
+    pos_start = tables.START_POSITIONS.get(player.name)
+    for marble in player.list_marble:
+        # only save marbles move along the ring, a marble on its start counts as save
+        if 0 <= marble.pos < tables.CNT_RING and (marble.is_save or marble.pos == pos_start):
+            pos_turned = rotate_pos(marble.pos, cnt_seat)
+            if any((marble.pos + step < tables.CNT_RING) != (pos_turned + step < tables.CNT_RING)
+                   for step in list_step):
+                return False
+    return True
+
+
+def to_canonical(state: GameState) -> Tuple[GameState, int]:
+    """ The state seen from the active player's seat (the active player is Blue at seat 0) and the
+    number of seats it was turned by. Positions that are the same up to the seats have the same
+    canonical state, so caches and learned policies keyed on it share them. The rules are the same
+    from every seat, only the deal of a new round goes by seat (which cards come next is chance anyway)
+    and moves along the ring don't go round from 63 to 0: a state whose moves would change when turned is
+    refused with a ValueError (see is_seat_independent). """
+    cnt_seat = -state.idx_player_active % len(state.list_player)
+    if not is_seat_independent(state, cnt_seat):
+        raise ValueError("The legal moves of the state depend on the seat, it has no canonical form")
+    return rotate_state(state, cnt_seat), cnt_seat
+
+
+def from_canonical(state: GameState, cnt_seat: int) -> GameState:
+    """ Turn a canonical state (see to_canonical) back to the original seats """
+    return rotate_state(state, -cnt_seat)
+
+
+def actions_to_canonical(actions: Sequence[Optional[Action]], cnt_seat: int) -> List[Optional[Action]]:
+    return rotate_actions(actions, cnt_seat)
+
+
+def actions_from_canonical(actions: Sequence[Optional[Action]], cnt_seat: int) -> List[Optional[Action]]:
+    return rotate_actions(actions, -cnt_seat)
@@ -0,0 +1,146 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+# Board layout: 64 ring positions (0-63), then per colour 4 kennel and 4 finish positions (64-95)
+COLOURS: Tuple[str, ...] = ("Blue", "Green", "Red", "Yellow")
+
+START_POSITIONS: Dict[str, int] = {
+    "Blue": 0,
+    "Green": 16,
+    "Red": 32,
+    "Yellow": 48
+}
+
+KENNEL: Dict[str, List[int]] = {
+    "Blue": [64, 65, 66, 67],
+    "Green": [72, 73, 74, 75],
+    "Red": [80, 81, 82, 83],
+    "Yellow": [88, 89, 90, 91]
+}
+
+ENDZONE: Dict[str, List[int]] = {
+    "Blue": [68, 69, 70, 71],
+    "Green": [76, 77, 78, 79],
+    "Red": [84, 85, 86, 87],
+    "Yellow": [92, 93, 94, 95]
+}
+
+CNT_RING = 64
+CNT_POSITIONS = 96
+
+IDX_COLOUR: Dict[str, int] = {colour: idx for idx, colour in enumerate(COLOURS)}
+
+# Steps per card rank as returned by GameState.get_card_steps (0 for cards that don't move)
+RANK_STEPS: Dict[str, Union[int, Tuple[int, ...]]] = {
+    '2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '8': 8, '9': 9, '10': 10,
+    '7': (1, 2, 3, 4, 5, 6, 7),
+    'Q': 12,
+    'K': 13,
+    'A': (1, 11)
+}
+
+# Same as RANK_STEPS, but always a tuple and empty for cards that don't move (J, JKR)
+CARD_STEPS: Dict[str, Tuple[int, ...]] = {
+    rank: steps if isinstance(steps, tuple) else (steps,) for rank, steps in RANK_STEPS.items()
+}
+CARD_STEPS.update({'J': (), 'JKR': ()})
+
+# Step values covered by MOVE_TABLE: 1-13 forward (Ace 1/11 and the 7 splits included), 4 backwards
+LIST_STEP: Tuple[int, ...] = (-4,) + tuple(range(1, 14))
+STEP_OFFSET = 4  # MOVE_TABLE[idx_colour][pos][step + STEP_OFFSET]
+
+
+class Move(NamedTuple):
+    pos_to: Optional[int]         # destination on the ring or inside the finish, None if illegal
+    pos_to_finish: Optional[int]  # destination when entering the own finish, None if not reachable
+    passes_start: bool            # own start field lies on the path (destination included)
+
+
+ILLEGAL = Move(pos_to=None, pos_to_finish=None, passes_start=False)
+
+
+def _get_move(idx_colour: int, pos: int, step: int) -> Move:
+    """ Where a marble of the given colour ends up when moving 'step' fields from 'pos' """
+    colour = COLOURS[idx_colour]
+    pos_start = START_POSITIONS[colour]
+    endzone = ENDZONE[colour]
+
+    if pos < CNT_RING:
+        pos_to = (pos + step) % CNT_RING
+        if step > 0:
+            dist_start = (pos_start - pos) % CNT_RING  # steps until the own start is reached
+            passes_start = 0 < dist_start <= step
+            steps_in_finish = step - dist_start
+            pos_to_finish = endzone[steps_in_finish - 1] if 1 <= steps_in_finish <= len(endzone) else None
+        else:
+            dist_start = (pos - pos_start) % CNT_RING
+            passes_start = 0 < dist_start <= -step
+            pos_to_finish = None
+        return Move(pos_to=pos_to, pos_to_finish=pos_to_finish, passes_start=passes_start)
+
+    if pos in endzone and step > 0 and pos + step <= endzone[-1]:
+        return Move(pos_to=pos + step, pos_to_finish=pos + step, passes_start=False)
+
+    return ILLEGAL
+
+
+def _build_move_table() -> Tuple[Tuple[Tuple[Move, ...], ...], ...]:
+    list_step_indexed = [step - STEP_OFFSET for step in range(STEP_OFFSET + max(LIST_STEP) + 1)]
+    return tuple(
+        tuple(
+            tuple(_get_move(idx_colour, pos, step) if step in LIST_STEP else ILLEGAL for step in list_step_indexed)
+            for pos in range(CNT_POSITIONS)
+        )
+        for idx_colour in range(len(COLOURS))
+    )
+
+
+# MOVE_TABLE[idx_colour][pos][step + STEP_OFFSET] -> Move, built once at import
+MOVE_TABLE = _build_move_table()
+
+
+def _get_progress(idx_colour: int, pos: int) -> int:
+    """ How far a marble of the given colour has come: 0 in the kennel, 1 to 64 on the ring (1 on the
+    own start) and 65 to 68 in the finish. Positions of other colours' kennels and finishes count 0. """
+    colour = COLOURS[idx_colour]
+    if pos < CNT_RING:
+        return (pos - START_POSITIONS[colour]) % CNT_RING + 1
+    if pos in ENDZONE[colour]:
+        return CNT_RING + 1 + ENDZONE[colour].index(pos)
+    return 0
+
+
+# PROGRESS[idx_colour][pos] -> progress of a marble (see _get_progress)
+PROGRESS: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(_get_progress(idx_colour, pos) for pos in range(CNT_POSITIONS)) for idx_colour in range(len(COLOURS)))
+
+
+# Bitmasks: bit pos for a ring position, bit i for the i-th field of a finish lane
+def get_ring_mask(positions: Iterable[int]) -> int:
+    """ Bitmask of the ring positions (others are left out) """
+    mask = 0
+    for pos in positions:
+        if 0 <= pos < CNT_RING:
+            mask |= 1 << pos
+    return mask
+
+
+def _get_path_mask(pos: int, step: int) -> int:
+    """ Ring fields a marble passes moving 'step' fields from 'pos', the destination included """
+    direction = 1 if step > 0 else -1
+    return get_ring_mask((pos + direction * idx) % CNT_RING for idx in range(1, abs(step) + 1))
+
+
+# PATH_MASK[pos][step + STEP_OFFSET] -> fields passed on the ring (0 for steps not in LIST_STEP)
+PATH_MASK: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(_get_path_mask(pos, step - STEP_OFFSET) if step - STEP_OFFSET in LIST_STEP else 0
+          for step in range(STEP_OFFSET + max(LIST_STEP) + 1))
+    for pos in range(CNT_RING))
+
+# LANE_UPTO[idx] -> the fields 0 to idx of a finish lane
+LANE_UPTO: Tuple[int, ...] = tuple((1 << (idx + 1)) - 1 for idx in range(len(ENDZONE[COLOURS[0]])))
+
+# RING_REACH[rank][pos] -> ring fields a card of the rank takes a marble on pos to, forward without passing
+# field 63 (the simple moves of Dog.get_board_move_actions don't go round from 63 to 0)
+RING_REACH: Dict[str, Tuple[int, ...]] = {
+    rank: tuple(get_ring_mask(pos + step for step in steps if pos + step < CNT_RING) for pos in range(CNT_RING))
+    for rank, steps in CARD_STEPS.items()}
@@ -0,0 +1,739 @@
+import random
+from typing import List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from server.py import dog_seven as seven
+from server.py import dog_tables as tables
+from server.py.dog import Card, Dog, GamePhase, GameState, Marble, PlayerState
+from server.py.dog_state import DECK, LIST_CARD_BY_ID, get_card_id
+
+IntArray = npt.NDArray[np.int64]
+BoolArray = npt.NDArray[np.bool_]
+
+SPACE = Dog.ACTION_SPACE
+CNT_PLAYER = 4
+CNT_MARBLE = 4
+CNT_SLOT = 8                       # hand width: 6 cards are dealt at most, one more is held during the exchange
+CNT_PILE = len(DECK)               # pile width: a pile never holds more than one deck
+CNT_CARD = len(SPACE.list_card)    # card ids 0 to 52 (see dog_state.LIST_CARD_BY_ID)
+NO_CARD = CNT_CARD                 # empty hand or pile slot, no active card
+ID_JOKER = get_card_id(Card.of('', 'JKR'))
+POS = tables.CNT_POSITIONS
+TEAM_MATE = ("Green", "Blue", "Yellow", "Red")  # as in Dog.__init__ (the rules pair the players idx and idx + 2)
+
+START = np.array([tables.START_POSITIONS[colour] for colour in tables.COLOURS], dtype=np.int64)
+KENNEL_FIRST = np.array([tables.KENNEL[colour][0] for colour in tables.COLOURS], dtype=np.int64)
+FINISH_FIRST = np.array([tables.ENDZONE[colour][0] for colour in tables.COLOURS], dtype=np.int64)
+PAIR_UPPER = np.triu(np.ones((CNT_MARBLE, CNT_MARBLE), dtype=np.bool_), 1)  # own marble pairs i < j
+
+
+def _build_move_tables() -> Tuple[IntArray, IntArray]:
+    """ tables.MOVE_TABLE as two arrays [colour, pos, step + STEP_OFFSET] -> pos_to / pos_to_finish, -1 for None """
+    move_to = np.full((len(tables.COLOURS), POS, len(tables.MOVE_TABLE[0][0])), -1, dtype=np.int64)
+    move_finish = move_to.copy()
+    for idx_colour, moves_of_colour in enumerate(tables.MOVE_TABLE):
+        for pos, moves in enumerate(moves_of_colour):
+            for idx_step, move in enumerate(moves):
+                if move.pos_to is not None:
+                    move_to[idx_colour, pos, idx_step] = move.pos_to
+                if move.pos_to_finish is not None:
+                    move_finish[idx_colour, pos, idx_step] = move.pos_to_finish
+    return move_to, move_finish
+
+
+def _build_steps(list_rank: Sequence[Optional[str]], width: int,
+                 skip: Tuple[str, ...] = ()) -> Tuple[IntArray, BoolArray]:
+    """ CARD_STEPS per rank, padded to 'width' columns (with a mask of the real ones) """
+    steps = np.full((len(list_rank), width), -1, dtype=np.int64)
+    for idx, rank in enumerate(list_rank):
+        if rank is not None and rank not in skip:
+            for idx_step, step in enumerate(tables.CARD_STEPS[rank]):
+                steps[idx, idx_step] = step
+    return steps, steps >= 0
+
+
+MOVE_TO, MOVE_FINISH = _build_move_tables()
+
+# Per card id, the last row is NO_CARD
+_RANKS: List[Optional[str]] = [card.rank for card in LIST_CARD_BY_ID[:CNT_CARD]] + [None]
+IS_SEVEN = np.array([rank == '7' for rank in _RANKS])
+IS_JAKE = np.array([rank == 'J' for rank in _RANKS])
+IS_JOKER = np.array([rank == 'JKR' for rank in _RANKS])
+IS_SIMPLE = np.array([rank in Dog.SIMPLE_RANKS for rank in _RANKS])
+IS_RING = np.array([rank in Dog.RING_RANKS for rank in _RANKS])
+IS_OPENER = np.array([rank in ('K', 'A', 'JKR') for rank in _RANKS])  # cards listed as kennel exits
+STEPS_MOVE, STEPS_MOVE_OK = _build_steps(_RANKS, 2, skip=('7',))  # own and partner moves (the 7 is split instead)
+
+# Joker substitutes in Dog.JOKER_RANKS order: their steps and the 4 swap ids each
+JOKER_STEPS, JOKER_STEPS_OK = _build_steps(Dog.JOKER_RANKS, 2, skip=('7',))
+JOKER_SWAP_IDS = np.array([[SPACE.offset_joker + get_card_id(Card.of(suit, rank)) for suit in GameState.LIST_SUIT]
+                           for rank in Dog.JOKER_RANKS], dtype=np.int64)
+IDX_JOKER_JAKE = Dog.JOKER_RANKS.index('J')
+IDX_JOKER_SEVEN = Dog.JOKER_RANKS.index('7')
+IS_JOKER_OPENER = np.array([rank in ('K', 'A') for rank in Dog.JOKER_RANKS])
+IS_JOKER_RING = np.array([rank in Dog.RING_RANKS for rank in Dog.JOKER_RANKS])
+
+
+def move_id(card: IntArray, pos_from: IntArray, pos_to: IntArray) -> IntArray:
+    """ Action ids of marble moves (see ActionSpace.move_ids), the arguments broadcast """
+    return SPACE.move_ids[card, pos_from, pos_to]
+
+
+def _is_in(values: IntArray, marbles: IntArray) -> BoolArray:
+    """ values (N, ...): True where one of the marbles (N, 4) of the same game is on the position """
+    shape = (len(marbles),) + (1,) * (values.ndim - 1) + (marbles.shape[-1],)
+    return np.asarray((values[..., None] == marbles.reshape(shape)).any(-1))
+
+
+class _ActionList:
+    """ Legal actions collected block by block as (game index, action id) arrays """
+
+    def __init__(self) -> None:
+        self.list_rows: List[IntArray] = []
+        self.list_ids: List[IntArray] = []
+
+    def add(self, games: IntArray, valid: BoolArray, action_ids: IntArray) -> None:
+        """ The ids where valid (both shaped (len(games), ...), up to broadcasting) """
+        valid, action_ids = np.broadcast_arrays(valid, action_ids)
+        idx = np.nonzero(valid)
+        self.list_rows.append(games[idx[0]])
+        self.list_ids.append(action_ids[idx])
+
+    def add_moves(self, games: IntArray, valid: BoolArray,
+                  card: IntArray, pos_from: IntArray, pos_to: IntArray) -> None:
+        """ Marble moves where valid, the ids are only computed for those """
+        # pylint: disable=too-many-arguments
+        idx = np.nonzero(valid)
+        self.list_rows.append(games[idx[0]])
+        self.list_ids.append(move_id(*(np.broadcast_to(part, valid.shape)[idx] for part in (card, pos_from, pos_to))))
+
+    def get(self) -> Tuple[IntArray, IntArray]:
+        return np.concatenate(self.list_rows), np.concatenate(self.list_ids)
+
+
+class VectorDog:
+    """ N games of Dog held as NumPy arrays and played in lockstep.
+
+    Every game has its own state, as in Dog: marble positions (N, 4, 4), hands (N, 4, CNT_SLOT) and piles
+    (N, CNT_PILE) of card ids, padded with NO_CARD, and the per-game counters. legal_actions lists the actions
+    of all games at once (as action ids, see Dog.ACTION_SPACE) and step applies one action per game. Finished
+    games, and games given an action they cannot apply (e.g. a card not in the hand), are reset to a new game
+    with a new seed.
+
+    The rules are those of Dog, including its quirks. Most of them are evaluated for all games at once, only
+    the 7 (dog_seven), Jake swaps and the deal at a round's end go through the games one by one. With
+    cross_check every game is also played by a Dog and both are compared after every call, an action the Dog
+    cannot apply raises its error.
+    """
+
+    def __init__(self, cnt_game: int, seed: Optional[int] = None, cross_check: bool = False) -> None:
+        self.cnt_game = cnt_game
+        self.rng_seed = random.Random(seed)  # draws the seed of every new game
+        self.list_rng = [random.Random(0) for _ in range(cnt_game)]  # per game, replaced by _reset
+        self.cross_check = cross_check
+        self.list_shadow: List[Dog] = [] if not cross_check else [Dog(seed=0) for _ in range(cnt_game)]
+        self._rows = np.arange(cnt_game)
+
+        shape = (cnt_game, CNT_PLAYER, CNT_MARBLE)
+        self.marble_pos = np.zeros(shape, dtype=np.int64)
+        self.marble_save = np.zeros(shape, dtype=np.bool_)
+        self.hand = np.full((cnt_game, CNT_PLAYER, CNT_SLOT), NO_CARD, dtype=np.int64)
+        self.cnt_hand = np.zeros((cnt_game, CNT_PLAYER), dtype=np.int64)
+        self.draw = np.full((cnt_game, CNT_PILE), NO_CARD, dtype=np.int64)
+        self.cnt_draw = np.zeros(cnt_game, dtype=np.int64)
+        self.discard = np.full((cnt_game, CNT_PILE), NO_CARD, dtype=np.int64)
+        self.cnt_discard = np.zeros(cnt_game, dtype=np.int64)
+
+        self.cnt_round = np.zeros(cnt_game, dtype=np.int64)
+        self.idx_player_started = np.zeros(cnt_game, dtype=np.int64)
+        self.idx_player_active = np.zeros(cnt_game, dtype=np.int64)
+        self.bool_card_exchanged = np.zeros(cnt_game, dtype=np.bool_)
+        self.exchange_counter = np.zeros(cnt_game, dtype=np.int64)
+        self.card_active = np.full(cnt_game, NO_CARD, dtype=np.int64)
+        self.is_finished = np.zeros(cnt_game, dtype=np.bool_)
+
+        # the 7 being played: steps left and the marbles and active card before its first step (to take it back)
+        self.seven_active = np.zeros(cnt_game, dtype=np.bool_)
+        self.seven_steps_left = np.zeros(cnt_game, dtype=np.int64)
+        self.seven_pos = np.zeros(shape, dtype=np.int64)
+        self.seven_save = np.zeros(shape, dtype=np.bool_)
+        self.seven_card_active = np.full(cnt_game, NO_CARD, dtype=np.int64)
+
+        self.team_won = np.full(cnt_game, -1, dtype=np.int64)  # team (idx_player % 2) of the games finished last step
+        self.cnt_finished = 0
+        self.cnt_error = 0
+        self._reset(self._rows)
+
+    def _reset(self, games: IntArray) -> None:
+        """ Start a new game (as Dog(seed) does) in each of the given slots """
+        for idx_game in games.tolist():
+            seed = self.rng_seed.getrandbits(32)
+            rng = self.list_rng[idx_game] = random.Random(seed)
+            ids = list(DECK.ids)
+            rng.shuffle(ids)
+            self.draw[idx_game] = ids
+            self.cnt_draw[idx_game] = len(ids)
+            self.discard[idx_game] = NO_CARD
+            self.cnt_discard[idx_game] = 0
+            self.marble_pos[idx_game] = KENNEL_FIRST[:, None] + np.arange(CNT_MARBLE)
+            self.marble_save[idx_game] = False
+            self._deal(idx_game, 6)
+            if self.cross_check:
+                self.list_shadow[idx_game] = Dog(seed=seed)
+        self.cnt_round[games] = 1
+        self.idx_player_started[games] = 0
+        self.idx_player_active[games] = 0
+        self.bool_card_exchanged[games] = False
+        self.exchange_counter[games] = 0
+        self.card_active[games] = NO_CARD
+        self.is_finished[games] = False
+        self.seven_active[games] = False
+        self.seven_steps_left[games] = 0
+
+    def _deal(self, idx_game: int, cnt_card: int) -> None:
+        """ Replace the hands by cnt_card cards each, popped from the end of the draw pile player by player """
+        top = int(self.cnt_draw[idx_game])
+        cards = self.draw[idx_game, top - CNT_PLAYER * cnt_card:top][::-1]
+        self.hand[idx_game] = NO_CARD
+        self.hand[idx_game, :, :cnt_card] = cards.reshape(CNT_PLAYER, cnt_card)
+        self.cnt_hand[idx_game] = cnt_card
+        self.draw[idx_game, top - CNT_PLAYER * cnt_card:top] = NO_CARD
+        self.cnt_draw[idx_game] = top - CNT_PLAYER * cnt_card
+
+    def _end_round(self, idx_game: int) -> None:
+        """ Dog.end_round: next starting player, no exchange yet and new cards (from a new deck if needed) """
+        self.cnt_round[idx_game] += 1
+        self.idx_player_started[idx_game] = (self.idx_player_started[idx_game] + 1) % CNT_PLAYER
+        self.idx_player_active[idx_game] = (self.idx_player_started[idx_game] + 1) % CNT_PLAYER
+        self.bool_card_exchanged[idx_game] = False
+        cnt_card = 6 - (int(self.cnt_round[idx_game]) - 1) % 5
+        while self.cnt_draw[idx_game] < cnt_card * CNT_PLAYER:
+            ids = list(DECK.ids)
+            self.list_rng[idx_game].shuffle(ids)
+            self.draw[idx_game] = ids
+            self.cnt_draw[idx_game] = len(ids)
+            self.discard[idx_game] = NO_CARD
+            self.cnt_discard[idx_game] = 0
+        self._deal(idx_game, cnt_card)
+
+    def get_state(self, idx_game: int) -> GameState:
+        """ The state of one game, as Dog.get_state would return it """
+        def cards(ids: IntArray) -> List[Card]:
+            return [LIST_CARD_BY_ID[idx] for idx in ids.tolist()]
+
+        cnt_hand = self.cnt_hand[idx_game]
+        list_player = [PlayerState(name=colour, teamMate=TEAM_MATE[idx_player],
+                                   list_card=cards(self.hand[idx_game, idx_player, :cnt_hand[idx_player]]),
+                                   list_marble=[Marble(pos=pos, is_save=is_save) for pos, is_save in zip(
+                                       self.marble_pos[idx_game, idx_player].tolist(),
+                                       self.marble_save[idx_game, idx_player].tolist())])
+                       for idx_player, colour in enumerate(tables.COLOURS)]
+        card_active = int(self.card_active[idx_game])
+        return GameState(
+            cnt_player=CNT_PLAYER, phase=GamePhase.FINISHED if self.is_finished[idx_game] else GamePhase.RUNNING,
+            cnt_round=int(self.cnt_round[idx_game]), bool_card_exchanged=bool(self.bool_card_exchanged[idx_game]),
+            idx_player_started=int(self.idx_player_started[idx_game]),
+            idx_player_active=int(self.idx_player_active[idx_game]), list_player=list_player,
+            list_card_draw=cards(self.draw[idx_game, :self.cnt_draw[idx_game]]),
+            list_card_discard=cards(self.discard[idx_game, :self.cnt_discard[idx_game]]),
+            card_active=None if card_active == NO_CARD else LIST_CARD_BY_ID[card_active])
+
+    def set_state(self, idx_game: int, state: GameState) -> None:
+        """ Continue one game from the given state (with the players in the order of Dog.__init__) """
+        def ids(list_card: Sequence[Card], width: int) -> List[int]:
+            list_id = [get_card_id(card) for card in list_card]
+            if len(list_id) > width or any(idx >= CNT_CARD for idx in list_id):
+                raise ValueError(f"Cards {list_card} do not fit the arrays of VectorDog")
+            return list_id + [NO_CARD] * (width - len(list_id))
+
+        if [player.name for player in state.list_player] != list(tables.COLOURS):
+            raise ValueError(f"VectorDog needs the players {tables.COLOURS}")
+        for idx_player, player in enumerate(state.list_player):
+            self.hand[idx_game, idx_player] = ids(player.list_card, CNT_SLOT)
+            self.cnt_hand[idx_game, idx_player] = len(player.list_card)
+            self.marble_pos[idx_game, idx_player] = [marble.pos for marble in player.list_marble]
+            self.marble_save[idx_game, idx_player] = [marble.is_save for marble in player.list_marble]
+        self.draw[idx_game] = ids(state.list_card_draw, CNT_PILE)
+        self.cnt_draw[idx_game] = len(state.list_card_draw)
+        self.discard[idx_game] = ids(state.list_card_discard, CNT_PILE)
+        self.cnt_discard[idx_game] = len(state.list_card_discard)
+        self.cnt_round[idx_game] = state.cnt_round
+        self.idx_player_started[idx_game] = state.idx_player_started
+        self.idx_player_active[idx_game] = state.idx_player_active
+        self.bool_card_exchanged[idx_game] = state.bool_card_exchanged
+        self.exchange_counter[idx_game] = 0
+        self.card_active[idx_game] = NO_CARD if state.card_active is None else get_card_id(state.card_active)
+        self.is_finished[idx_game] = state.phase == GamePhase.FINISHED
+        self.seven_active[idx_game] = False
+        if self.cross_check:
+            shadow = Dog(seed=0)
+            shadow.set_state(state.model_copy(deep=True))
+            shadow.rng.setstate(self.list_rng[idx_game].getstate())
+            self.list_shadow[idx_game] = shadow
+
+    def legal_actions(self) -> Tuple[IntArray, IntArray]:
+        """ The legal actions of all games as pairs (game index, action id), sorted. Like Dog.get_list_action
+        it leaves the games as they are, the marbles on their start are marked save when acting (see step). """
+        # pylint: disable=too-many-locals
+        rows, active = self._rows, self.idx_player_active
+        cards = self.hand[rows, active]
+        all_finish = (self.marble_pos[rows, active] >= FINISH_FIRST[active][:, None]).all(1)
+        mode_seven = ~all_finish & self.bool_card_exchanged & IS_SEVEN[self.card_active]
+        mode_own = ~all_finish & self.bool_card_exchanged & ~mode_seven
+        actions = _ActionList()
+
+        has_action = np.zeros(self.cnt_game, dtype=np.bool_)
+        has_action[self._list_partner(actions, np.nonzero(all_finish)[0])] = True
+        games = np.nonzero(~all_finish & ~self.bool_card_exchanged)[0]
+        actions.add(games, cards[games] != NO_CARD, SPACE.offset_exchange + cards[games])
+        self._list_jakes(actions, np.nonzero(mode_own & IS_JAKE[cards].any(1))[0])
+        # kennel exits and board moves are listed for the first card that is neither a 7 nor a Jake, from then on
+        # Dog sees the marbles on their start as save if a simple card is held (as step will leave them)
+        games = np.nonzero(mode_own & (self.card_active == NO_CARD) &
+                           ((cards != NO_CARD) & ~IS_SEVEN[cards] & ~IS_JAKE[cards]).any(1))[0]
+        save_marked = self.marble_save.copy()
+        save_marked[games, active[games]] = self._get_start_save(games)
+        self._list_moves(actions, games, save_marked)
+
+        # the 7: splits are searched game by game (dog_seven caches them)
+        seven_rows: List[int] = []
+        seven_ids: List[int] = []
+        for idx_game in np.nonzero(mode_seven | (mode_own & IS_SEVEN[cards].any(1)))[0].tolist():
+            list_card = [int(self.card_active[idx_game])] if mode_seven[idx_game] else \
+                sorted({card for card in cards[idx_game].tolist() if IS_SEVEN[card]})
+            hand = [card for card in cards[idx_game].tolist() if card != NO_CARD and not IS_JAKE[card]]
+            marble_save = None if mode_seven[idx_game] or IS_SEVEN[hand[0]] else save_marked[idx_game]
+            for card in list_card:
+                ids = self._get_seven_ids(idx_game, card, marble_save)
+                seven_rows.extend([idx_game] * len(ids))
+                seven_ids.extend(ids)
+        actions.add(np.array(seven_rows, dtype=np.int64), np.ones(len(seven_rows), dtype=np.bool_),
+                    np.array(seven_ids, dtype=np.int64))
+
+        action_rows, action_ids = actions.get()
+        has_action[action_rows] = True
+        no_action = np.nonzero(~has_action)[0]
+        keys = np.unique(np.concatenate([action_rows * len(SPACE) + action_ids,
+                                         no_action * len(SPACE) + SPACE.id_pass]))
+        action_rows, action_ids = np.divmod(keys, len(SPACE))
+        if self.cross_check:
+            self._check_actions(action_rows, action_ids)
+        return action_rows, action_ids
+
+    def _list_partner(self, actions: '_ActionList', games: IntArray) -> IntArray:
+        """ All own marbles in the finish: the partner's unprotected marbles on the ring are moved along it (the
+        7 is left out). Returns the games with an action. """
+        active = self.idx_player_active[games]
+        partner = (active + 2) % CNT_PLAYER
+        cards = self.hand[games, active]
+        partner_pos = self.marble_pos[games, partner]
+        on_ring = ~self.marble_save[games, partner] & (partner_pos < tables.CNT_RING)
+        idx_step = STEPS_MOVE[cards][:, :, None, :] + tables.STEP_OFFSET
+        pos_to = MOVE_TO[partner[:, None, None, None], partner_pos[:, None, :, None], idx_step]
+        valid = STEPS_MOVE_OK[cards][:, :, None, :] & on_ring[:, None, :, None] & (pos_to >= 0) & \
+            ~_is_in(pos_to, partner_pos)
+        actions.add_moves(games, valid, cards[:, :, None, None], partner_pos[:, None, :, None], pos_to)
+        return games[valid.any((1, 2, 3))]
+
+    def _get_jake_pairs(self, games: IntArray) -> Tuple[IntArray, IntArray, BoolArray, BoolArray]:
+        """ Dog.get_jake_actions: own marbles (g, 4), other players' marbles (g, 12), the pairs that can swap
+        (g, 4, 12) and, where there is none, the own pairs i < j (g, 4, 4) """
+        active = self.idx_player_active[games]
+        own_pos = self.marble_pos[games, active]
+        other_players = (active[:, None] + np.arange(1, CNT_PLAYER)) % CNT_PLAYER
+        other_pos = self.marble_pos[games[:, None], other_players].reshape(len(games), (CNT_PLAYER - 1) * CNT_MARBLE)
+        other_save = self.marble_save[games[:, None], other_players].reshape(len(games), (CNT_PLAYER - 1) * CNT_MARBLE)
+        own_ring = own_pos < tables.CNT_RING
+        pairs = own_ring[:, :, None] & ((other_pos < tables.CNT_RING) & ~other_save)[:, None, :]
+        own_pairs = own_ring[:, :, None] & own_ring[:, None, :] & PAIR_UPPER & ~pairs.any((1, 2))[:, None, None]
+        return own_pos, other_pos, pairs, own_pairs
+
+    def _list_jakes(self, actions: '_ActionList', games: IntArray) -> None:
+        """ Swaps in both directions for each Jake in the hand """
+        own_pos, other_pos, pairs, own_pairs = self._get_jake_pairs(games)
+        cards = self.hand[games, self.idx_player_active[games]]
+        jakes = IS_JAKE[cards][:, :, None, None]
+        for pos_a, pos_b, valid in ((own_pos[:, None, :, None], other_pos[:, None, None, :], pairs[:, None]),
+                                    (own_pos[:, None, :, None], own_pos[:, None, None, :], own_pairs[:, None])):
+            actions.add_moves(games, jakes & valid, cards[:, :, None, None], pos_a, pos_b)
+            actions.add_moves(games, jakes & valid, cards[:, :, None, None], pos_b, pos_a)
+
+    def _list_moves(self, actions: '_ActionList', games: IntArray, save_marked: BoolArray) -> None:
+        """ Dog.get_kennel_exit_actions and get_board_move_actions (save_marked: the is_save flags with the
+        marbles on their start marked, see _get_start_save) """
+        # pylint: disable=too-many-locals
+        active = self.idx_player_active[games]
+        own_pos, own_save = self.marble_pos[games, active], self.marble_save[games, active]
+        cards = self.hand[games, active]
+        start = START[active]
+
+        # kennel exits
+        start_taken = (own_pos == start[:, None]).any(1)
+        in_kennel = (own_pos >= KENNEL_FIRST[active][:, None]) & (own_pos < KENNEL_FIRST[active][:, None] + 4)
+        pos_kennel = own_pos[np.arange(len(games)), in_kennel.argmax(1)]
+        actions.add_moves(games, (~start_taken & in_kennel.any(1))[:, None] & IS_OPENER[cards],
+                          cards, pos_kennel[:, None], start[:, None])
+
+        # into the finish (only if no save marble waits on the start) and inside it
+        colour, marbles = active[:, None, None, None], own_pos[:, :, None, None]
+        steps_ok = STEPS_MOVE_OK[cards][:, None]
+        idx_step = STEPS_MOVE[cards][:, None] + tables.STEP_OFFSET
+        start_save_blocked = ((own_pos == start[:, None]) & own_save).any(1)
+        pos_finish = MOVE_FINISH[colour, marbles, idx_step]
+        valid = ~start_save_blocked[:, None, None, None] & (~own_save & (own_pos < tables.CNT_RING))[:, :, None, None]
+        valid = valid & steps_ok & (pos_finish >= 0)
+        actions.add_moves(games, valid & ~_is_in(pos_finish, own_pos), cards[:, None, :, None], marbles, pos_finish)
+        in_finish = (own_pos >= FINISH_FIRST[active][:, None]) & (own_pos < FINISH_FIRST[active][:, None] + 4)
+        pos_to = MOVE_TO[colour, marbles, idx_step]
+        valid = in_finish[:, :, None, None] & steps_ok & (pos_to >= 0)
+        actions.add_moves(games, valid & ~_is_in(pos_to, own_pos), cards[:, None, :, None], marbles, pos_to)
+
+        # along the ring (Dog.RING_RANKS): only save marbles or the ones on their start move, never past 63
+        on_ring = (own_save | (own_pos == start[:, None])) & (own_pos < tables.CNT_RING)
+        valid = IS_RING[cards][:, None, :, None] & on_ring[:, :, None, None] & steps_ok & (pos_to >= marbles)
+        actions.add_moves(games, valid & ~_is_in(pos_to, own_pos), cards[:, None, :, None], marbles, pos_to)
+
+        # the 7 of the Joker sees the marbles on their start as save if a simple card comes before the Joker
+        has_joker = IS_JOKER[cards].any(1)
+        simple_first = (IS_SIMPLE[cards] & (np.arange(cards.shape[1]) < IS_JOKER[cards].argmax(1)[:, None])).any(1)
+        self._list_jokers(actions, games[has_joker], (in_kennel.any(1) & ~start_taken)[has_joker],
+                          np.where(simple_first[:, None, None], save_marked[games], self.marble_save[games])[has_joker])
+
+    def _list_jokers(self, actions: '_ActionList', games: IntArray, can_leave_kennel: BoolArray,
+                     marble_save: BoolArray) -> None:
+        """ Dog.iter_joker_actions: the substitutes for the ranks that could be played now, with the moves
+        _list_moves lists for a card of the rank (marble_save: the is_save flags the 7 is checked with) """
+        # pylint: disable=too-many-locals
+        active = self.idx_player_active[games]
+        own_pos, own_save = self.marble_pos[games, active], self.marble_save[games, active]
+        colour, marbles = active[:, None, None, None], own_pos[:, :, None, None]
+        idx_step = JOKER_STEPS[None, None] + tables.STEP_OFFSET
+        pos_to, pos_finish = MOVE_TO[colour, marbles, idx_step], MOVE_FINISH[colour, marbles, idx_step]
+        on_start = own_pos == START[active][:, None]
+        on_ring = own_pos < tables.CNT_RING
+        in_finish = (own_pos >= FINISH_FIRST[active][:, None]) & (own_pos < FINISH_FIRST[active][:, None] + 4)
+        into_finish = (~(on_start & own_save).any(1)[:, None] & ~own_save & on_ring)[:, :, None, None] & \
+            (pos_finish >= 0) & ~_is_in(pos_finish, own_pos)
+        inside_finish = in_finish[:, :, None, None] & (pos_to >= 0) & ~_is_in(pos_to, own_pos)
+        along_ring = IS_JOKER_RING[None, None, :, None] & ((own_save | on_start) & on_ring)[:, :, None, None] & \
+            (pos_to >= marbles) & ~_is_in(pos_to, own_pos)
+        playable = np.asarray((JOKER_STEPS_OK & (into_finish | inside_finish | along_ring)).any((1, 3)))
+        playable |= can_leave_kennel[:, None] & IS_JOKER_OPENER
+        _, _, pairs, own_pairs = self._get_jake_pairs(games)
+        playable[:, IDX_JOKER_JAKE] = pairs.any((1, 2)) | own_pairs.any((1, 2))
+        playable[:, IDX_JOKER_SEVEN] = [self._can_play_seven(idx_game, save)
+                                        for idx_game, save in zip(games.tolist(), marble_save)]
+        actions.add(games, playable[:, :, None], JOKER_SWAP_IDS[None])
+
+    def _get_seven_config(self, idx_game: int,
+                          marble_save: Optional[BoolArray] = None) -> Tuple[int, seven.MarbleConfig, int]:
+        """ Dog._get_seven_config: colour, own marbles and ring mask of the fields blocked by other save marbles
+        (marble_save replaces the game's is_save flags) """
+        idx_player = int(self.idx_player_active[idx_game])
+        list_pos = self.marble_pos[idx_game].tolist()
+        list_save = (self.marble_save[idx_game] if marble_save is None else marble_save).tolist()
+        config = tuple(zip(list_pos[idx_player], list_save[idx_player]))
+        blocked = tables.get_ring_mask(pos for idx, (positions, saves) in enumerate(zip(list_pos, list_save))
+                                       if idx != idx_player for pos, is_save in zip(positions, saves) if is_save)
+        return idx_player, config, blocked
+
+    def _can_play_seven(self, idx_game: int, marble_save: Optional[BoolArray] = None) -> bool:
+        return seven.can_complete(*self._get_seven_config(idx_game, marble_save), seven.CNT_STEPS_SEVEN)
+
+    def _get_seven_ids(self, idx_game: int, card: int, marble_save: Optional[BoolArray] = None) -> List[int]:
+        """ Dog.get_seven_actions as action ids """
+        idx_colour, config, blocked = self._get_seven_config(idx_game, marble_save)
+        steps = int(self.seven_steps_left[idx_game]) if self.seven_active[idx_game] else seven.CNT_STEPS_SEVEN
+        return [int(SPACE.move_ids[card, config[move.idx_marble][0], move.pos_to])
+                for move in seven.get_next_moves(idx_colour, config, blocked, steps)]
+
+    def get_legal_action_mask(self) -> BoolArray:
+        """ Dog.get_legal_action_mask of all games, shaped (N, len(Dog.ACTION_SPACE)), legal_actions lists the
+        same without the dense array """
+        mask = np.zeros((self.cnt_game, len(SPACE)), dtype=np.bool_)
+        action_rows, action_ids = self.legal_actions()
+        mask[action_rows, action_ids] = True
+        return mask
+
+    def sample_actions(self, rng: np.random.Generator) -> IntArray:
+        """ One legal action id per game, uniformly chosen (the pass where no action has an id) """
+        action_rows, action_ids = self.legal_actions()
+        cnt = np.bincount(action_rows, minlength=self.cnt_game)
+        first = np.cumsum(cnt) - cnt
+        pick = first + np.minimum((rng.random(self.cnt_game) * cnt).astype(np.int64), np.maximum(cnt - 1, 0))
+        return np.where(cnt > 0, action_ids[np.minimum(pick, len(action_ids) - 1)], SPACE.id_pass)
+
+    def step(self, action_ids: npt.ArrayLike) -> BoolArray:
+        """ Apply one action id per game, as Dog.apply_action_id does. Returns which games ended (they are reset
+        to a new game): finished ones (see team_won) and the ones given an action they cannot apply (counted
+        in cnt_error). With cross_check such an action raises the error of the Dog instead. """
+        # pylint: disable=too-many-locals
+        action_ids = np.asarray(action_ids, dtype=np.int64)
+        if action_ids.shape != (self.cnt_game,) or ((action_ids < 0) | (action_ids >= len(SPACE))).any():
+            raise ValueError(f"Expected {self.cnt_game} action ids between 0 and {len(SPACE) - 1}")
+        if self.cross_check:
+            self._step_shadows(action_ids)
+        self._mark_start_save()
+
+        is_exchange = (action_ids >= SPACE.offset_exchange) & (action_ids < SPACE.offset_joker)
+        is_joker = (action_ids >= SPACE.offset_joker) & (action_ids < SPACE.offset_move)
+        is_move = action_ids >= SPACE.offset_move
+        card_move, pos_from, pos_to = SPACE.move_keys[np.maximum(action_ids - SPACE.offset_move, 0)].T
+        card = np.select([is_exchange, is_joker, is_move],
+                         [action_ids - SPACE.offset_exchange, ID_JOKER, card_move], NO_CARD)
+        error = np.zeros(self.cnt_game, dtype=np.bool_)
+        self.team_won[:] = -1
+
+        # before the exchange every card is given to the partner, whatever the action
+        exchanging = ~self.bool_card_exchanged & (self.exchange_counter <= 4) & (card != NO_CARD)
+        self._apply_exchange(np.nonzero(exchanging)[0], card, error)
+        playing = ~exchanging
+
+        passing = playing & (card == NO_CARD)
+        self._take_back_seven(np.nonzero(passing & self.seven_active)[0])
+        self._fold(np.nonzero(passing & ~self.seven_active)[0])
+
+        games = np.nonzero(playing & (card == ID_JOKER))[0]
+        self.card_active[games] = np.where(is_joker[games], action_ids[games] - SPACE.offset_joker, NO_CARD)
+        self._discard(games, card, error)
+
+        sevens = np.nonzero(playing & IS_SEVEN[card])[0]
+        for idx_game in sevens.tolist():
+            error[idx_game] = not self._apply_seven(idx_game, int(card[idx_game]), int(pos_from[idx_game]),
+                                                    int(pos_to[idx_game]), bool(is_move[idx_game]))
+        self._check_finished(sevens[~error[sevens]])
+
+        # other cards move a marble (exchange ids leave everything as it is), then the finish is checked
+        moving = playing & (card != NO_CARD) & (card != ID_JOKER) & ~IS_SEVEN[card]
+        for idx_game in np.nonzero(moving & is_move & IS_JAKE[card])[0].tolist():
+            error[idx_game] = not self._apply_jake(idx_game, int(pos_from[idx_game]), int(pos_to[idx_game]))
+        self._move_marbles(np.nonzero(moving & is_move & ~IS_JAKE[card])[0], pos_from, pos_to)
+        games = np.nonzero(moving & is_move & ~error)[0]
+        self._discard(games, card, error)
+        self._advance_turn(games[~error[games]])
+        self._check_finished(np.nonzero(moving & ~error)[0])
+
+        if self.cross_check:
+            self._check_step(error)
+        done = self.is_finished | error
+        self.cnt_finished += int(self.is_finished.sum())
+        self.cnt_error += int(error.sum())
+        self._reset(np.nonzero(done)[0])
+        return done
+
+    def _get_start_save(self, games: IntArray) -> BoolArray:
+        """ The is_save flags of the active players' marbles (g, 4) with the ones on their start marked save
+        where a simple card is held """
+        active = self.idx_player_active[games]
+        on_start = self.marble_pos[games, active] == START[active][:, None]
+        holds_simple = np.any(IS_SIMPLE[self.hand[games, active]], axis=1, keepdims=True)
+        return np.asarray(self.marble_save[games, active] | (holds_simple & on_start))
+
+    def _mark_start_save(self) -> None:
+        """ Dog._mark_start_save: the active players mark their marbles on their start save before acting """
+        rows, active = self._rows, self.idx_player_active
+        all_finish = (self.marble_pos[rows, active] >= FINISH_FIRST[active][:, None]).all(1)
+        games = np.nonzero(self.bool_card_exchanged & (self.card_active == NO_CARD) & ~all_finish)[0]
+        self.marble_save[games, active[games]] = self._get_start_save(games)
+
+    def _remove_cards(self, games: IntArray, players: IntArray, cards: IntArray) -> BoolArray:
+        """ Take the first card of the given kind out of each hand, False where the hand does not hold it """
+        hands = self.hand[games, players]
+        match = hands == cards[:, None]
+        found = np.asarray(match.any(1), dtype=np.bool_)
+        slots = np.arange(CNT_SLOT)[None]
+        hands_new = np.take_along_axis(hands, np.minimum(slots + (slots >= match.argmax(1)[:, None]), CNT_SLOT - 1), 1)
+        hands_new[:, -1] = NO_CARD
+        self.hand[games, players] = np.where(found[:, None], hands_new, hands)
+        self.cnt_hand[games, players] -= found
+        return found
+
+    def _discard(self, games: IntArray, card: IntArray, error: BoolArray) -> None:
+        """ Move the played card from the active player's hand to the discard pile """
+        found = self._remove_cards(games, self.idx_player_active[games], card[games])
+        error[games[~found]] = True
+        games = games[found]
+        self.discard[games, self.cnt_discard[games]] = card[games]
+        self.cnt_discard[games] += 1
+
+    def _apply_exchange(self, games: IntArray, card: IntArray, error: BoolArray) -> None:
+        active = self.idx_player_active[games]
+        partner = (active + 2) % CNT_PLAYER
+        self.hand[games, partner, self.cnt_hand[games, partner]] = card[games]
+        self.cnt_hand[games, partner] += 1
+        error[games[~self._remove_cards(games, active, card[games])]] = True
+        counter = self.exchange_counter[games] + 1
+        self.bool_card_exchanged[games[counter == 4]] = True
+        self.exchange_counter[games] = np.where(counter == 4, 0, counter)
+        self.idx_player_active[games] = (active + 1) % CNT_PLAYER
+
+    def _fold(self, games: IntArray) -> None:
+        """ Pass: the cards go to the discard pile (except with a full hand in round 6), the turn ends """
+        active = self.idx_player_active[games]
+        folding = ~((self.cnt_round[games] == 6) & (self.cnt_hand[games, active] == 6))
+        folded, active = games[folding], active[folding]
+        rows, slots = np.nonzero(np.arange(CNT_SLOT)[None] < self.cnt_hand[folded, active][:, None])
+        cards = self.hand[folded[rows], active[rows], slots]
+        self.discard[folded[rows], self.cnt_discard[folded[rows]] + slots] = cards
+        self.cnt_discard[folded] += self.cnt_hand[folded, active]
+        self.hand[folded, active] = NO_CARD
+        self.cnt_hand[folded, active] = 0
+        self._advance_turn(games)
+
+    def _advance_turn(self, games: IntArray) -> None:
+        self.idx_player_active[games] = (self.idx_player_active[games] + 1) % CNT_PLAYER
+        for idx_game in games[self.idx_player_active[games] == self.idx_player_started[games]].tolist():
+            self._end_round(idx_game)
+
+    def _take_back_seven(self, games: IntArray) -> None:
+        """ Pass during a 7: its steps so far are taken back """
+        self.marble_pos[games] = self.seven_pos[games]
+        self.marble_save[games] = self.seven_save[games]
+        self.card_active[games] = self.seven_card_active[games]
+        self.seven_active[games] = False
+
+    def _marbles_at(self, idx_game: int, pos: int) -> List[Tuple[int, int]]:
+        """ (idx_player, idx_marble) of the marbles on a position, in BoardIndex.marbles_at order """
+        return [(int(idx_player), int(idx_marble))
+                for idx_player, idx_marble in zip(*np.nonzero(self.marble_pos[idx_game] == pos))]
+
+    def _first_free_kennel(self, idx_game: int, idx_player: int) -> Optional[int]:
+        taken = set(self.marble_pos[idx_game].ravel().tolist())
+        return next((pos for pos in tables.KENNEL[tables.COLOURS[idx_player]] if pos not in taken), None)
+
+    def _send_home(self, idx_game: int, pos: int, skip_player: Optional[int] = None) -> None:
+        """ Dog.send_home (or send_opponent_marble_home for all but skip_player, those stay if the kennel is full) """
+        for idx_player, idx_marble in self._marbles_at(idx_game, pos):
+            if idx_player == skip_player:
+                continue
+            pos_home = self._first_free_kennel(idx_game, idx_player)
+            if pos_home is None and skip_player is not None:
+                continue
+            self.marble_pos[idx_game, idx_player, idx_marble] = \
+                pos_home if pos_home is not None else tables.KENNEL[tables.COLOURS[idx_player]][0]
+            self.marble_save[idx_game, idx_player, idx_marble] = False
+
+    def _apply_seven(self, idx_game: int, card: int, pos_from: int, pos_to: int, is_move: bool) -> bool:
+        """ Dog._handle_seven_action, False where it raises an error """
+        # pylint: disable=too-many-arguments
+        if not self.seven_active[idx_game]:
+            self.seven_pos[idx_game] = self.marble_pos[idx_game]
+            self.seven_save[idx_game] = self.marble_save[idx_game]
+            self.seven_card_active[idx_game] = self.card_active[idx_game]
+            self.seven_active[idx_game] = True
+            self.card_active[idx_game] = card
+            self.seven_steps_left[idx_game] = seven.CNT_STEPS_SEVEN
+        idx_player = int(self.idx_player_active[idx_game])
+        marbles = self.marble_pos[idx_game, idx_player].tolist()
+        if not is_move or pos_from not in marbles:
+            return False
+
+        # Dog.calculate_steps_for_7
+        pos_start, pos_finish = int(START[idx_player]), int(FINISH_FIRST[idx_player])
+        if pos_from < tables.CNT_RING and pos_to < tables.CNT_RING:
+            steps = (pos_to - pos_from) % tables.CNT_RING
+        elif pos_from < tables.CNT_RING <= pos_to:
+            steps = pos_to - pos_finish + 1 + (pos_start - pos_from) % tables.CNT_RING
+        else:
+            steps = abs(pos_to - pos_from) if pos_from >= tables.CNT_RING else 0
+
+        idx_marble = marbles.index(pos_from)
+        into_finish = pos_finish <= pos_to < pos_finish + CNT_MARBLE
+        for pos in seven.get_ring_path(idx_player, pos_from, steps, into_finish):
+            self._send_home(idx_game, pos)
+        self.marble_pos[idx_game, idx_player, idx_marble] = pos_to
+        self.marble_save[idx_game, idx_player, idx_marble] = into_finish
+        self.seven_steps_left[idx_game] -= steps
+
+        if self.seven_steps_left[idx_game] == 0:
+            games = np.array([idx_game])
+            if (self.hand[idx_game, idx_player] == card).any():
+                self._discard(games, np.full(self.cnt_game, card), np.zeros(self.cnt_game, dtype=np.bool_))
+            self.card_active[idx_game] = NO_CARD
+            self.seven_active[idx_game] = False
+            self.idx_player_active[idx_game] = (idx_player + 1) % CNT_PLAYER
+        return True
+
+    def _apply_jake(self, idx_game: int, pos_from: int, pos_to: int) -> bool:
+        """ Dog.apply_jake_action: the marble on pos_from (the own one first) swaps with the one on pos_to """
+        idx_player = int(self.idx_player_active[idx_game])
+        marbles_at_pos_from = self._marbles_at(idx_game, pos_from)
+        marbles_at_pos_to = self._marbles_at(idx_game, pos_to)
+        if not marbles_at_pos_from or not marbles_at_pos_to:
+            return True  # nothing to swap, the card is played anyway
+        idx_own, idx_marble_own = next((marble for marble in marbles_at_pos_from if marble[0] == idx_player),
+                                       marbles_at_pos_from[0])
+        idx_other, idx_marble = marbles_at_pos_to[0]
+        pos_own = int(self.marble_pos[idx_game, idx_own, idx_marble_own])
+        pos_swap = int(self.marble_pos[idx_game, idx_other, idx_marble])
+        self.marble_pos[idx_game, idx_other, idx_marble] = pos_own
+        self.marble_pos[idx_game, idx_own, idx_marble_own] = pos_swap
+        return True
+
+    def _move_marbles(self, games: IntArray, pos_from: IntArray, pos_to: IntArray) -> None:
+        """ Dog._handle_action_with_card for all but the Jake: onto a start (marbles of the others there go home),
+        into the own finish or along the ring. The partner's marble is moved if it stands on pos_from. """
+        active = self.idx_player_active[games]
+        partner = (active + 2) % CNT_PLAYER
+        pos_from, pos_to = pos_from[games], pos_to[games]
+        owner = np.where((self.marble_pos[games, partner] == pos_from[:, None]).any(1), partner, active)
+        match = self.marble_pos[games, owner] == pos_from[:, None]
+        found = match.any(1)
+        to_start = (pos_to < tables.CNT_RING) & np.isin(pos_to, START)
+        to_finish = (pos_to >= FINISH_FIRST[active]) & (pos_to < FINISH_FIRST[active] + CNT_MARBLE)
+
+        others_there = (self.marble_pos[games] == pos_to[:, None, None]).any(2) & \
+            (np.arange(CNT_PLAYER)[None] != active[:, None])
+        for idx in np.nonzero(found & to_start & others_there.any(1))[0].tolist():
+            self._send_home(int(games[idx]), int(pos_to[idx]), skip_player=int(active[idx]))
+
+        idx_marble = match.argmax(1)
+        self.marble_pos[games[found], owner[found], idx_marble[found]] = pos_to[found]
+        self.marble_save[games[found], owner[found], idx_marble[found]] = (to_start | to_finish)[found]
+
+    def _check_finished(self, games: IntArray) -> None:
+        """ The game is over when both players of a team have all marbles in the finish (see team_won) """
+        marbles = self.marble_pos[games]
+        in_finish = np.asarray(((marbles >= FINISH_FIRST[None, :, None]) &
+                                (marbles < FINISH_FIRST[None, :, None] + CNT_MARBLE)).all(2))
+        team_done = in_finish[:, :CNT_PLAYER // 2] & in_finish[:, CNT_PLAYER // 2:]
+        done = team_done.any(1)
+        self.is_finished[games[done]] = True
+        self.team_won[games[done]] = team_done[done].argmax(1)
+
+    def _check_actions(self, action_rows: IntArray, action_ids: IntArray) -> None:
+        expected: List[Set[int]] = [set() for _ in range(self.cnt_game)]
+        for idx_game, shadow in enumerate(self.list_shadow):
+            list_action = shadow.get_list_action()
+            list_id = [SPACE.encode(action.key) for action in list_action] if list_action else [SPACE.id_pass]
+            expected[idx_game] = {action_id for action_id in list_id if action_id is not None}
+        actual: List[Set[int]] = [set() for _ in range(self.cnt_game)]
+        for idx_game, action_id in zip(action_rows.tolist(), action_ids.tolist()):
+            actual[idx_game].add(action_id)
+        for idx_game in range(self.cnt_game):
+            if actual[idx_game] != expected[idx_game]:
+                raise AssertionError(f"Game {idx_game}: VectorDog lists {sorted(actual[idx_game])}, "
+                                     f"Dog lists {sorted(expected[idx_game])}")
+            self._check_state(idx_game)
+
+    def _step_shadows(self, action_ids: IntArray) -> None:
+        """ Apply the actions to the Dogs, the error of an action a Dog cannot apply is raised """
+        for shadow, action_id in zip(self.list_shadow, action_ids.tolist()):
+            shadow.apply_action_id(action_id)
+
+    def _check_step(self, error: BoolArray) -> None:
+        for idx_game in range(self.cnt_game):
+            if error[idx_game]:
+                raise AssertionError(f"Game {idx_game}: Dog succeeds on the action, VectorDog fails")
+            self._check_state(idx_game)
+
+    def _check_state(self, idx_game: int) -> None:
+        shadow = self.list_shadow[idx_game]
+        state, state_shadow = self.get_state(idx_game).model_dump(), shadow.get_state().model_dump()
+        rule_state = (int(self.exchange_counter[idx_game]), bool(self.seven_active[idx_game]))
+        rule_state_shadow = (shadow.exchange_counter, shadow.seven_start is not None)
+        if state != state_shadow or rule_state != rule_state_shadow:
+            raise AssertionError(f"Game {idx_game}: VectorDog state {state} {rule_state} differs from "
+                                 f"the Dog state {state_shadow} {rule_state_shadow}")
@@ -0,0 +1,118 @@
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple
+
+from server.py.dog_state import Card, get_card_id
+
+MASK = (1 << 64) - 1
+
+# The state attributes in the hash (the draw and discard piles are not, they do not change the position)
+STATE_FIELDS: Tuple[str, ...] = ('idx_player_active', 'idx_player_started', 'cnt_round', 'bool_card_exchanged',
+                                 'card_active')
+KIND_MARBLE, KIND_CARD, KIND_FIELD, KIND_EXCHANGE, KIND_SEVEN = range(5)
+
+
+def _mix(value: int) -> int:
+    """ splitmix64 finaliser """
+    value = (value + 0x9E3779B97F4A7C15) & MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK
+    return value ^ (value >> 31)
+
+
+@lru_cache(maxsize=4096)
+def get_key(*parts: int) -> int:
+    """ Random looking 64 bit key of a feature (the same in every process) """
+    key = 0
+    for part in parts:
+        key = _mix(key ^ (part & MASK))
+    return key
+
+
+# Keys of the usual features, other values (e.g. set by a test) fall back to get_key
+MARBLE_KEYS: List[List[int]] = [[get_key(KIND_MARBLE, idx, pos, is_save) for pos in range(96) for is_save in (0, 1)]
+                                for idx in range(16)]
+CARD_KEYS: List[List[int]] = [[get_key(KIND_CARD, idx_player, idx) for idx in range(53)] for idx_player in range(4)]
+
+
+def get_marble_key(idx_player: int, idx_marble: int, pos: int, is_save: bool) -> int:
+    idx = idx_player * 4 + idx_marble
+    if 0 <= pos < 96 and 0 <= idx_marble < 4 and 0 <= idx < 16:
+        return MARBLE_KEYS[idx][pos * 2 + bool(is_save)]
+    return get_key(KIND_MARBLE, idx, pos, is_save)
+
+
+def get_card_key(idx_player: int, card: Card) -> int:
+    idx = get_card_id(card)
+    if idx < 53 and 0 <= idx_player < 4:
+        return CARD_KEYS[idx_player][idx]
+    return get_key(KIND_CARD, idx_player, idx)
+
+
+def get_field_key(idx_field: int, value: Any) -> int:
+    if value is None:
+        return 0
+    return get_key(KIND_FIELD, idx_field, get_card_id(value) if isinstance(value, Card) else int(value))
+
+
+class ZobristHash:
+    """ 64 bit hash of a Dog position: marbles, hands, turn, active card, card exchange and the 7 being
+    played. The marbles and fields are xor-ed keys, the cards of a hand are added (a hand can hold the
+    same card twice). It is kept up to date with the changes the undo journal reports (JournalObserver). """
+
+    def __init__(self, game: Any) -> None:
+        self.game = game
+        self.state = game.state
+        self.marbles: Dict[int, Tuple[int, int]] = {
+            id(marble): (idx_player, idx_marble)
+            for idx_player, player in enumerate(self.state.list_player)
+            for idx_marble, marble in enumerate(player.list_marble)}
+        self.hands = {id(player.list_card): idx_player for idx_player, player in enumerate(self.state.list_player)}
+        self.value_xor = 0
+        for idx_player, player in enumerate(self.state.list_player):
+            for idx_marble, marble in enumerate(player.list_marble):
+                self.value_xor ^= get_marble_key(idx_player, idx_marble, marble.pos, marble.is_save)
+        for idx_field, name in enumerate(STATE_FIELDS):
+            self.value_xor ^= get_field_key(idx_field, getattr(self.state, name))
+        self.key_exchange = get_key(KIND_EXCHANGE, game.exchange_counter)
+        self.key_seven = self._get_seven_key()
+        self.value_sum = sum(get_card_key(idx_player, card)
+                             for idx_player, player in enumerate(self.state.list_player)
+                             for card in player.list_card) & MASK
+
+    @property
+    def value(self) -> int:
+        return self.value_xor ^ self.key_exchange ^ self.key_seven ^ self.value_sum
+
+    @staticmethod
+    def compute(game: Any) -> int:
+        """ Hash of the current position of a game, computed from scratch """
+        return ZobristHash(game).value
+
+    def _get_seven_key(self) -> int:
+        if self.game.seven_start is None:
+            return 0
+        return get_key(KIND_SEVEN, self.game.seven_steps_counter)
+
+    def changed(self, obj: Any, name: str, value_old: Any) -> None:
+        if obj is self.state:
+            if name in STATE_FIELDS:
+                idx_field = STATE_FIELDS.index(name)
+                self.value_xor ^= get_field_key(idx_field, value_old) ^ get_field_key(idx_field, getattr(obj, name))
+        elif obj is self.game:
+            if name == 'exchange_counter':
+                self.key_exchange = get_key(KIND_EXCHANGE, obj.exchange_counter)
+            elif name in ('seven_start', 'seven_steps_counter'):
+                self.key_seven = self._get_seven_key()
+        else:
+            location = self.marbles.get(id(obj))
+            if location is None:
+                return
+            pos, is_save = obj.pos, obj.is_save
+            pos_old, is_save_old = (value_old, is_save) if name == 'pos' else (pos, value_old)
+            self.value_xor ^= get_marble_key(*location, pos_old, is_save_old) ^ get_marble_key(*location, pos, is_save)
+
+    def changed_items(self, items: Any, removed: Iterable[Any], added: Iterable[Any]) -> None:
+        idx_player = self.hands.get(id(items))
+        if idx_player is not None:
+            value = self.value_sum - sum(get_card_key(idx_player, card) for card in removed)
+            self.value_sum = (value + sum(get_card_key(idx_player, card) for card in added)) & MASK
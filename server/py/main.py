@@ -9,6 +9,7 @@ import asyncio
 import server.py.hangman as hangman
 import server.py.battleship as battleship
 import server.py.dog as dog
+import server.py.dog_greedy as dog_greedy
 
 import random
 
@@ -321,7 +322,7 @@ async def dog_singleplayer_ws(websocket: WebSocket):
         # Initialize Dog game and random palyer ai
         game = dog.Dog()
         print(f"Initialized Game State: {game.get_state().model_dump()}") # for debuging
-        player = dog.RandomPlayer()
+        player = dog_greedy.GreedyPlayer()
 
         while True:
             state = game.get_state()
@@ -362,7 +363,9 @@ async def dog_singleplayer_ws(websocket: WebSocket):
             else:
                 # It's the AI's turn
                 list_action = game.get_list_action()
-                action = player.select_action(state, list_action)
+                # the AI runs in a thread, the event loop keeps serving the other connections
+                action = await asyncio.to_thread(
+                    player.select_action, game.get_player_view(state.idx_player_active), list_action)
                 print(f"AI Selected Action: {action.model_dump() if action else None}") #for debug
                 game.apply_action(action)
                 print(f"Updated Game State (AI Turn): {game.get_state().model_dump()}")# for debug
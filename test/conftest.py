@@ -0,0 +1,24 @@
+import pytest
+
+from server.py.dog import Dog
+
+
+@pytest.fixture(name='make_game')
+def fixture_make_game():
+    """ Games after the card exchange, Blue to play the given cards with the marbles of each player (by index)
+    on the given positions """
+
+    def make_game(positions, cards) -> Dog:
+        game = Dog(seed=13)
+        state = game.get_state()
+        state.bool_card_exchanged = True
+        state.idx_player_active = 0
+        for idx_player, player in enumerate(state.list_player):
+            for marble, pos in zip(player.list_marble, positions.get(idx_player, ())):
+                marble.pos = pos
+                marble.is_save = idx_player == 0  # the engine only moves own marbles marked save along the ring
+        state.list_player[0].list_card = cards
+        game.set_state(state)
+        return game
+
+    return make_game
@@ -1,6 +1,7 @@
 # test file 
 
 
+import random
 import pytest
 from unittest.mock import MagicMock, patch
 from server.py.dog import Dog, GamePhase, Card, Marble, PlayerState, Action, GameState, RandomPlayer
@@ -82,6 +83,10 @@ def test_get_partner_actions():
     # Manually set all marbles to finish zone
     for marble in player.list_marble:
         marble.pos = Dog.ENDZONE[player.name][0]
+    # and one of the teammate's marbles on the ring
+    teammate = game.state.list_player[(game.state.idx_player_active + 2) % 4]
+    teammate.list_marble[0].pos = 10
+    player.list_card = [Card(suit='♠', rank='5')]
 
     actions = game.get_list_action()
     assert actions, "There should be actions for the teammate's marbles when all active player's marbles are in the finish zone."
@@ -161,17 +166,18 @@ def test_apply_jake_action():
     # Assume we're using the setup as defined earlier and players' marbles are in the initial positions
     # Pick a player and an action to simulate
     player = game.state.list_player[0]  # Blue player
-    action_to_apply = Action(pos_from=0, pos_to=game.state.list_player[1].list_marble[0].pos)  # Swap with the first marble of Yellow player
+    # Swap with the first marble of Yellow player
+    action_to_apply = Action(pos_from=player.list_marble[0].pos, pos_to=game.state.list_player[1].list_marble[0].pos)
 
     # Initial positions before swap
-    initial_pos_from = player.list_marble[action_to_apply.pos_from].pos
+    initial_pos_from = player.list_marble[0].pos
     initial_pos_to = game.state.list_player[1].list_marble[0].pos
 
     # Apply action
     game.apply_jake_action(player, action_to_apply)
 
     # After swap check
-    assert player.list_marble[action_to_apply.pos_from].pos == initial_pos_to, \
+    assert player.list_marble[0].pos == initial_pos_to, \
         "Marble position should be swapped to the position of the target marble"
     assert game.state.list_player[1].list_marble[0].pos == initial_pos_from, \
         "Target marble should be swapped to the original position of the actor's marble"
@@ -186,8 +192,8 @@ def test_move_marble_on_board():
     initial_position = marble_to_move.pos
     target_position = initial_position + 5  # Move the marble forward by 5 positions
 
-    # Reset SEVEN_STEPS_COUNTER before the action
-    Dog.SEVEN_STEPS_COUNTER = 0
+    # Reset seven_steps_counter before the action
+    game.seven_steps_counter = 0
 
     # Create an action and apply it
     action = Action(pos_from=initial_position, pos_to=target_position)
@@ -197,10 +203,10 @@ def test_move_marble_on_board():
     assert marble_to_move.pos == target_position, "Marble should be moved to the new position."
     assert not marble_to_move.is_save, "Marble should not be in a safe state after moving."
 
-    # Check if SEVEN_STEPS_COUNTER is updated correctly
+    # Check if seven_steps_counter is updated correctly
     expected_counter_update = target_position - initial_position
-    assert Dog.SEVEN_STEPS_COUNTER == expected_counter_update, \
-        f"SEVEN_STEPS_COUNTER should be updated by the distance moved, expected {expected_counter_update}."
+    assert game.seven_steps_counter == expected_counter_update, \
+        f"seven_steps_counter should be updated by the distance moved, expected {expected_counter_update}."
 
 # def test_reshuffle_if_empty():
 #     game = setup_game_with_cards()
@@ -320,28 +326,29 @@ def game_state():
     )
 
 @pytest.fixture
-def mock_endzone():
-    Dog.ENDZONE = {
+def mock_endzone(monkeypatch):
+    monkeypatch.setattr(Dog, "ENDZONE", {
         "Blue": [60, 95],
         "Green": [40, 59],
         "Red": [20, 39],
         "Yellow": [0, 19],
-    }
+    })
 
 @pytest.fixture
-def mock_kennel_and_start_positions():
-    Dog.KENNEL = {
+def mock_kennel_and_start_positions(monkeypatch):
+    # monkeypatch restores the real board layout, later tests play on it
+    monkeypatch.setattr(Dog, "KENNEL", {
         "Blue": [0, 1, 2],
         "Green": [3, 4, 5],
         "Red": [6, 7, 8],
         "Yellow": [9, 10, 11],
-    }
-    Dog.START_POSITIONS = {
+    })
+    monkeypatch.setattr(Dog, "START_POSITIONS", {
         "Blue": 10,
         "Green": 15,
         "Red": 20,
         "Yellow": 25,
-    }
+    })
 
 # def test_get_partner_actions(game_state, mock_endzone):
 #     player = PlayerState(
@@ -379,7 +386,7 @@ def test_get_player_actions(game_state):
         teamMate="Green"
     )
     class MockDog(Dog):
-        def get_seven_actions(self, player, card):
+        def get_seven_actions(self, player, card, start_save=False):
             return [Action(card=card, pos_from=10, pos_to=17)]
         def get_jake_actions(self, player, card):
             return [Action(card=card, pos_from=20, pos_to=30)]
@@ -418,7 +425,7 @@ def test_get_kennel_exit_actions(mock_kennel_and_start_positions):
         teamMate="Green"
     )
     class MockDog(Dog):
-        def add_substitute_actions(self, actions, card):
+        def add_substitute_actions(self, actions, card, ranks=("K", "A")):
             actions.append(Action(card=card, pos_from=0, pos_to=11))
     dog = MockDog()
     actions = dog.get_kennel_exit_actions(player)
@@ -644,7 +651,7 @@ def test_handle_seven_card(game_state):
         pass
 
     dog = MockDog()
-    Dog.SEVEN_STEPS_COUNTER = 0
+    dog.seven_steps_counter = 0
     dog.state = GameState(
         cnt_player=4,
         phase="running",
@@ -664,13 +671,13 @@ def test_handle_seven_card(game_state):
     # Test setting card_active when no card is active
     dog._handle_seven_card(action)
     assert dog.state.card_active == seven_card
-    assert Dog.SEVEN_STEPS_COUNTER == 0
+    assert dog.seven_steps_counter == 0
 
-    # Test resetting card_active and advancing turn when SEVEN_STEPS_COUNTER reaches 7
-    Dog.SEVEN_STEPS_COUNTER = 7
+    # Test resetting card_active and advancing turn when seven_steps_counter reaches 7
+    dog.seven_steps_counter = 7
     dog._handle_seven_card(action)
     assert dog.state.card_active is None
-    assert Dog.SEVEN_STEPS_COUNTER == 0
+    assert dog.seven_steps_counter == 0
     assert dog.state.idx_player_active == 1
 
 def test_is_valid_move():
@@ -690,5 +697,29 @@ def test_is_valid_move():
     # Test valid move (boundary check)
     assert GameState.is_valid_move(40, marbles) is True
 
+
+def test_random_players_play_through_rounds():
+    """Seeded random players on their views, by action id: every listed action can be applied (and undone)."""
+    player = RandomPlayer()
+    for seed in range(4):
+        random.seed(seed)
+        game = Dog(seed=seed)
+        for _ in range(400):
+            view = game.get_player_view(game.state.idx_player_active)
+            action_id = game.get_action_id(player.select_action(view, game.get_list_action()))
+            assert game.get_legal_action_mask()[action_id]
+            game.apply_action_id(action_id)
+            if game.state.phase == GamePhase.FINISHED:
+                break
+        assert game.state.cnt_round > 1
+
+        copy = game.clone()
+        state = game.get_state()
+        game.undo()
+        assert game.get_state() != state and copy.get_state() == state
+        copy.set_state(state)
+        assert copy.get_state() == state and copy.get_list_action() == copy.clone().get_list_action()
+
+
 if __name__ == "__main__":
     pytest.main()
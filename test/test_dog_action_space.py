@@ -0,0 +1,90 @@
+import random
+from typing import List
+
+import numpy as np
+import pytest
+
+from server.py.dog import Dog, Action, Card
+
+
+def test_layout():
+    space = Dog.ACTION_SPACE
+    assert len(space.list_card) == 53
+    assert len(space.list_card_swap) == 52
+    assert len(space) == 1 + 53 + 52 + len(space.move_keys) < 53 * 96 * 96 // 10
+    assert space.encode(None) == 0
+    assert space.encode(('♠', '2', None, None, None, None)) == 1
+    assert space.encode(('', 'JKR', None, None, '♠', '2')) == 1 + 53
+    assert space.encode(('♠', '2', 0, 2, None, None)) == 1 + 53 + 52  # the first move 2♠ can make
+    assert space.encode(('♠', 'J', 5, 40, None, None)) is not None  # Jake swaps on the ring
+    assert space.encode(('', 'JKR', 64, 0, None, None)) is not None  # Joker out of the kennel
+
+
+@pytest.mark.parametrize("action", [
+    None,
+    Action(card=Card(suit='♥', rank='K'), pos_from=None, pos_to=None),
+    Action(card=Card(suit='', rank='JKR'), pos_from=None, pos_to=None, card_swap=Card(suit='♣', rank='A')),
+    Action(card=Card(suit='♦', rank='4'), pos_from=62, pos_to=2),
+    Action(card=Card(suit='♠', rank='A'), pos_from=88, pos_to=48),
+    Action(card=Card(suit='♥', rank='7'), pos_from=63, pos_to=70),
+])
+def test_round_trip(action):
+    game = Dog()
+    assert game.get_action_from_id(game.get_action_id(action)) == action
+
+
+@pytest.mark.parametrize("key", [
+    ('♠', 'A', 60, 96, None, None),          # off the board
+    ('♠', '5', 10, 12, None, None),          # a move its card can never make
+    ('♠', 'K', 64, 16, None, None),          # out of the kennel onto another colour's start
+    ('♠', 'A', None, 5, None, None),         # half a move
+    ('♠', 'A', None, None, '♥', 'K'),        # only the Joker can be played as another card
+    ('', 'JKR', None, None, '', 'JKR'),      # ... and not as a Joker
+    ('♠', 'X', 1, 2, None, None),            # unknown card
+])
+def test_actions_outside_the_space(key):
+    assert Dog.ACTION_SPACE.encode(key) is None
+
+
+def test_decode_rejects_unknown_ids():
+    with pytest.raises(ValueError):
+        Dog.ACTION_SPACE.decode(len(Dog.ACTION_SPACE))
+    with pytest.raises(ValueError):
+        Dog.ACTION_SPACE.decode(-1)
+
+
+def test_mask_matches_list_action_during_play():
+    game, game_by_id = Dog(seed=7), Dog(seed=7)
+    rng = random.Random(7)
+    for _ in range(120):
+        list_action = game.get_list_action()
+        mask = game_by_id.get_legal_action_mask()
+        assert mask.shape == (len(Dog.ACTION_SPACE),)
+        list_id: List[int] = [int(action_id) for action_id in np.flatnonzero(mask)]
+        if list_action:
+            assert list_id == sorted({game.get_action_id(action) for action in list_action})
+        else:
+            assert list_id == [0]
+
+        # every listed action can be applied, by value and by id
+        action = rng.choice(list_action) if list_action else None
+        game.apply_action(action)
+        game_by_id.apply_action_id(game.get_action_id(action))
+        assert game_by_id.get_state() == game.get_state()
+
+
+def test_partner_moves_stay_on_the_board_and_are_in_the_mask():
+    game = Dog()
+    state = game.state
+    player = state.list_player[state.idx_player_active]
+    player.list_card = [Card(suit='♠', rank='Q')]
+    for marble, pos in zip(player.list_marble, Dog.ENDZONE[player.name]):
+        marble.pos = pos
+    partner = state.list_player[(state.idx_player_active + 2) % 4]
+    partner.list_marble[0].pos = 60
+    list_action = game.get_list_action()
+    assert list_action == [Action(card=Card(suit='♠', rank='Q'), pos_from=60, pos_to=8)]
+
+    mask = game.get_legal_action_mask()
+    assert mask.sum() == len(list_action)
+    assert mask[game.get_action_id(list_action[0])]
@@ -0,0 +1,76 @@
+from server.py.dog import Dog, Card, Action
+from server.py.dog_endgame import EndgamePlayer, EndgameSolver, WIN, estimate_size, get_position_key
+
+
+def make_game(cards):
+    """ Red in the finish, Blue with three marbles in it and one two fields before its start """
+    game = Dog(seed=13)
+    state = game.get_state()
+    state.bool_card_exchanged = True
+    state.idx_player_active = 0
+    for marble, pos in zip(state.list_player[0].list_marble, [69, 70, 71, 62]):
+        marble.pos = pos
+        marble.is_save = False
+    for marble, pos in zip(state.list_player[2].list_marble, [84, 85, 86, 87]):
+        marble.pos = pos
+    for idx_player, player in enumerate(state.list_player):
+        player.list_card = cards if idx_player == 0 else [Card(suit='♣', rank='5')]
+    game.set_state(state)
+    return game
+
+
+def test_solves_finish_and_reuses_memo():
+    game = make_game([Card(suit='♠', rank='2'), Card(suit='♠', rank='3')])
+    solver = EndgameSolver()
+    assert solver.solve(game) == WIN
+    assert solver.get_stats().cnt_miss == 1 and solver.get_stats().hit_rate == 0.0
+    assert solver.solve(game) == WIN
+    assert solver.get_stats().cnt_hit == 1 and solver.get_stats().hit_rate == 0.5
+    action, value = solver.get_best_action(game, game.get_list_action())
+    assert action == Action(card=Card(suit='♠', rank='3'), pos_from=62, pos_to=68) and value == WIN
+    assert game.state.list_player[0].list_marble[3].pos == 62  # the actions searched are undone
+
+
+def test_memo_is_bounded_and_search_gives_up():
+    game = make_game([Card(suit='♠', rank='5'), Card(suit='♥', rank='6')])
+    solver = EndgameSolver(size=1)
+    solver.solve(game)
+    assert solver.get_stats().cnt_entry <= 1
+    assert EndgameSolver(max_nodes=0).solve(game) is None
+
+
+def test_player_solves_known_hands_only():
+    game = make_game([Card(suit='♠', rank='3'), Card(suit='♥', rank='3')])
+    assert estimate_size(game.get_state()) == 10 ** 5  # 9 marbles outside the finish, 5 cards
+    player = EndgamePlayer()
+    action = player.select_action(game.get_state(), game.get_list_action())
+    assert action is not None and action.pos_to == 68 and player.cnt_solved == 1
+    player.select_action(game.get_player_view(0), game.get_list_action())
+    assert player.cnt_fallback == 1
+
+
+def test_player_goes_on_with_the_seven_being_played():
+    game = make_game([Card(suit='♠', rank='7')])
+    game.state.list_player[0].list_marble[2].pos = 30  # three marbles outside the finish, seven steps
+    game.mark_state_changed()
+    game.apply_action(Action(card=Card(suit='♠', rank='7'), pos_from=62, pos_to=64))
+    list_action = game.get_list_action()
+    player = EndgamePlayer()
+    action = player.select_game_action(game.clone(), game.get_state(), list_action)
+    assert action in list_action and player.cnt_solved == 1
+    assert action.pos_to - action.pos_from <= 5  # the steps left of the 7
+
+
+def test_position_key_holds_the_round_and_the_player_who_started_it():
+    game = make_game([Card(suit='♠', rank='2')])
+    key = get_position_key(game)
+    game.state.idx_player_started = (game.state.idx_player_started + 1) % 4
+    assert get_position_key(game) != key
+    game.state.idx_player_started = (game.state.idx_player_started + 3) % 4
+    assert get_position_key(game) == key
+    game.exchange_counter = 2
+    assert get_position_key(game) != key
+    game.exchange_counter = 0
+    assert get_position_key(game) == key
+    game.state.cnt_round += 1  # the same position deals other cards next
+    assert get_position_key(game) != key
@@ -0,0 +1,336 @@
+# pylint: disable=protected-access  # the tests look into the board index and the undo journal
+import random
+
+import pytest
+
+from server.py.dog import Dog, GamePhase, Card, Marble, PlayerState, Action, GameState
+from server.py.dog_board import BoardIndex
+
+
+def test_rule_counters_are_per_game():
+    """Mid-turn rule state of one game must not leak into another game."""
+    game_1 = Dog(seed=1)
+    game_2 = Dog(seed=2)
+
+    for _ in range(3):  # three of the four players exchange a card in the first game
+        game_1.apply_action(game_1.get_list_action()[0])
+    assert game_1.exchange_counter == 3
+    assert game_2.exchange_counter == 0
+    assert not game_2.state.bool_card_exchanged
+
+    game_1.apply_action(game_1.get_list_action()[0])  # the last exchange, then a 7 is played
+    player = game_1.state.list_player[game_1.state.idx_player_active]
+    player.list_card = [Card(suit='♠', rank='7')]
+    player.list_marble[0].pos = 0
+    player.list_marble[0].is_save = True
+    game_1.apply_action(Action(card=Card(suit='♠', rank='7'), pos_from=0, pos_to=2))
+    assert game_1.seven_steps_counter == 5
+    assert game_2.seven_steps_counter == 0
+    assert game_2.exchange_counter == 0
+    assert Dog(seed=3).seven_steps_counter == 0
+
+    # A seed makes the deal reproducible
+    assert Dog(seed=1).state.list_card_draw == Dog(seed=1).state.list_card_draw
+
+
+def test_seven_journal_is_per_game():
+    """Rolling back a 7 only restores the game that played it."""
+    game_1 = Dog(seed=1)
+    game_2 = Dog(seed=2)
+    for game in (game_1, game_2):
+        game.state.bool_card_exchanged = True
+        player = game.state.list_player[0]
+        player.list_card = [Card(suit='♠', rank='7')]
+        player.list_marble[0].pos = 0
+        player.list_marble[0].is_save = True
+
+    game_1.apply_action(Action(card=Card(suit='♠', rank='7'), pos_from=0, pos_to=3))
+    assert game_1.seven_steps_counter == 4
+    assert game_2.seven_steps_counter == 0
+    assert game_2.seven_start is None
+
+    game_1.apply_action(None)
+    assert game_1.state.list_player[0].list_marble[0].pos == 0
+    assert game_2.state.list_player[0].list_marble[0].pos == 0
+
+
+def test_board_index_follows_moves():
+    """The occupancy index is updated by the game's own moves and rebuilt after outside changes."""
+    game = Dog(seed=0)
+    blue = game.state.list_player[0]
+    board = game._get_board()
+    assert board.marbles_at(64) == [(0, 0)]
+    assert board.cnt_kennel == [4, 4, 4, 4]
+    assert board.cnt_finish == [0, 0, 0, 0]
+
+    game.move_marble_to_start(blue, blue.list_marble[0], Action(pos_from=64, pos_to=0))
+    assert game._get_board() is board, "Own moves must not rebuild the index"
+    assert board.marbles_at(64) == []
+    assert board.is_occupied_by(0, 0)
+    assert board.cnt_kennel[0] == 3
+    assert (board.ring_mask[0], board.save_mask[0]) == (1, 1), "is_save changes reach the masks"
+
+    game.move_marble_to_finish(blue.list_marble[0], Action(pos_from=0, pos_to=Dog.ENDZONE["Blue"][1]))
+    assert board.cnt_finish[0] == 1
+    assert not board.is_occupied(0)
+    assert (board.ring_mask[0], board.save_mask[0], board.finish_mask[0]) == (0, 0, 0b10)
+
+    game.send_home(5)  # nobody there
+    blue.list_marble[1].pos = 5  # moved from outside
+    game.mark_state_changed()
+    assert game._get_board() is not board
+    game.send_home(5)
+    assert game._get_board().cnt_kennel[0] == 3
+    assert blue.list_marble[1].pos == Dog.KENNEL["Blue"][0]
+
+
+def test_board_index_shared_position():
+    """Two marbles on the same position stay indexed when one of them leaves."""
+    game = Dog(seed=0)
+    blue = game.state.list_player[0]
+    blue.list_marble[0].pos = 10
+    blue.list_marble[1].pos = 10
+    board = game._get_board()
+    assert board.marbles_at(10) == [(0, 0), (0, 1)]
+
+    game._set_marble_pos(blue.list_marble[0], 12)
+    assert board.marbles_at(10) == [(0, 1)]
+    assert board.marbles_at(12) == [(0, 0)]
+    assert board.ring_mask[0] == 1 << 10 | 1 << 12
+    assert game._find_marble_to_move(blue, 10) is blue.list_marble[1]
+    assert game._find_marble_to_move(game.state.list_player[1], 10) is None
+    with pytest.raises(ValueError):
+        board.idx_player(PlayerState(name="Blue", list_card=[], list_marble=[], teamMate="Green"))
+
+
+def test_cards_and_actions_are_hashable():
+    """Equal cards share one interned instance and equal actions hash alike."""
+    card = Card.of('♠', 'A')
+    assert card is Card(suit='♠', rank='A').interned()
+    assert any(deck_card is card for deck_card in GameState.LIST_CARD)
+    assert len({Card(suit='♥', rank='7'), Card(suit='♥', rank='7'), Card(suit='♦', rank='7')}) == 2
+
+    action_1 = Action(card=Card(suit='♠', rank='A'), pos_from=0, pos_to=1)
+    action_2 = Action(card=card, pos_from=0, pos_to=1)
+    action_3 = Action(card=card, pos_from=0, pos_to=11)
+    assert action_1 == action_2 and hash(action_1) == hash(action_2)
+    assert action_1 != action_3
+    assert Dog()._remove_duplicate_actions([action_3, action_1, action_2, action_3]) == [action_3, action_1]
+
+
+def test_joker_substitutes_only_playable_cards():
+    """A Joker only stands for cards the player could play, and only once per hand."""
+    game = Dog(seed=0)
+    game.state.bool_card_exchanged = True
+    player = game.state.list_player[game.state.idx_player_active]
+    player.list_card = [Card(suit='', rank='JKR'), Card(suit='', rank='JKR')]
+    for marble in player.list_marble:
+        marble.pos, marble.is_save = Dog.KENNEL[player.name][0], False
+    player.list_marble[0].pos, player.list_marble[0].is_save = 0, True
+
+    board_actions = game.get_board_move_actions(player)
+    swaps = [action for action in board_actions if action.card_swap is not None]
+    assert len(swaps) == len(set(swaps)), "Each substitute must be generated once"
+    assert {action.card_swap.rank for action in swaps} == set(Dog.JOKER_RANKS) - {'J'}
+
+    game.state.list_player[1].list_marble[0].pos = 30  # someone to swap with
+    game.mark_state_changed()
+    swaps = [action for action in game.get_list_action() if action.card_swap is not None]
+    assert {action.card_swap.rank for action in swaps} == set(Dog.JOKER_RANKS)
+
+    player.list_marble[0].pos = Dog.ENDZONE[player.name][1]  # start free again, 1 or 2 steps left in the finish
+    game.mark_state_changed()
+    swaps = [action for action in game.get_list_action() if action.card_swap is not None]
+    assert {action.card_swap.rank for action in swaps} == {'2', 'K', 'A'}  # not all 7 steps can be moved
+
+
+def test_joker_actions_lazy_random():
+    """With a random generator the first substitute is drawn from the playable ones only."""
+    game = Dog(seed=0)
+    player = game.state.list_player[0]
+    joker = Card.of('', 'JKR')
+    all_swaps = list(game.iter_joker_actions(player, joker))
+    assert {action.card_swap.rank for action in all_swaps} == {'K', 'A'}
+    rng = random.Random(3)
+    first = {next(game.iter_joker_actions(player, joker, rng)) for _ in range(50)}
+    assert first <= set(all_swaps) and len(first) > 1
+    assert sorted(game.iter_joker_actions(player, joker, rng), key=str) == sorted(all_swaps, key=str)
+
+
+def test_seven_split_and_rollback():
+    """While a 7 is played only its remaining steps are listed, None takes the steps back."""
+    game = Dog(seed=0)
+    game.state.bool_card_exchanged = True
+    player = game.state.list_player[0]
+    opponent = game.state.list_player[1]
+    seven_card = Card(suit='♠', rank='7')
+    player.list_card = [seven_card, Card(suit='♠', rank='J')]
+    player.list_marble[0].pos, player.list_marble[0].is_save = 0, True
+    opponent.list_marble[0].pos, opponent.list_marble[0].is_save = 2, False
+
+    game.apply_action(Action(card=seven_card, pos_from=0, pos_to=3))
+    assert opponent.list_marble[0].pos == Dog.KENNEL["Green"][0]
+    assert player.list_marble[0].is_save is False
+    assert game.get_list_action() == [Action(card=seven_card, pos_from=3, pos_to=pos_to) for pos_to in range(4, 8)]
+
+    game.apply_action(None)
+    assert game.state.card_active is None and game.seven_start is None
+    assert (player.list_marble[0].pos, player.list_marble[0].is_save) == (0, True)
+    assert opponent.list_marble[0].pos == 2
+    assert game._get_board().marbles_at(2) == [(1, 0)]
+
+    game.undo()  # takes back the rollback
+    assert player.list_marble[0].pos == 3 and game.seven_steps_counter == 4
+    game.undo()  # takes back the first step
+    assert game.seven_start is None and player.list_marble[0].pos == 0
+    assert opponent.list_marble[0].pos == 2
+
+
+def test_undo_restores_every_applied_action():
+    """Apply and undo every step of random games, the state must be exactly the one before."""
+    for seed in range(8):
+        game = Dog(seed=seed)
+        rng = random.Random(seed)
+        list_state = []
+        for _ in range(Dog.UNDO_DEPTH):
+            list_action = game.get_list_action()
+            list_state.append(game.get_state().model_copy(deep=True))
+            action = rng.choice(list_action) if list_action else None
+            game.apply_action(action)
+            game.undo()
+            assert game.get_state() == list_state[-1]
+            game.apply_action(action)
+            board, board_new = game._get_board(), BoardIndex(game.state.list_player, Dog.KENNEL, Dog.ENDZONE)
+            assert (board.ring_mask, board.save_mask, board.finish_mask) == \
+                (board_new.ring_mask, board_new.save_mask, board_new.finish_mask), "The masks follow every change"
+            if game.state.phase == GamePhase.FINISHED:
+                break
+
+        # ... and back to the start, including the random generator of the deck
+        for state in reversed(list_state):
+            game.undo()
+            assert game.get_state() == state
+        assert game._get_board().positions == [[marble.pos for marble in player.list_marble]
+                                               for player in game.state.list_player]
+        assert game.get_state() == Dog(seed=seed).get_state()
+        assert game.rng.getstate() == Dog(seed=seed).rng.getstate()
+
+
+def test_get_state_is_a_model_snapshot():
+    game = Dog(seed=4)
+    state = game.get_state()
+    assert isinstance(state, GameState) and isinstance(state.list_player[0], PlayerState)
+    assert isinstance(state.list_player[0].list_marble[0], Marble)
+    state.list_player[0].list_marble[0].pos = 0
+    assert game.state.list_player[0].list_marble[0].pos == 64
+
+    game.set_state(state)  # the game goes on with the given model
+    game.apply_action(game.get_list_action()[0])
+    assert state.list_player[0].list_card == game.get_state().list_player[0].list_card
+
+
+def test_clone_is_independent():
+    game = Dog(seed=5)
+    rng = random.Random(5)
+    for _ in range(30):
+        list_action = game.get_list_action()
+        game.apply_action(rng.choice(list_action) if list_action else None)
+    copy = game.clone()
+    assert copy.get_state() == game.get_state()
+
+    list_action = copy.get_list_action()
+    copy.apply_action(list_action[0] if list_action else None)
+    assert copy.get_state() != game.get_state()
+    assert [copy.rng.random() for _ in range(3)] == [game.rng.random() for _ in range(3)]
+
+
+def test_clone_can_take_back_the_started_seven():
+    game = Dog(seed=0)
+    game.state.bool_card_exchanged = True
+    player = game.state.list_player[0]
+    seven_card = Card(suit='♠', rank='7')
+    player.list_card = [seven_card]
+    player.list_marble[0].pos, player.list_marble[0].is_save = 0, True
+    state_before = game.get_state()
+    game.apply_action(Action(card=seven_card, pos_from=0, pos_to=3))
+
+    copy = game.clone()
+    copy.apply_action(None)
+    assert copy.state.list_player[0].list_marble[0].pos == 0
+    assert copy.state.card_active is None and copy.seven_start is None
+    assert game.state.list_player[0].list_marble[0].pos == 3
+
+    copy.undo()
+    copy.undo()
+    assert copy.get_state() == state_before
+    with pytest.raises(ValueError):
+        copy.undo()  # the actions before the 7 are not copied
+
+
+def test_undo_without_action():
+    game = Dog(seed=0)
+    with pytest.raises(ValueError):
+        game.undo()
+    game.apply_action(game.get_list_action()[0])
+    game.set_state(game.get_state())
+    with pytest.raises(ValueError):
+        game.undo()
+
+
+def test_jake_swaps_each_pair_once():
+    game = Dog(seed=0)
+    blue, green, red = game.state.list_player[:3]
+    card = Card(suit='♠', rank='J')
+    for marble, pos in zip(blue.list_marble, (5, 69, 64, 40)):
+        marble.pos = pos
+    green.list_marble[0].pos, green.list_marble[0].is_save = 16, True  # protected on its start
+    red.list_marble[0].pos = 50
+    red.list_marble[1].pos = 84  # in the finish
+
+    actions = game.get_jake_actions(blue, card)
+    assert [(action.pos_from, action.pos_to) for action in actions] == [(5, 50), (50, 5), (40, 50), (50, 40)]
+    assert actions[0] is game.get_jake_actions(blue, Card(suit='♠', rank='J'))[0]  # shared instances
+
+    red.list_marble[0].pos = 80  # no other marble left to swap with: own marbles swap
+    game.mark_state_changed()
+    assert [(action.pos_from, action.pos_to) for action in game.get_jake_actions(blue, card)] == [(5, 40), (40, 5)]
+
+
+def test_jake_swap_from_ring_position():
+    game = Dog(seed=0)
+    state = game.get_state()
+    state.bool_card_exchanged = True
+    state.idx_player_active = 0
+    state.list_player[0].list_marble[2].pos = 40
+    state.list_player[1].list_marble[0].pos = 50
+    state.list_player[0].list_card = [Card(suit='♠', rank='J')]
+    game.set_state(state)
+    blue, green = game.state.list_player[:2]
+
+    game.apply_action(Action(card=Card(suit='♠', rank='J'), pos_from=40, pos_to=50))
+    assert blue.list_marble[2].pos == 50 and green.list_marble[0].pos == 40
+    game.undo()
+    game.apply_action(Action(card=Card(suit='♠', rank='J'), pos_from=50, pos_to=40))  # listed the other way too
+    assert blue.list_marble[2].pos == 50 and green.list_marble[0].pos == 40
+
+
+def test_player_view_hides_other_hands_and_draw_pile():
+    game = Dog(seed=5)
+    state = game.get_state()
+    view = game.get_player_view(1)
+    assert view.list_player[1] == state.list_player[1]
+    for idx_player in (0, 2, 3):
+        player = view.list_player[idx_player]
+        assert player.list_card == [] and player.cnt_card == 6
+        assert player.list_marble == state.list_player[idx_player].list_marble
+    assert view.list_card_draw == [] and view.cnt_card_draw == len(state.list_card_draw)
+    assert view.model_copy(update={'list_player': state.list_player, 'list_card_draw': state.list_card_draw,
+                                   'cnt_card_draw': None}) == state
+    assert game.get_player_view(1) is view  # kept until the next action
+    assert game.get_player_view(2).list_player[0] is view.list_player[0]  # shared by the views
+
+    game.apply_action(game.get_list_action()[0])
+    assert game.get_player_view(1) is not view
+    assert game.get_player_view(0).list_player[0].list_card == game.get_state().list_player[0].list_card
+    with pytest.raises(ValueError):
+        game.get_player_view(4)
@@ -0,0 +1,50 @@
+import random
+
+from server.py.dog import Dog, Card, GamePhase
+
+
+def test_successors_match_applied_copies():
+    game = Dog(seed=6)
+    rng = random.Random(6)
+    for _ in range(120):
+        state = game.get_state()
+        list_successor = game.expand()
+        assert game.get_state() == state  # every action was undone
+        list_action = game.get_list_action()
+        assert [successor.action for successor in list_successor] == (list_action or [None])
+        for successor in list_successor:
+            copy = game.clone()
+            copy.apply_action(successor.action)
+            assert successor.marble_pos == tuple(tuple(marble.pos for marble in player.list_marble)
+                                                 for player in copy.state.list_player)
+            assert not successor.is_finished
+        action = rng.choice(list_successor).action
+        game.apply_action(action)
+
+
+def test_successors_count_marbles_sent_home_and_progress():
+    game = Dog(seed=0)
+    state = game.get_state()
+    state.bool_card_exchanged = True
+    blue, red = state.list_player[0], state.list_player[2]
+    blue.list_card = [Card(suit='♠', rank='7')]
+    blue.list_marble[0].pos, blue.list_marble[0].is_save = 10, False
+    red.list_marble[0].pos = 12  # on the way of the 7
+    game.set_state(state)
+
+    successor = next(successor for successor in game.expand() if successor.action.pos_to == 17)
+    assert successor.sent_home == ((2, 0),)
+    assert successor.progress_delta == (7, 0, -(12 - 32 + 64 + 1), 0)
+    assert not successor.is_finished
+
+    for marble, pos in zip(blue.list_marble, (63, 69, 70, 71)):
+        marble.pos = pos
+    for marble, pos in zip(red.list_marble, (84, 85, 86, 87)):  # the partner (idx + 2) is done
+        marble.pos = pos
+    blue.list_card = [Card(suit='♠', rank='2')]
+    game.set_state(state)
+    successors = game.expand()
+    assert len(successors) == 1
+    successor = successors[0]
+    assert successor.is_finished and successor.progress_delta[0] == 65 - 64
+    assert game.state.phase == GamePhase.RUNNING
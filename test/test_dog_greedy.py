@@ -0,0 +1,45 @@
+from server.py.dog import Dog, Card, Action, GamePhase
+from server.py.dog_greedy import CNT_FEATURE, HOME_OPPONENT, GreedyPlayer, encode
+
+
+def test_sends_opponent_home(make_game):
+    game = make_game({0: [10], 1: [15]}, [Card(suit='♠', rank='5'), Card(suit='♥', rank='3')])
+    player = GreedyPlayer()
+    action = player.select_action(game.get_player_view(0), game.get_list_action())
+    assert action == Action(card=Card(suit='♠', rank='5'), pos_from=10, pos_to=15)
+    assert player.cnt_select == 1 and player.time_select > 0
+
+
+def test_leaves_the_kennel_and_keeps_the_joker(make_game):
+    # the K has no move along the ring from 56 (it would go past 63)
+    game = make_game({0: [64, 56]}, [Card(suit='♠', rank='3'), Card(suit='', rank='JKR'), Card(suit='♠', rank='K')])
+    action = GreedyPlayer().select_action(game.get_player_view(0), game.get_list_action())
+    assert action == Action(card=Card(suit='♠', rank='K'), pos_from=64, pos_to=0)
+
+
+def test_no_action():
+    assert GreedyPlayer().select_action(Dog().get_player_view(0), []) is None
+
+
+def test_plays_full_games():
+    """ The AI of /dog/singleplayer/ws on all four seats: the games end without errors """
+    player = GreedyPlayer()
+    for seed in range(20):
+        game = Dog(seed=seed)
+        for _ in range(5000):
+            state = game.get_state()
+            if state.phase == GamePhase.FINISHED:
+                break
+            list_action = game.get_list_action()
+            game.apply_action(player.select_action(game.get_player_view(state.idx_player_active), list_action))
+        assert game.state.phase == GamePhase.FINISHED
+
+
+def test_encode_one_row_per_action(make_game):
+    game = make_game({0: [10], 1: [15]}, [Card(suit='♠', rank='5'), Card(suit='♥', rank='3')])
+    actions = game.get_list_action()
+    rows = encode(game.get_player_view(0), actions)
+    assert rows.shape == (len(actions), CNT_FEATURE)
+    assert [row[HOME_OPPONENT] for row in rows] == [action.pos_to == 15 for action in actions]
+    player = GreedyPlayer()
+    assert list(player.get_scores(game.get_player_view(0), actions)) == list(rows @ player.weights)
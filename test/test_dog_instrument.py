@@ -0,0 +1,30 @@
+from server.py.dog import Dog
+from server.py.dog_instrument import Instrumentation
+
+
+def test_counts_while_enabled_only():
+    instrumentation = Instrumentation(Dog)
+    game = Dog(seed=8)
+    game.state.bool_card_exchanged = True
+    original = Dog.get_list_action
+    instrumentation.enable()
+    try:
+        actions = game.get_list_action()
+        game.get_list_action()  # made of the sections cached by the first
+        game.clone()
+        game.get_player_view(0)
+        snapshot = instrumentation.snapshot()
+    finally:
+        instrumentation.disable()
+    assert Dog.get_list_action is original
+    assert snapshot['enabled'] and not instrumentation.enabled
+    generators = snapshot['generators']
+    assert generators['get_list_action']['calls'] == 2
+    assert generators['get_board_move_actions']['calls'] == 2
+    assert generators['get_list_action']['seconds'] >= generators['get_board_move_actions']['seconds'] > 0
+    assert snapshot['actions_generated'] >= snapshot['actions_kept'] == 2 * len(actions)
+    assert snapshot['copies'] == {'clone': 1, '_to_model': 1}
+
+    game.state.idx_player_active = 1
+    game.get_list_action()
+    assert instrumentation.snapshot()['generators']['get_list_action']['calls'] == 2
@@ -0,0 +1,83 @@
+import random
+
+from server.py.dog import Action, Card, Dog, GamePhase, RandomPlayer
+from server.py.dog_ismcts import Determinizer, ISMCTSPlayer, Search, evaluate, play
+
+
+def play_random(game: Dog, cnt_steps: int, seed: int) -> None:
+    rng = random.Random(seed)
+    for _ in range(cnt_steps):
+        list_action = game.get_list_action()
+        game.apply_action(rng.choice(list_action) if list_action else None)
+
+
+def test_determinizer_deals_the_hidden_cards_only():
+    game = Dog(seed=9)
+    play_random(game, 30, 9)
+    view = game.get_player_view(1)
+    other = Dog()
+    other.set_state(view.model_copy(deep=True))
+    Determinizer(view, 1).deal(other, random.Random(1))
+    state, state_dealt = game.get_state(), other.get_state()
+    assert state_dealt.list_player[1].list_card == state.list_player[1].list_card
+    for player, player_dealt in zip(state.list_player, state_dealt.list_player):
+        assert len(player_dealt.list_card) == len(player.list_card)
+        assert player_dealt.list_marble == player.list_marble
+    assert len(state_dealt.list_card_draw) == len(state.list_card_draw)
+
+
+def test_player_selects_a_listed_action():
+    game = Dog(seed=10)
+    game.state.bool_card_exchanged = True
+    play_random(game, 20, 10)
+    list_action = game.get_list_action()
+    while len(list_action) < 2:
+        play_random(game, 1, 11)
+        list_action = game.get_list_action()
+    player = ISMCTSPlayer(time_budget=10.0, seed=1, max_playouts=30)
+    action = player.select_action(game.get_player_view(game.state.idx_player_active), list_action)
+    assert action in list_action
+    assert player.cnt_playout == 30
+    assert player.select_action(game.get_state(), []) is None
+
+
+def test_search_goes_on_with_the_seven_being_played():
+    game = Dog(seed=13)
+    state = game.get_state()
+    state.bool_card_exchanged = True
+    state.idx_player_active = 0
+    seven = Card(suit='♠', rank='7')
+    state.list_player[0].list_card = [seven, Card(suit='♥', rank='2')]
+    state.list_player[0].list_marble[0].pos, state.list_player[0].list_marble[0].is_save = 10, False
+    game.set_state(state)
+    game.apply_action(Action(card=seven, pos_from=10, pos_to=13))
+    list_action = game.get_list_action()
+    assert {action.pos_to - action.pos_from for action in list_action} <= {1, 2, 3, 4}
+    view = game.get_player_view(0)
+    tree = Search(game.clone(), view, list_action, seed=1)
+    assert tree.game.seven_steps_counter == game.seven_steps_counter == 4
+    player = ISMCTSPlayer(time_budget=10.0, seed=3, max_playouts=20)
+    assert player.select_game_action(game.clone(), view, list_action) in list_action
+    assert player.cnt_playout == 20
+
+
+def test_evaluate_sees_the_finished_team_as_winner():
+    game = Dog(seed=12)
+    assert evaluate(game, 0) == 0.5
+    for idx_player in (0, 2):
+        for marble, pos in zip(game.state.list_player[idx_player].list_marble, Dog.ENDZONE[
+                game.state.list_player[idx_player].name]):
+            marble.pos = pos
+    game.state.phase = GamePhase.FINISHED
+    assert evaluate(game, 0) == 1.0 and evaluate(game, 1) == 0.0
+
+
+def test_play_gives_each_seat_its_player():
+    game = Dog(seed=14)
+    players = [ISMCTSPlayer(time_budget=10.0, seed=2, max_playouts=5), RandomPlayer()]
+    turns = list(play(game, players, 40))
+    assert len(turns) == 40
+    for turn in turns:
+        assert turn.action is None or turn.action in turn.actions
+        assert turn.state.list_player[turn.idx_player].cnt_card is None  # the seat's own view
+    assert players[0].cnt_playout == 5
@@ -0,0 +1,102 @@
+import json
+import random
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from server.py.dog import Dog, Action, Card, PlayerState
+
+# Listings of the seeded self-play below, recorded with the listing from before the moves were generated
+# once per rank and fanned out to the cards (get_board_move_actions, _get_player_actions), then again when
+# the K and the A moved along the ring and the Joker substitutes without a move were left out. They must stay
+# the same, in the same order.
+PATH_LISTINGS = Path(__file__).parent / 'data' / 'dog_listings.json'
+
+CNT_SEED = 4
+CNT_STEP = 120
+LIST_SUIT = ['♠', '♥', '♦', '♣']
+LIST_RANK = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+
+
+def to_text(action: Action) -> str:
+    """ Compact form of an action, e.g. '♠7:0:3' or 'JKR>♥A' """
+    card, card_swap = action.card, action.card_swap
+    text = '' if card is None else card.suit + card.rank
+    if card_swap is not None:
+        return f'{text}>{card_swap.suit}{card_swap.rank}'
+    return f'{text}:{action.pos_from}:{action.pos_to}'
+
+
+def get_duplicate_hand(rng: random.Random) -> List[Card]:
+    """ Two cards each of two ranks (different suits), sometimes with a Joker """
+    hand = [Card(suit=suit, rank=rank) for rank in rng.sample(LIST_RANK, 2) for suit in rng.sample(LIST_SUIT, 2)]
+    if rng.random() < 0.3:
+        hand.append(Card(suit='', rank='JKR'))
+    return hand
+
+
+def scatter_marbles(player: PlayerState, rng: random.Random) -> None:
+    """ Put the player's marbles on random fields: mostly on the last 16 ring fields before its start,
+    in the kennel and in the finish, where all kinds of moves meet """
+    pos_start = Dog.START_POSITIONS[player.name]
+    fields_near = [(pos_start - dist) % 64 for dist in range(1, 17)]
+    fields = fields_near + rng.sample([pos for pos in range(64) if pos not in fields_near], 8) + \
+        Dog.KENNEL[player.name] + Dog.ENDZONE[player.name]
+    for marble, pos in zip(player.list_marble, rng.sample(fields, len(player.list_marble))):
+        marble.pos, marble.is_save = pos, pos in Dog.ENDZONE[player.name] or rng.random() < 0.5
+
+
+def play(seed: int) -> Iterator[Tuple[Dog, List[Action]]]:
+    """ The game and its listing at every step of a seeded self-play. Every third step the active
+    player gets a hand with duplicate ranks and its marbles are scattered. """
+    game = Dog(seed=seed)
+    rng = random.Random(seed)
+    for step in range(CNT_STEP):
+        state = game.get_state()
+        if step % 3 == 2 and state.bool_card_exchanged and state.card_active is None:
+            player = state.list_player[state.idx_player_active]
+            player.list_card = get_duplicate_hand(rng)
+            scatter_marbles(player, rng)
+            game.set_state(state)
+        list_action = game.get_list_action()
+        yield game, list_action
+        action: Optional[Action] = rng.choice(list_action) if list_action else None
+        game.apply_action(action)
+
+
+def test_listings_match_the_recorded_baseline():
+    recorded = json.loads(PATH_LISTINGS.read_text(encoding='utf-8'))
+    assert len(recorded) == CNT_SEED
+    cnt_duplicate = 0
+    for seed in range(CNT_SEED):
+        for step, (game, list_action) in enumerate(play(seed)):
+            assert [to_text(action) for action in list_action] == recorded[seed][step], f"seed {seed}, step {step}"
+            list_rank = [card.rank for card in game.state.list_player[game.state.idx_player_active].list_card]
+            cnt_duplicate += len(set(list_rank)) < len(list_rank)
+    assert cnt_duplicate > CNT_SEED * CNT_STEP // 4  # hands with duplicate ranks are well covered
+
+
+def get_substitute_actions(game: Dog, action: Action) -> List[Action]:
+    """ The actions of the card a Joker swap stands for: the 7 is played on after the swap, the other
+    cards are listed in place of the Joker """
+    assert action.card_swap is not None
+    if action.card_swap.rank == '7':
+        game = game.clone()
+        game.apply_action(action)
+        return [listed for listed in game.get_list_action() if listed.card == action.card_swap]
+    state = game.get_state()
+    player = state.list_player[state.idx_player_active]
+    player.list_card[player.list_card.index(action.card)] = action.card_swap
+    game_card = Dog()
+    game_card.set_state(state)
+    return [listed for listed in game_card.get_list_action() if listed.card == action.card_swap]
+
+
+def test_every_listed_substitute_has_a_move():
+    cnt_rank = 0
+    for seed in range(CNT_SEED):
+        for step, (game, list_action) in enumerate(play(seed)):
+            swaps = {action.card_swap.rank: action for action in list_action if action.card_swap is not None}
+            for rank, action in swaps.items():
+                assert get_substitute_actions(game, action), f"seed {seed}, step {step}: no move for {rank}"
+            cnt_rank += len(swaps)
+    assert cnt_rank > 100
@@ -0,0 +1,71 @@
+from server.py.dog import Dog, Action, Card
+
+
+def get_game(list_pos_save, list_card) -> Dog:
+    """ Cards exchanged, Blue to play the given cards with its first marbles on the given fields """
+    game = Dog(seed=6)
+    state = game.get_state()
+    state.bool_card_exchanged = True
+    state.idx_player_active = 0
+    blue = state.list_player[0]
+    blue.list_card = list_card
+    for marble, (pos, is_save) in zip(blue.list_marble, list_pos_save):
+        marble.pos, marble.is_save = pos, is_save
+    game.set_state(state)
+    return game
+
+
+def test_sections_are_computed_per_marble_and_rank():
+    game = get_game([(10, True), (30, True)], [Card(suit='♠', rank='2'), Card(suit='♥', rank='3')])
+    listed = game.get_list_action()
+    assert Action(card=Card(suit='♠', rank='2'), pos_from=30, pos_to=32) in listed
+    stats = game.get_move_cache_stats()
+    assert (stats.cnt_hit, stats.cnt_recompute) == (0, 4)  # two marbles, two ranks
+
+    assert game.get_list_action() == listed
+    stats = game.get_move_cache_stats()
+    assert (stats.cnt_hit, stats.cnt_recompute) == (4, 4)
+    assert stats.hit_rate == 0.5
+
+    # only the sections of the moved marble are computed again, then only the ones of the new rank
+    game.state.list_player[0].list_marble[1].pos = 40
+    game.mark_state_changed()
+    assert Action(card=Card(suit='♠', rank='2'), pos_from=40, pos_to=42) in game.get_list_action()
+    stats = game.get_move_cache_stats()
+    assert (stats.cnt_hit, stats.cnt_recompute) == (6, 6)
+    game.state.list_player[0].list_card[1] = Card(suit='♥', rank='4')
+    game.get_list_action()
+    stats = game.get_move_cache_stats()
+    assert (stats.cnt_hit, stats.cnt_recompute) == (8, 8)
+
+
+def test_listing_leaves_the_marble_on_its_start_as_it_is():
+    game = get_game([(0, False), (10, True)], [Card(suit='♠', rank='2')])
+    listed = game.get_list_action()
+    # the marble on its start moves like a save one, but is only marked save when Blue acts
+    assert Action(card=Card(suit='♠', rank='2'), pos_from=0, pos_to=2) in listed
+    assert not game.state.list_player[0].list_marble[0].is_save
+    assert game.get_list_action() == listed
+
+    game.apply_action(Action(card=Card(suit='♠', rank='2'), pos_from=10, pos_to=12))
+    assert game.state.list_player[0].list_marble[0].is_save
+    game.undo()
+    assert not game.state.list_player[0].list_marble[0].is_save
+    assert game.get_list_action() == listed
+
+
+def test_jake_swaps_are_shared_across_hands():
+    game = Dog(seed=7)
+    state = game.get_state()
+    state.bool_card_exchanged = True
+    state.list_player[0].list_marble[0].pos = 3
+    state.list_player[1].list_marble[0].pos = 20
+    state.list_player[0].list_card = [Card(suit='♠', rank='J'), Card(suit='♠', rank='2')]
+    game.set_state(state)
+    first = game.get_list_action()
+    game.state.list_player[0].list_card = [Card(suit='♥', rank='J').interned()]
+    second = game.get_list_action()
+    assert [(action.pos_from, action.pos_to) for action in second] == \
+        [(action.pos_from, action.pos_to) for action in first if action.card.rank == 'J']
+    stats = game.get_move_cache_stats()
+    assert (stats.cnt_hit, stats.cnt_recompute) == (1, 2)  # the swaps, then the 2 of the marble on 3
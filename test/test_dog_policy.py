@@ -0,0 +1,33 @@
+import numpy as np
+
+from server.py.dog import Card
+from server.py.dog_greedy import GreedyPlayer
+from server.py.dog_policy import PolicyPlayer, SelfPlayLog, fit, generate, load_model, save_model
+
+
+def test_distils_greedy_player(tmp_path):
+    log = generate(GreedyPlayer(), cnt_games=2, cnt_steps=200)
+    assert len(log.features) == len(log.chosen) == len(log.decision) > 0
+    assert (np.bincount(log.decision, weights=log.chosen) == 1).all()  # one choice per decision
+    log.save(str(tmp_path / 'log.npz'))
+    log = SelfPlayLog.load(str(tmp_path / 'log.npz'))
+    save_model(fit(log), str(tmp_path / 'model.pkl'))
+    player = PolicyPlayer(load_model(str(tmp_path / 'model.pkl')))
+
+    log_test = generate(GreedyPlayer(), cnt_games=1, cnt_steps=200, seed=50)
+    proba = player.model.predict_proba(log_test.features)[:, 1]
+    cnt_agree = 0
+    for decision in np.unique(log_test.decision):
+        is_decision = log_test.decision == decision
+        rows = log_test.features[is_decision]
+        cnt_agree += bool((rows[np.argmax(proba[is_decision])] == rows[log_test.chosen[is_decision] == 1][0]).all())
+    assert cnt_agree >= 0.5 * len(np.unique(log_test.decision))  # the greedy player breaks ties by list order
+
+
+def test_player_picks_sending_home(make_game):
+    game = make_game({0: [10], 1: [15]}, [Card(suit='♠', rank='5'), Card(suit='♥', rank='3')])
+    player = PolicyPlayer(fit(generate(GreedyPlayer(), cnt_games=2, cnt_steps=200)))
+    action = player.select_action(game.get_player_view(0), game.get_list_action())
+    assert action is not None and action.pos_to == 15
+    assert player.cnt_select == 1 and player.time_select > 0
+    assert player.select_action(game.get_player_view(0), []) is None
@@ -0,0 +1,80 @@
+import random
+
+from server.py import dog_seven as seven
+from server.py.dog import Dog, Card, GamePhase
+
+BLUE, GREEN = 0, 1
+KENNEL_BLUE = ((64, False), (65, False), (66, False))
+
+
+def pos_to_of(moves):
+    return [(move.idx_marble, move.pos_to) for move in moves]
+
+
+def test_single_marble_from_start():
+    config = ((0, True),) + KENNEL_BLUE
+    moves = seven.get_next_moves(BLUE, config, 0, 7)
+    assert pos_to_of(moves) == [(0, step) for step in range(1, 8)]
+
+
+def test_save_marbles_block_the_way():
+    config = ((10, False),) + KENNEL_BLUE
+    assert pos_to_of(seven.get_moves(BLUE, config, 1 << 16, 5)) == [(0, 15)]
+    assert not seven.get_moves(BLUE, config, 1 << 16, 6)
+    assert not seven.can_complete(BLUE, config, 1 << 16, 7)
+    assert not seven.get_next_moves(BLUE, config, 1 << 16, 7)
+
+
+def test_dead_ends_are_pruned():
+    # the marble in the finish can only move 2 more steps, the other one has to take the rest
+    config = ((69, True), (10, False)) + KENNEL_BLUE[:2]
+    moves = seven.get_next_moves(BLUE, config, 1 << 14, 5)
+    assert pos_to_of(moves) == [(0, 70), (0, 71), (1, 11), (1, 12), (1, 13)]
+
+
+def test_entering_the_finish():
+    config = ((13, False),) + ((72, False), (73, False), (74, False))
+    assert (0, 77) in pos_to_of(seven.get_next_moves(GREEN, config, 0, 7))
+    config_save = ((16, True),) + config[1:]
+    assert all(pos_to < 64 for _, pos_to in pos_to_of(seven.get_next_moves(GREEN, config_save, 0, 7)))
+
+
+def test_overtaken_own_marbles_go_home():
+    config = ((0, True), (3, False), (64, False), (65, False))
+    move = seven.get_moves(BLUE, config, 0, 4)[0]
+    assert move.pos_to == 4
+    assert move.config == ((4, False), (66, False), (64, False), (65, False))
+    assert seven.get_ring_path(BLUE, 62, 4) == [63, 0, 1, 2]
+    assert seven.get_ring_path(GREEN, 13, 5, into_finish=True) == [14, 15, 16]
+
+
+def test_listed_splits_can_always_be_completed():
+    rng = random.Random(0)
+    for seed in range(30):
+        game = Dog(seed=seed)
+        state = game.state
+        state.bool_card_exchanged = True
+        player = state.list_player[state.idx_player_active]
+        player.list_card = [Card(suit='♠', rank='7')]
+        for marble in player.list_marble:
+            marble.pos, marble.is_save = rng.randrange(64), rng.random() < 0.3
+        for other in state.list_player:
+            if other is not player:
+                other.list_marble[0].pos, other.list_marble[0].is_save = rng.randrange(64), rng.random() < 0.3
+
+        idx_player = state.idx_player_active
+        while state.idx_player_active == idx_player and state.phase == GamePhase.RUNNING:
+            list_action = game.get_list_action()
+            if not list_action:
+                assert game.seven_start is None, "A split was started that can not be completed"
+                break
+            assert all(action.card.rank == '7' for action in list_action)
+            game.apply_action(rng.choice(list_action))
+        assert game.seven_start is None
+
+
+def test_masks_follow_the_moves():
+    config = ((0, True), (3, False), (69, True), (65, False))
+    for steps in range(1, 8):
+        for move in seven.get_moves(BLUE, config, 0, steps):
+            assert move.masks == seven.get_config_masks(BLUE, move.config)
@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from server.py.dog import Dog, Card, GameState
+from server.py.dog_state import CardPile, DECK, LIST_CARD_BY_ID, get_card_id
+
+
+def test_card_ids_follow_the_deck():
+    assert len(DECK) == len(GameState.LIST_CARD) == 110
+    assert list(DECK) == GameState.LIST_CARD
+    assert get_card_id(Card(suit='♠', rank='2')) == 0
+    assert get_card_id(Card(suit='', rank='JKR')) == 52
+    assert all(Dog.ACTION_SPACE.list_card[idx] == (card.suit, card.rank)
+               for idx, card in enumerate(LIST_CARD_BY_ID[:53]))
+
+
+def test_cards_not_in_the_deck_have_no_id():
+    with pytest.raises(ValueError):
+        get_card_id(Card(suit='Hearts', rank='K'))
+    with pytest.raises(ValueError):
+        CardPile([Card(suit='♠', rank='2'), Card(suit='♠', rank='1')])
+    assert len(LIST_CARD_BY_ID) == 53
+
+
+def test_pile_behaves_like_a_list():
+    cards = [Card(suit='♥', rank='A'), Card(suit='', rank='JKR'), Card(suit='♥', rank='A'), Card(suit='♣', rank='7')]
+    pile, items = CardPile(cards), list(cards)
+    assert pile == items and len(pile) == 4 and pile[1] == cards[1] and pile[-1] == cards[3]
+    assert Card(suit='♣', rank='7') in pile and Card(suit='♣', rank='8') not in pile
+
+    for operation in (lambda x: x.remove(cards[0]), lambda x: x.pop(0), lambda x: x.append(cards[1]),
+                      lambda x: x.insert(1, cards[3]), lambda x: x.pop()):
+        operation(pile)
+        operation(items)
+        assert pile == items
+
+    pile[:] = DECK
+    assert len(pile) == 110 and pile[:3] == GameState.LIST_CARD[:3]
+    with pytest.raises(ValueError):
+        CardPile().remove(cards[0])
+
+
+def test_piles_are_compact_arrays():
+    game = Dog(seed=0)
+    state = game.state
+    assert isinstance(state.list_card_draw, CardPile) and isinstance(state.list_card_discard, CardPile)
+    assert all(isinstance(player.list_card, CardPile) for player in state.list_player)
+    assert isinstance(state.list_card_draw.ids, bytearray) and len(state.list_card_draw.ids) == 86
+
+
+def test_round_transitions_keep_all_cards():
+    game = Dog(seed=1)
+    rng = random.Random(1)
+    for _ in range(400):
+        list_action = game.get_list_action()
+        game.apply_action(rng.choice(list_action) if list_action else None)
+        state = game.state
+        assert all(0 <= idx < len(LIST_CARD_BY_ID) for idx in state.list_card_draw.ids)
+        assert isinstance(state.list_card_draw, CardPile)
+    assert game.state.cnt_round > 1
@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+from server.py.dog import Dog, Action, Card
+from server.py.dog_symmetry import actions_from_canonical, actions_to_canonical, from_canonical, \
+    is_seat_independent, rotate_pos, to_canonical
+
+
+def test_positions_turn_by_a_quarter():
+    assert [rotate_pos(pos, 1) for pos in (0, 15, 63, 64, 71, 95)] == [16, 31, 15, 72, 79, 71]
+    assert [rotate_pos(pos, -1) for pos in (16, 0, 72, 68)] == [0, 48, 64, 92]
+    assert rotate_pos(96, 1) == 96
+    assert all(rotate_pos(rotate_pos(pos, 3), 1) == pos for pos in range(96))
+
+
+def test_canonical_state_is_seen_from_the_active_seat():
+    game = Dog(seed=0)
+    state = game.get_state()
+    state.idx_player_active = 2
+    state.list_player[2].list_marble[0].pos = 35
+    canonical, cnt_seat = to_canonical(state)
+    assert cnt_seat == 2 and canonical.idx_player_active == 0 and canonical.idx_player_started == 2
+    blue = canonical.list_player[0]
+    assert blue.name == 'Blue' and blue.teamMate == 'Green' and blue.list_marble[0].pos == 3
+    assert blue.list_card == state.list_player[2].list_card
+    assert from_canonical(canonical, cnt_seat) == state
+
+    action = Action(card=Card(suit='♠', rank='3'), pos_from=35, pos_to=38)
+    assert actions_to_canonical([action, None], cnt_seat) == [Action(card=action.card, pos_from=3, pos_to=6), None]
+    assert actions_from_canonical(actions_to_canonical([action], cnt_seat), cnt_seat) == [action]
+
+
+def test_states_whose_moves_depend_on_the_seat_are_refused():
+    game = Dog(seed=0)
+    state = game.get_state()
+    state.bool_card_exchanged = True
+    state.idx_player_active = 3
+    yellow = state.list_player[3]
+    yellow.list_card = [Card(suit='♠', rank='5')]
+    yellow.list_marble[0].pos, yellow.list_marble[0].is_save = 61, True  # 61 + 5 goes round, 13 + 5 does not
+    assert not is_seat_independent(state, 1)
+    with pytest.raises(ValueError):
+        to_canonical(state)
+
+    yellow.list_marble[0].pos = 50
+    assert is_seat_independent(state, 1)
+    assert to_canonical(state)[0].list_player[0].list_marble[0].pos == 2
+
+
+def test_rules_are_the_same_from_every_seat():
+    cnt_refused = 0
+    for seed in range(4):
+        game = Dog(seed=seed)
+        rng = random.Random(seed)
+        for _ in range(150):
+            state = game.get_state()
+            cnt_seat = -state.idx_player_active % len(state.list_player)
+            if is_seat_independent(state, cnt_seat):
+                canonical, _ = to_canonical(state)
+                original, rotated = Dog(seed=0), Dog(seed=0)  # the same rule counters for both
+                original.set_state(state.model_copy(deep=True))
+                rotated.set_state(canonical)
+                list_action = original.get_list_action()
+                list_action_rotated = rotated.get_list_action()  # other players' marbles come in seat order
+                assert len(list_action_rotated) == len(list_action)
+                assert set(actions_to_canonical(list_action, cnt_seat)) == set(list_action_rotated)
+
+                action = rng.choice(list_action) if list_action else None
+                original.apply_action(action)
+                rotated.apply_action(actions_to_canonical([action], cnt_seat)[0])
+                if original.state.cnt_round == state.cnt_round:  # the deal of a new round goes by seat
+                    assert from_canonical(rotated.get_state(), cnt_seat) == original.get_state()
+            else:
+                cnt_refused += 1
+            list_action = game.get_list_action()
+            game.apply_action(rng.choice(list_action) if list_action else None)
+    assert cnt_refused < 60  # most positions have a canonical form
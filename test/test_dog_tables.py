@@ -0,0 +1,66 @@
+import pytest
+
+from server.py import dog_tables as tables
+
+
+def move(colour, pos, step):
+    return tables.MOVE_TABLE[tables.IDX_COLOUR[colour]][pos][step + tables.STEP_OFFSET]
+
+
+def test_ring_moves_wrap_around():
+    assert move("Blue", 10, 5).pos_to == 15
+    assert move("Green", 60, 6).pos_to == 2
+    assert move("Red", 2, -4).pos_to == 62
+
+
+@pytest.mark.parametrize("colour, pos, step, pos_to_finish", [
+    ("Blue", 0, 1, 68),       # from the own start directly into the finish
+    ("Blue", 63, 5, 71),
+    ("Blue", 60, 13, None),   # too far
+    ("Green", 13, 5, 77),
+    ("Green", 17, 3, None),   # already past the own start
+    ("Yellow", 45, 3, None),  # reaches the start, but not the finish
+    ("Yellow", 45, 4, 92),
+])
+def test_entering_the_finish(colour, pos, step, pos_to_finish):
+    assert move(colour, pos, step).pos_to_finish == pos_to_finish
+
+
+def test_passing_the_start():
+    assert move("Green", 13, 3).passes_start
+    assert move("Green", 13, 2).passes_start is False
+    assert move("Green", 16, 4).passes_start is False  # leaving the start does not pass it
+    assert move("Green", 18, -4).passes_start
+    assert move("Blue", 1, -4).passes_start
+
+
+def test_moves_inside_finish_and_kennel():
+    assert move("Red", 84, 3).pos_to == 87
+    assert move("Red", 84, 4).pos_to is None
+    assert move("Red", 85, -4) == tables.ILLEGAL
+    assert move("Red", 80, 2) == tables.ILLEGAL   # kennel marbles only leave with K, A or JKR
+    assert move("Blue", 76, 1) == tables.ILLEGAL  # someone else's finish
+
+
+def test_card_steps():
+    assert tables.CARD_STEPS["A"] == (1, 11)
+    assert tables.CARD_STEPS["Q"] == (12,)
+    assert tables.CARD_STEPS["JKR"] == ()
+    assert len(tables.MOVE_TABLE) == 4 and all(len(rows) == tables.CNT_POSITIONS for rows in tables.MOVE_TABLE)
+
+
+def test_progress_counts_the_way_to_the_finish():
+    blue, green = tables.PROGRESS[0], tables.PROGRESS[1]
+    assert blue[64] == 0 and blue[0] == 1 and blue[63] == 64 and blue[68] == 65 and blue[71] == 68
+    assert green[16] == 1 and green[15] == 64 and green[76] == 65 and green[68] == 0
+
+
+def test_path_masks_cover_the_fields_passed():
+    def path_mask(pos, step):
+        return tables.PATH_MASK[pos][step + tables.STEP_OFFSET]
+
+    assert path_mask(10, 3) == tables.get_ring_mask([11, 12, 13])
+    assert path_mask(62, 4) == tables.get_ring_mask([63, 0, 1, 2])
+    assert path_mask(1, -4) == tables.get_ring_mask([0, 63, 62, 61])
+    assert path_mask(5, 0) == 0 and tables.get_ring_mask([64, 70]) == 0
+    assert tables.LANE_UPTO == (0b1, 0b11, 0b111, 0b1111)
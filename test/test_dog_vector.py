@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from server.py.dog import Dog, Action, Card, GamePhase
+from server.py.dog_vector import VectorDog, NO_CARD
+
+
+def test_new_games_match_dog():
+    games = VectorDog(4, seed=0, cross_check=True)  # the games are compared to a Dog of the same seed
+    assert games.marble_pos.shape == (4, 4, 4) and games.hand.shape[:2] == (4, 4)
+    assert (games.cnt_hand == 6).all() and (games.cnt_draw == 110 - 24).all()
+    assert (games.hand[:, :, 6:] == NO_CARD).all()
+    for idx_game in range(4):
+        assert games.get_state(idx_game) == games.list_shadow[idx_game].get_state()
+
+
+def test_random_play_matches_dog():
+    games = VectorDog(8, seed=1, cross_check=True)  # raises if actions or states ever differ
+    rng = np.random.default_rng(1)
+    for _ in range(300):
+        games.step(games.sample_actions(rng))
+    assert games.cnt_round.max() > 1
+    assert games.cnt_error == 0
+
+
+def test_legal_action_mask():
+    games = VectorDog(3, seed=2)
+    mask = games.get_legal_action_mask()
+    assert mask.shape == (3, len(Dog.ACTION_SPACE))
+    for idx_game in range(3):
+        game = Dog()
+        game.set_state(games.get_state(idx_game))
+        assert (mask[idx_game] == game.get_legal_action_mask()).all()
+
+
+def test_finished_games_are_reset():
+    games = VectorDog(2, seed=3, cross_check=True)
+    state = games.get_state(0)
+    state.bool_card_exchanged = True
+    blue, red = state.list_player[0], state.list_player[2]
+    blue.list_card = [Card(suit='♠', rank='2')]
+    for marble, pos in zip(blue.list_marble, (63, 69, 70, 71)):
+        marble.pos, marble.is_save = pos, pos > 63
+    for marble, pos in zip(red.list_marble, (84, 85, 86, 87)):
+        marble.pos, marble.is_save = pos, True
+    games.set_state(0, state)
+
+    action_id = Dog().get_action_id(games.list_shadow[0].get_list_action()[0])
+    done = games.step([action_id, games.sample_actions(np.random.default_rng(3))[1]])
+    assert done.tolist() == [True, False]
+    assert games.team_won[0] == 0 and games.cnt_finished == 1
+    assert games.get_state(0).phase == GamePhase.RUNNING and games.cnt_round[0] == 1
+
+
+def test_partner_moves_match_dog():
+    games = VectorDog(1, seed=5, cross_check=True)
+    state = games.get_state(0)
+    state.bool_card_exchanged = True
+    blue, red = state.list_player[0], state.list_player[2]
+    blue.list_card = [Card(suit='♠', rank='7'), Card(suit='♥', rank='K'), Card(suit='♦', rank='4')]
+    for marble, pos in zip(blue.list_marble, (68, 69, 70, 71)):
+        marble.pos, marble.is_save = pos, True
+    for marble, pos in zip(red.list_marble, (80, 40, 62, 84)):
+        marble.pos, marble.is_save = pos, False
+    games.set_state(0, state)
+
+    # the marbles on the ring move with the K and the 4 (62 + 13 goes round to 11), not with the 7
+    action_rows, action_ids = games.legal_actions()
+    assert (action_rows == 0).all() and len(action_ids) == 2 * 2
+    rng = np.random.default_rng(5)
+    for _ in range(20):
+        games.step(games.sample_actions(rng))
+
+
+def test_seven_before_a_simple_card_sees_the_marbles_unmarked():
+    games = VectorDog(1, seed=6, cross_check=True)
+    state = games.get_state(0)
+    state.bool_card_exchanged = True
+    state.idx_player_active = 0
+    blue = state.list_player[0]
+    blue.list_card = [Card(suit='♠', rank='7'), Card(suit='♥', rank='2')]
+    blue.list_marble[0].pos, blue.list_marble[0].is_save = 0, False  # back on its start after a round
+    blue.list_marble[1].pos, blue.list_marble[1].is_save = 20, False  # moves the rest of the 7
+    games.set_state(0, state)
+
+    # Dog lists the 7 before the 2 marks the marble as save, so it may still enter the finish
+    _, action_ids = games.legal_actions()
+    assert Dog().get_action_id(Action(card=Card(suit='♠', rank='7'), pos_from=0, pos_to=68)) in action_ids
+
+
+def test_step_checks_the_ids():
+    games = VectorDog(2, seed=4)
+    with pytest.raises(ValueError):
+        games.step([0])
+    with pytest.raises(ValueError):
+        games.step([0, len(Dog.ACTION_SPACE)])
+
+
+def test_actions_that_cannot_be_applied():
+    state = VectorDog(1, seed=4).get_state(0)
+    state.bool_card_exchanged = True
+    state.list_player[0].list_card = [Card(suit='♥', rank='K')]
+    action_id = Dog().get_action_id(Action(card=Card(suit='♠', rank='K'), pos_from=64, pos_to=0))
+    games = VectorDog(1, seed=4)
+    games.set_state(0, state)
+    assert games.step([action_id]).tolist() == [True]  # the game is reset
+    assert games.cnt_error == 1
+    games = VectorDog(1, seed=4, cross_check=True)
+    games.set_state(0, state)
+    with pytest.raises(ValueError):
+        games.step([action_id])  # the error of the Dog
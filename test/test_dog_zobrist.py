@@ -0,0 +1,37 @@
+import random
+
+from server.py.dog import Dog, Card
+from server.py.dog_zobrist import ZobristHash
+
+
+def test_hash_follows_actions_and_undo():
+    game = Dog(seed=3)
+    rng = random.Random(3)
+    hashes = [game.state_hash()]
+    for _ in range(300):
+        list_action = game.get_list_action()
+        game.apply_action(rng.choice(list_action) if list_action else None)
+        hashes.append(game.state_hash())
+        assert hashes[-1] == ZobristHash.compute(game)
+    while len(hashes) > 1 and game._journal.can_undo():  # pylint: disable=protected-access
+        game.undo()
+        hashes.pop()
+        assert game.state_hash() == hashes[-1] == ZobristHash.compute(game)
+
+
+def test_equal_positions_have_equal_hashes():
+    game = Dog(seed=4)
+    other = game.clone()
+    assert game.state_hash() == other.state_hash()
+    other.rng.seed(5)
+    other.state.list_card_draw.pop()  # the draw pile is not part of the position
+    assert game.state_hash() == ZobristHash.compute(other)
+
+    state = game.get_state()
+    state.list_player[0].list_card[0] = Card(suit='', rank='JKR')
+    other.set_state(state)
+    assert game.state_hash() != other.state_hash()
+    state = game.get_state()
+    state.list_player[1].list_marble[0].pos = 16
+    other.set_state(state)
+    assert game.state_hash() != other.state_hash()